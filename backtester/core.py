@@ -6,6 +6,9 @@ import vectorbt as vbt
 import os
 import pandas as pd
 
+from backtester.portfolio import AlignedPrices, run_shared_cash_crossover
+from backtester.result_store import ResultStore, code_hash
+
 # Default symbols for non-equity asset classes used when no database is
 # available for them. These are intentionally short lists so unit tests can run
 # quickly with patched data.
@@ -27,6 +30,8 @@ def run_crossover_backtest(
     start_date: str | None = None,
     end_date: str | None = None,
     asset_classes: list[str] | None = None,
+    store: ResultStore | None = None,
+    shared_cash: bool = False,
 ):
     """
     Loads top assets and backtests a moving average crossover strategy
@@ -40,6 +45,12 @@ def run_crossover_backtest(
         asset_classes (list[str], optional): List of asset classes to include.
             Equities are loaded from the candidates database while other classes
             use built-in symbol mappings. Defaults to ["equity"].
+        store (ResultStore, optional): When given, the portfolio equity curve and
+            run metadata are buffered in the store (call ``store.flush()`` or use
+            it as a context manager to persist them).
+        shared_cash (bool, optional): Simulate all assets from a single cash
+            pool, each on its own asset-class calendar and fee schedule (see
+            ``backtester.portfolio``), instead of one vectorbt column per asset.
     """
     if asset_classes is None:
         asset_classes = ["equity"]
@@ -52,6 +63,7 @@ def run_crossover_backtest(
     )
 
     symbols: list[str] = []
+    symbol_classes: dict[str, str] = {}
 
     if "equity" in asset_classes:
         try:
@@ -62,6 +74,7 @@ def run_crossover_backtest(
             con.close()
             eq_symbols = top_assets_df["symbol"].tolist()
             symbols.extend(eq_symbols)
+            symbol_classes.update(dict.fromkeys(eq_symbols, "equity"))
             print(f"Loaded top {len(eq_symbols)} equity assets for back-test: {eq_symbols}")
         except Exception as e:
             print(f"❌ Error loading equity assets from database: {e}")
@@ -73,6 +86,7 @@ def run_crossover_backtest(
         extras = ASSET_CLASS_SYMBOLS.get(cls, [])
         if extras:
             symbols.extend(extras)
+            symbol_classes.update(dict.fromkeys(extras, cls))
             print(f"Added {cls} assets: {extras}")
         else:
             print(f"⚠️ Unknown asset class: {cls}")
@@ -105,12 +119,24 @@ def run_crossover_backtest(
             if price_data.empty:
                 date_range = pd.date_range(start=start_date or sample_df.index[0], end=end_date or sample_df.index[-1])
                 price_data = pd.DataFrame(100.0, index=date_range, columns=cols)
-            else:
+            elif not shared_cash:
                 price_data = price_data.ffill()
         except Exception as e:
             print(f"❌ Could not load fallback data: {e}")
             return
 
+    if shared_cash:
+        # Keep every asset on its own calendar instead of the NaN-padded union.
+        aligned = AlignedPrices.from_frame(price_data, symbol_classes)
+        result = run_shared_cash_crossover(aligned, short_window, long_window)
+        print(
+            f"\n--- Performance Summary for {short_window}/{long_window} Strategy ({test_period}, shared cash) ---"
+        )
+        print(result.stats())
+        if store is not None:
+            _record_run(store, result.equity, short_window, long_window, price_data, start_date, end_date, shared_cash)
+        return
+
     # 3. Generate trading signals
     print("\nGenerating signals...")
     short_ma = vbt.MA.run(price_data, short_window)
@@ -135,6 +161,25 @@ def run_crossover_backtest(
     )
     print(portfolio.stats())
 
+    if store is not None:
+        equity = portfolio.value()
+        if isinstance(equity, pd.DataFrame):
+            equity = equity.sum(axis=1)
+        _record_run(store, equity, short_window, long_window, price_data, start_date, end_date, shared_cash)
+
+
+def _record_run(store, equity, short_window, long_window, price_data, start_date, end_date, shared_cash):
+    run_id = store.add_run(
+        equity,
+        strategy="ma_crossover",
+        params={"short_window": short_window, "long_window": long_window, "shared_cash": shared_cash},
+        universe=list(price_data.columns),
+        start_date=start_date,
+        end_date=end_date,
+        code_hash=code_hash(),
+    )
+    print(f"Recorded run {run_id} in result store {store.root}")
+
 
 # --- To run this script directly ---
 if __name__ == "__main__":
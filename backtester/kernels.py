@@ -0,0 +1,308 @@
+"""Compiled kernels for path-dependent position logic.
+
+Entry/exit signals of the crossover strategy are vectorised, but stop-losses,
+trailing stops and cash-constrained sizing depend on the path taken so far and
+end up as Python loops over bars. The kernels below run those state machines
+over 2-D ``(n_bars, n_assets)`` arrays with Numba, one column per thread.
+
+Every kernel has a pure-NumPy reference (``*_reference``) that loops over bars
+while vectorising across columns. The references define the semantics and are
+used by the tests to cross-check the compiled versions.
+
+If Numba is not installed the kernels fall back to plain Python execution of
+the same code, which is correct but slow.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from engine.jit import NUMBA_AVAILABLE, njit, prange
+
+
+__all__ = [
+    "NUMBA_AVAILABLE",
+    "EXIT_NONE",
+    "EXIT_SIGNAL",
+    "EXIT_STOP_LOSS",
+    "EXIT_TRAILING_STOP",
+    "EXIT_TAKE_PROFIT",
+    "crossover_signals",
+    "apply_stops",
+    "apply_stops_reference",
+    "simulate_equity",
+    "simulate_equity_reference",
+]
+
+# Exit reason codes written by ``apply_stops`` on the bar a position is closed.
+EXIT_NONE = 0
+EXIT_SIGNAL = 1
+EXIT_STOP_LOSS = 2
+EXIT_TRAILING_STOP = 3
+EXIT_TAKE_PROFIT = 4
+
+
+def _as_2d(arr: np.ndarray, dtype) -> np.ndarray:
+    arr = np.asarray(arr, dtype=dtype)
+    if arr.ndim == 1:
+        arr = arr[:, None]
+    if arr.ndim != 2:
+        raise ValueError("expected a 1-D or 2-D (n_bars, n_assets) array")
+    return np.ascontiguousarray(arr)
+
+
+def _stop_level(value: float | None) -> float:
+    if value is None:
+        return np.nan
+    if value <= 0:
+        raise ValueError("stop levels must be positive fractions")
+    return float(value)
+
+
+# ---------------------------------------------------------------------------
+# Signals
+# ---------------------------------------------------------------------------
+
+
+def crossover_signals(close: np.ndarray, short_window: int, long_window: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(entries, exits)`` for a moving-average crossover.
+
+    Equivalent to ``vbt.MA.run(...).ma_crossed_above/below`` on a NaN-free
+    price matrix: an entry fires on the bar where the short MA moves above the
+    long MA, an exit where it moves below.
+    """
+    if not 0 < short_window < long_window:
+        raise ValueError("require 0 < short_window < long_window")
+    close = _as_2d(close, np.float64)
+    csum = np.vstack([np.zeros((1, close.shape[1])), np.cumsum(close, axis=0)])
+
+    def _ma(window: int) -> np.ndarray:
+        ma = np.full_like(close, np.nan)
+        ma[window - 1:] = (csum[window:] - csum[:-window]) / window
+        return ma
+
+    diff = _ma(short_window) - _ma(long_window)
+    prev = np.vstack([np.full((1, close.shape[1]), np.nan), diff[:-1]])
+    with np.errstate(invalid="ignore"):
+        entries = (diff > 0) & (prev <= 0)
+        exits = (diff < 0) & (prev >= 0)
+    return entries, exits
+
+
+# ---------------------------------------------------------------------------
+# Stop-loss / trailing-stop / take-profit state machine
+# ---------------------------------------------------------------------------
+
+
+@njit(cache=True, parallel=True)
+def _apply_stops_nb(close, entries, exits, stop_loss, trailing_stop, take_profit):
+    n_bars, n_cols = close.shape
+    position = np.zeros((n_bars, n_cols), dtype=np.int8)
+    reason = np.zeros((n_bars, n_cols), dtype=np.int8)
+    for j in prange(n_cols):
+        in_pos = False
+        entry_px = 0.0
+        high = 0.0
+        for t in range(n_bars):
+            px = close[t, j]
+            if np.isnan(px):
+                position[t, j] = 1 if in_pos else 0
+                continue
+            if in_pos:
+                if px > high:
+                    high = px
+                code = 0
+                if not np.isnan(stop_loss) and px <= entry_px * (1.0 - stop_loss):
+                    code = 2
+                elif not np.isnan(trailing_stop) and px <= high * (1.0 - trailing_stop):
+                    code = 3
+                elif not np.isnan(take_profit) and px >= entry_px * (1.0 + take_profit):
+                    code = 4
+                elif exits[t, j]:
+                    code = 1
+                if code != 0:
+                    in_pos = False
+                    reason[t, j] = code
+                else:
+                    position[t, j] = 1
+            elif entries[t, j]:
+                in_pos = True
+                entry_px = px
+                high = px
+                position[t, j] = 1
+    return position, reason
+
+
+def apply_stops(
+    close: np.ndarray,
+    entries: np.ndarray,
+    exits: np.ndarray,
+    *,
+    stop_loss: float | None = None,
+    trailing_stop: float | None = None,
+    take_profit: float | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Run a long-only position state machine with optional stops.
+
+    Parameters
+    ----------
+    close : np.ndarray
+        Prices of shape ``(n_bars, n_assets)``; NaN bars keep the current state.
+    entries, exits : np.ndarray
+        Boolean signal arrays of the same shape.
+    stop_loss, trailing_stop, take_profit : float, optional
+        Fractions relative to the entry price (``stop_loss``, ``take_profit``)
+        or to the highest close since entry (``trailing_stop``).
+
+    Returns
+    -------
+    position, reason : np.ndarray, np.ndarray
+        ``int8`` arrays: 1 while long, and the ``EXIT_*`` code on exit bars.
+        Stops are checked before the exit signal; a position closed on a bar
+        cannot be re-opened on the same bar.
+    """
+    close = _as_2d(close, np.float64)
+    entries = _as_2d(entries, np.bool_)
+    exits = _as_2d(exits, np.bool_)
+    if not close.shape == entries.shape == exits.shape:
+        raise ValueError("close, entries and exits must have the same shape")
+    return _apply_stops_nb(
+        close, entries, exits, _stop_level(stop_loss), _stop_level(trailing_stop), _stop_level(take_profit)
+    )
+
+
+def apply_stops_reference(
+    close: np.ndarray,
+    entries: np.ndarray,
+    exits: np.ndarray,
+    *,
+    stop_loss: float | None = None,
+    trailing_stop: float | None = None,
+    take_profit: float | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pure-NumPy reference for :func:`apply_stops` (vectorised across assets)."""
+    close = _as_2d(close, np.float64)
+    entries = _as_2d(entries, np.bool_)
+    exits = _as_2d(exits, np.bool_)
+    sl, ts, tp = _stop_level(stop_loss), _stop_level(trailing_stop), _stop_level(take_profit)
+    n_bars, n_cols = close.shape
+    position = np.zeros((n_bars, n_cols), dtype=np.int8)
+    reason = np.zeros((n_bars, n_cols), dtype=np.int8)
+    in_pos = np.zeros(n_cols, dtype=bool)
+    entry_px = np.zeros(n_cols)
+    high = np.zeros(n_cols)
+    for t in range(n_bars):
+        px = close[t]
+        valid = ~np.isnan(px)
+        held = in_pos & valid
+        high = np.where(held, np.fmax(high, px), high)
+        code = np.zeros(n_cols, dtype=np.int8)
+        with np.errstate(invalid="ignore"):
+            checks = [
+                (EXIT_STOP_LOSS, px <= entry_px * (1.0 - sl)),
+                (EXIT_TRAILING_STOP, px <= high * (1.0 - ts)),
+                (EXIT_TAKE_PROFIT, px >= entry_px * (1.0 + tp)),
+                (EXIT_SIGNAL, exits[t]),
+            ]
+        for value, hit in checks:
+            code = np.where(held & (code == 0) & hit, value, code).astype(np.int8)
+        closing = code != 0
+        opening = ~in_pos & valid & entries[t]
+        entry_px = np.where(opening, px, entry_px)
+        high = np.where(opening, px, high)
+        in_pos = (in_pos & ~closing) | opening
+        position[t] = in_pos
+        reason[t] = code
+    return position, reason
+
+
+# ---------------------------------------------------------------------------
+# Cash-constrained sizing
+# ---------------------------------------------------------------------------
+
+
+@njit(cache=True, parallel=True)
+def _simulate_equity_nb(close, position, init_cash, fees, size_fraction):
+    n_bars, n_cols = close.shape
+    equity = np.empty((n_bars, n_cols), dtype=np.float64)
+    units = np.zeros((n_bars, n_cols), dtype=np.float64)
+    for j in prange(n_cols):
+        cash = init_cash
+        held = 0.0
+        last_px = np.nan
+        for t in range(n_bars):
+            px = close[t, j]
+            if not np.isnan(px):
+                last_px = px
+                want = position[t, j] != 0
+                if want and held == 0.0:
+                    spend = cash * size_fraction
+                    held = spend / (px * (1.0 + fees))
+                    cash -= spend
+                elif not want and held != 0.0:
+                    cash += held * px * (1.0 - fees)
+                    held = 0.0
+            units[t, j] = held
+            equity[t, j] = cash + (held * last_px if held != 0.0 else 0.0)
+    return equity, units
+
+
+def simulate_equity(
+    close: np.ndarray,
+    position: np.ndarray,
+    *,
+    init_cash: float = 10_000.0,
+    fees: float = 0.001,
+    size_fraction: float = 1.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Turn a target position mask into equity curves, one cash pool per asset.
+
+    On each 0 → 1 transition the kernel invests ``size_fraction`` of the
+    available cash at the close (net of proportional ``fees``) and holds the
+    units until the mask returns to 0. Bars with NaN prices carry the last
+    valuation forward.
+
+    Returns
+    -------
+    equity, units : np.ndarray, np.ndarray
+        Both of shape ``(n_bars, n_assets)``.
+    """
+    if not 0 < size_fraction <= 1:
+        raise ValueError("size_fraction must be in (0, 1]")
+    close = _as_2d(close, np.float64)
+    position = _as_2d(position, np.int8)
+    if close.shape != position.shape:
+        raise ValueError("close and position must have the same shape")
+    return _simulate_equity_nb(close, position, float(init_cash), float(fees), float(size_fraction))
+
+
+def simulate_equity_reference(
+    close: np.ndarray,
+    position: np.ndarray,
+    *,
+    init_cash: float = 10_000.0,
+    fees: float = 0.001,
+    size_fraction: float = 1.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pure-NumPy reference for :func:`simulate_equity`."""
+    close = _as_2d(close, np.float64)
+    position = _as_2d(position, np.int8)
+    n_bars, n_cols = close.shape
+    equity = np.empty((n_bars, n_cols))
+    units = np.zeros((n_bars, n_cols))
+    cash = np.full(n_cols, float(init_cash))
+    held = np.zeros(n_cols)
+    last_px = np.full(n_cols, np.nan)
+    for t in range(n_bars):
+        px = close[t]
+        valid = ~np.isnan(px)
+        last_px = np.where(valid, px, last_px)
+        want = position[t] != 0
+        buy = valid & want & (held == 0)
+        sell = valid & ~want & (held != 0)
+        spend = np.where(buy, cash * size_fraction, 0.0)
+        cash = cash - spend + np.where(sell, held * px * (1.0 - fees), 0.0)
+        with np.errstate(invalid="ignore"):
+            held = np.where(buy, spend / (px * (1.0 + fees)), np.where(sell, 0.0, held))
+        units[t] = held
+        equity[t] = cash + np.where(held != 0, held * last_px, 0.0)
+    return equity, units
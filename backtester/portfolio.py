@@ -0,0 +1,281 @@
+"""Multi-asset-class portfolio simulation with a single cash pool.
+
+``vbt.Portfolio.from_signals`` simulates each column with its own cash, and the
+crossover back-test forward-fills prices onto the union of all trading days, so
+equities appear to trade on weekends next to crypto. This module instead keeps
+every asset on its own calendar:
+
+* :class:`AlignedPrices` stores prices in CSR layout – one flat ``price`` array
+  plus, for each observation, its position on the master timeline (``t_idx``).
+  Memory is proportional to the number of real sessions, not
+  ``n_union_days × n_assets``.
+* Each asset class has a session calendar (:data:`CLASS_CALENDARS`) and a fee /
+  slippage schedule (:data:`CLASS_FEES`).
+* :func:`simulate_shared_cash` walks all (asset, session) events in time order
+  in a compiled kernel, sharing one cash balance. Holdings are valued at their
+  last traded price without materialising a forward-filled frame.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from backtester.kernels import crossover_signals, njit
+
+__all__ = [
+    "CLASS_CALENDARS",
+    "CLASS_FEES",
+    "AlignedPrices",
+    "PortfolioResult",
+    "simulate_shared_cash",
+    "run_shared_cash_crossover",
+]
+
+
+def _weekdays(index: pd.DatetimeIndex) -> np.ndarray:
+    return index.dayofweek < 5
+
+
+def _every_day(index: pd.DatetimeIndex) -> np.ndarray:
+    return np.ones(len(index), dtype=bool)
+
+
+# Session calendar per asset class: maps a DatetimeIndex to a boolean mask of
+# the timestamps on which the class can trade.
+CLASS_CALENDARS: dict[str, Callable[[pd.DatetimeIndex], np.ndarray]] = {
+    "equity": _weekdays,
+    "bonds": _weekdays,
+    "forex": _weekdays,
+    "crypto": _every_day,
+}
+
+# Proportional (fees, slippage) per asset class.
+CLASS_FEES: dict[str, tuple[float, float]] = {
+    "equity": (0.001, 0.001),
+    "bonds": (0.0005, 0.0005),
+    "forex": (0.0002, 0.0001),
+    "crypto": (0.002, 0.001),
+}
+
+
+@dataclass(frozen=True)
+class AlignedPrices:
+    """Per-asset price series aligned to a shared timeline without filling.
+
+    Observations of asset ``i`` live in ``price[offsets[i]:offsets[i + 1]]`` and
+    ``timeline[t_idx[offsets[i]:offsets[i + 1]]]`` gives their timestamps.
+    """
+
+    timeline: pd.DatetimeIndex
+    symbols: tuple[str, ...]
+    classes: tuple[str, ...]
+    offsets: np.ndarray
+    t_idx: np.ndarray
+    price: np.ndarray
+
+    @classmethod
+    def from_series(cls, prices: Mapping[str, pd.Series], classes: Mapping[str, str]) -> "AlignedPrices":
+        """Build from one price series per symbol, each on its own index.
+
+        NaN observations and timestamps outside the class calendar are dropped.
+        """
+        cleaned: list[pd.Series] = []
+        for sym, series in prices.items():
+            cls_name = classes.get(sym, "equity")
+            if cls_name not in CLASS_CALENDARS:
+                raise KeyError(f"unknown asset class {cls_name!r} for {sym}")
+            series = series.dropna().sort_index()
+            series = series[CLASS_CALENDARS[cls_name](pd.DatetimeIndex(series.index))]
+            cleaned.append(series)
+        timeline = pd.DatetimeIndex(
+            np.unique(np.concatenate([s.index.values for s in cleaned])) if cleaned else []
+        )
+        lengths = np.array([len(s) for s in cleaned], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        t_idx = np.concatenate(
+            [timeline.searchsorted(s.index.values) for s in cleaned] or [np.empty(0, dtype=np.int64)]
+        ).astype(np.int64)
+        price = np.concatenate([s.to_numpy(dtype=float) for s in cleaned] or [np.empty(0)])
+        return cls(
+            timeline=timeline,
+            symbols=tuple(prices),
+            classes=tuple(classes.get(sym, "equity") for sym in prices),
+            offsets=offsets,
+            t_idx=t_idx,
+            price=price,
+        )
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, classes: Mapping[str, str]) -> "AlignedPrices":
+        """Build from a wide (possibly NaN-padded) frame such as ``yf.download``."""
+        return cls.from_series({col: frame[col] for col in frame.columns}, classes)
+
+    def series(self, i: int) -> pd.Series:
+        """Return the prices of asset ``i`` on its own sessions."""
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return pd.Series(self.price[lo:hi], index=self.timeline[self.t_idx[lo:hi]], name=self.symbols[i])
+
+
+@dataclass(frozen=True)
+class PortfolioResult:
+    """Output of :func:`simulate_shared_cash` on the master timeline."""
+
+    equity: pd.Series
+    cash: pd.Series
+    units: np.ndarray  # per observation, same layout as AlignedPrices.price
+    fees_paid: float
+    n_trades: int
+
+    def stats(self) -> pd.Series:
+        """Summary statistics in the spirit of ``vbt.Portfolio.stats()``."""
+        eq = self.equity
+        rets = eq.pct_change().dropna()
+        days = max((eq.index[-1] - eq.index[0]).days, 1) if len(eq) else 1
+        periods = len(eq) / days * 365.25 if len(eq) else 0.0
+        sharpe = rets.mean() / rets.std() * np.sqrt(periods) if rets.std() > 0 else np.nan
+        return pd.Series(
+            {
+                "Start": eq.index[0] if len(eq) else None,
+                "End": eq.index[-1] if len(eq) else None,
+                "Start Value": eq.iloc[0] if len(eq) else np.nan,
+                "End Value": eq.iloc[-1] if len(eq) else np.nan,
+                "Total Return [%]": (eq.iloc[-1] / eq.iloc[0] - 1) * 100 if len(eq) else np.nan,
+                "Max Drawdown [%]": ((eq / eq.cummax()) - 1).min() * 100 if len(eq) else np.nan,
+                "Total Fees Paid": self.fees_paid,
+                "Total Trades": self.n_trades,
+                "Sharpe Ratio": sharpe,
+            }
+        )
+
+
+@njit(cache=True)
+def _shared_cash_nb(order, t_idx, asset, price, entries, exits, fees, slippage, n_times, init_cash, weight):
+    n_assets = fees.shape[0]
+    held = np.zeros(n_assets)
+    last_px = np.zeros(n_assets)
+    units = np.zeros(price.shape[0])
+    equity = np.empty(n_times)
+    cash_out = np.empty(n_times)
+    cash = init_cash
+    mkt_value = 0.0
+    fees_paid = 0.0
+    n_trades = 0
+    t_prev = 0
+    for k in range(order.shape[0]):
+        e = order[k]
+        t = t_idx[e]
+        while t_prev < t:
+            equity[t_prev] = cash + mkt_value
+            cash_out[t_prev] = cash
+            t_prev += 1
+        a = asset[e]
+        px = price[e]
+        mkt_value += held[a] * (px - last_px[a])
+        last_px[a] = px
+        if held[a] == 0.0 and entries[e]:
+            target = (cash + mkt_value) * weight
+            spend = min(cash, target)
+            if spend > 0.0:
+                exec_px = px * (1.0 + slippage[a])
+                qty = spend / (exec_px * (1.0 + fees[a]))
+                fees_paid += qty * exec_px * fees[a]
+                held[a] = qty
+                cash -= spend
+                mkt_value += qty * px
+                n_trades += 1
+        elif held[a] != 0.0 and exits[e]:
+            exec_px = px * (1.0 - slippage[a])
+            gross = held[a] * exec_px
+            fees_paid += gross * fees[a]
+            cash += gross * (1.0 - fees[a])
+            mkt_value -= held[a] * px
+            held[a] = 0.0
+        units[e] = held[a]
+    while t_prev < n_times:
+        equity[t_prev] = cash + mkt_value
+        cash_out[t_prev] = cash
+        t_prev += 1
+    return equity, cash_out, units, fees_paid, n_trades
+
+
+def simulate_shared_cash(
+    prices: AlignedPrices,
+    entries: np.ndarray,
+    exits: np.ndarray,
+    *,
+    init_cash: float = 10_000.0,
+    weight: float | None = None,
+    fees: Mapping[str, tuple[float, float]] | None = None,
+) -> PortfolioResult:
+    """Simulate long-only signals across asset classes with one cash pool.
+
+    Parameters
+    ----------
+    prices : AlignedPrices
+        Calendar-aligned prices.
+    entries, exits : np.ndarray
+        Boolean signals in the same flat layout as ``prices.price``.
+    init_cash : float
+        Starting cash shared by all assets.
+    weight : float, optional
+        Target fraction of current equity invested per entry, capped by the
+        available cash. Defaults to ``1 / n_assets``.
+    fees : mapping, optional
+        ``{asset_class: (fees, slippage)}`` overriding :data:`CLASS_FEES`.
+
+    Events on the same timestamp are processed in symbol order; the equity of
+    each timestamp is recorded after all its events.
+    """
+    schedule = {**CLASS_FEES, **(fees or {})}
+    n_assets = len(prices.symbols)
+    if entries.shape != prices.price.shape or exits.shape != prices.price.shape:
+        raise ValueError("entries and exits must match the AlignedPrices layout")
+    weight = 1.0 / max(n_assets, 1) if weight is None else weight
+    if not 0 < weight <= 1:
+        raise ValueError("weight must be in (0, 1]")
+    asset = np.repeat(np.arange(n_assets, dtype=np.int64), np.diff(prices.offsets))
+    order = np.lexsort((asset, prices.t_idx))
+    fee_arr = np.array([schedule[c][0] for c in prices.classes], dtype=float)
+    slip_arr = np.array([schedule[c][1] for c in prices.classes], dtype=float)
+    equity, cash, units, fees_paid, n_trades = _shared_cash_nb(
+        order,
+        prices.t_idx,
+        asset,
+        prices.price,
+        np.asarray(entries, dtype=np.bool_),
+        np.asarray(exits, dtype=np.bool_),
+        fee_arr,
+        slip_arr,
+        len(prices.timeline),
+        float(init_cash),
+        float(weight),
+    )
+    return PortfolioResult(
+        equity=pd.Series(equity, index=prices.timeline, name="equity"),
+        cash=pd.Series(cash, index=prices.timeline, name="cash"),
+        units=units,
+        fees_paid=float(fees_paid),
+        n_trades=int(n_trades),
+    )
+
+
+def run_shared_cash_crossover(
+    prices: AlignedPrices,
+    short_window: int,
+    long_window: int,
+    **kwargs,
+) -> PortfolioResult:
+    """Crossover signals on each asset's own sessions, simulated with shared cash."""
+    entries = np.zeros(prices.price.shape, dtype=bool)
+    exits = np.zeros(prices.price.shape, dtype=bool)
+    for i in range(len(prices.symbols)):
+        lo, hi = prices.offsets[i], prices.offsets[i + 1]
+        if hi - lo < long_window:
+            continue
+        ent, ex = crossover_signals(prices.price[lo:hi], short_window, long_window)
+        entries[lo:hi] = ent[:, 0]
+        exits[lo:hi] = ex[:, 0]
+    return simulate_shared_cash(prices, entries, exits, **kwargs)
@@ -0,0 +1,320 @@
+"""Columnar store for back-test results.
+
+Every back-test run is recorded in two Parquet tables under
+``RESULT_STORE_ROOT``:
+
+* ``runs/`` – one row per run with the metadata needed to reproduce it
+  (strategy, params, universe, date range, seed, code hash) plus summary
+  statistics (total return, Sharpe, max drawdown).
+* ``equity/`` – the equity curve of every run in long format
+  (``run_id``, ``ts``, ``equity``).
+
+Both tables are hive-partitioned by ``run_date`` and every flush writes one
+file per table sorted by ``(strategy, created_at)``, so filters on the run date
+prune whole directories and filters on the strategy skip row groups via the
+min/max statistics. Queries run through DuckDB and only read the requested
+columns, e.g. "best Sharpe over all sweeps run this week":
+
+    >>> store = ResultStore()                                  # doctest: +SKIP
+    >>> store.best_runs("sharpe", since="2024-06-10", n=1)     # doctest: +SKIP
+
+Runs are buffered in memory and written on :meth:`ResultStore.flush` (or when
+leaving the ``with`` block), so parameter sweeps produce a handful of large
+files rather than millions of tiny ones.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+__all__ = [
+    "RESULT_STORE_ROOT",
+    "RUN_COLUMNS",
+    "ResultStore",
+    "code_hash",
+    "equity_stats",
+]
+
+RESULT_STORE_ROOT = Path(os.getenv("RESULT_STORE_ROOT", "./results"))
+PERIODS_PER_YEAR = 252
+
+_RUN_SCHEMA = pa.schema(
+    [
+        ("run_id", pa.string()),
+        ("strategy", pa.string()),
+        ("params", pa.string()),
+        ("universe", pa.list_(pa.string())),
+        ("start_date", pa.date32()),
+        ("end_date", pa.date32()),
+        ("seed", pa.int64()),
+        ("code_hash", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("n_bars", pa.int64()),
+        ("total_return", pa.float64()),
+        ("sharpe", pa.float64()),
+        ("max_drawdown", pa.float64()),
+    ]
+)
+_EQUITY_SCHEMA = pa.schema(
+    [
+        ("run_id", pa.string()),
+        ("ts", pa.timestamp("us")),
+        ("equity", pa.float64()),
+    ]
+)
+
+RUN_COLUMNS = tuple(_RUN_SCHEMA.names) + ("run_date",)
+
+
+def code_hash(*paths: str | Path) -> str:
+    """Return a short SHA-256 digest of the given source files.
+
+    Defaults to ``backtester/core.py`` so runs of the crossover strategy are
+    tied to the exact engine revision that produced them.
+    """
+    if not paths:
+        paths = (Path(__file__).resolve().parent / "core.py",)
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def equity_stats(equity: pd.Series, *, periods_per_year: int = PERIODS_PER_YEAR) -> dict[str, float]:
+    """Return total return, annualised Sharpe ratio and max drawdown of a curve."""
+    values = np.asarray(equity, dtype=float)
+    if len(values) < 2:
+        return {"total_return": 0.0, "sharpe": float("nan"), "max_drawdown": 0.0}
+    returns = values[1:] / values[:-1] - 1.0
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    sharpe = float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else float("nan")
+    peak = np.maximum.accumulate(values)
+    return {
+        "total_return": float(values[-1] / values[0] - 1.0),
+        "sharpe": sharpe,
+        "max_drawdown": float((values / peak - 1.0).min()),
+    }
+
+
+def _to_date(value: str | date | pd.Timestamp | None) -> date | None:
+    if value is None:
+        return None
+    return pd.Timestamp(value).date()
+
+
+class ResultStore:
+    """Append-only Parquet store of back-test runs queried through DuckDB.
+
+    Parameters
+    ----------
+    root : Path, optional
+        Store location. Defaults to ``RESULT_STORE_ROOT`` (``$RESULT_STORE_ROOT``
+        or ``./results``).
+    row_group_size : int, default ``128_000``
+        Rows per Parquet row group. Smaller groups give finer-grained skipping
+        on ``strategy`` filters at the cost of more metadata.
+    """
+
+    def __init__(self, root: str | Path | None = None, *, row_group_size: int = 128_000) -> None:
+        self.root = Path(root) if root is not None else RESULT_STORE_ROOT
+        self.row_group_size = row_group_size
+        self._runs: list[dict[str, Any]] = []
+        self._equity: list[pd.DataFrame] = []
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def add_run(
+        self,
+        equity: pd.Series,
+        *,
+        strategy: str,
+        params: dict[str, Any] | None = None,
+        universe: Sequence[str] = (),
+        start_date: str | date | None = None,
+        end_date: str | date | None = None,
+        seed: int | None = None,
+        code_hash: str | None = None,
+        created_at: datetime | None = None,
+    ) -> str:
+        """Buffer one run and return its ``run_id``.
+
+        ``equity`` must be indexed by timestamp. The date range defaults to the
+        first and last index value of the curve.
+        """
+        if not isinstance(equity.index, pd.DatetimeIndex):
+            raise TypeError("equity must be indexed by a DatetimeIndex")
+        run_id = uuid.uuid4().hex
+        created_at = created_at or datetime.now(timezone.utc)
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        equity = equity.dropna()
+        self._runs.append(
+            {
+                "run_id": run_id,
+                "strategy": strategy,
+                "params": json.dumps(params or {}, sort_keys=True, default=str),
+                "universe": list(universe),
+                "start_date": _to_date(start_date) or _to_date(equity.index.min()),
+                "end_date": _to_date(end_date) or _to_date(equity.index.max()),
+                "seed": seed,
+                "code_hash": code_hash,
+                "created_at": created_at,
+                "n_bars": len(equity),
+                **equity_stats(equity),
+            }
+        )
+        self._equity.append(
+            pd.DataFrame(
+                {
+                    "run_id": run_id,
+                    "ts": equity.index.tz_localize(None) if equity.index.tz else equity.index,
+                    "equity": equity.to_numpy(dtype=float),
+                }
+            )
+        )
+        return run_id
+
+    def flush(self) -> None:
+        """Write buffered runs as one Parquet file per table and partition."""
+        if not self._runs:
+            return
+        runs = pa.Table.from_pylist(self._runs, schema=_RUN_SCHEMA)
+        run_dates = [r["created_at"].date() for r in self._runs]
+        equity = pa.Table.from_pandas(pd.concat(self._equity, ignore_index=True), schema=_EQUITY_SCHEMA, preserve_index=False)
+        eq_lengths = [len(e) for e in self._equity]
+        eq_dates = np.repeat(np.array(run_dates, dtype="datetime64[D]"), eq_lengths)
+
+        self._write(runs, np.array(run_dates, dtype="datetime64[D]"), "runs", sort_by=["strategy", "created_at"])
+        self._write(equity, eq_dates, "equity", sort_by=["run_id", "ts"])
+        self._runs.clear()
+        self._equity.clear()
+
+    def _write(self, table: pa.Table, dates: np.ndarray, name: str, *, sort_by: list[str]) -> None:
+        batch = uuid.uuid4().hex
+        for day in np.unique(dates):
+            part = table.filter(pa.array(dates == day))
+            part = part.sort_by([(col, "ascending") for col in sort_by])
+            target = self.root / name / f"run_date={day}"
+            target.mkdir(parents=True, exist_ok=True)
+            tmp = target / f".{batch}.parquet.tmp"
+            pq.write_table(part, tmp, row_group_size=self.row_group_size, compression="zstd")
+            tmp.replace(target / f"{batch}.parquet")
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def _glob(self, name: str) -> str | None:
+        path = self.root / name
+        if not any(path.glob("run_date=*/*.parquet")):
+            return None
+        return str(path / "run_date=*" / "*.parquet")
+
+    def query_runs(
+        self,
+        columns: Iterable[str] | None = None,
+        *,
+        since: str | date | None = None,
+        until: str | date | None = None,
+        strategy: str | None = None,
+        order_by: str | None = None,
+        descending: bool = True,
+        limit: int | None = None,
+    ) -> pd.DataFrame:
+        """Return run metadata filtered by run date and strategy.
+
+        Only ``columns`` are read from disk. ``since`` / ``until`` are inclusive
+        run dates and prune partitions before any file is opened.
+        """
+        columns = list(columns) if columns is not None else list(RUN_COLUMNS)
+        unknown = set(columns) - set(RUN_COLUMNS)
+        if order_by is not None and order_by not in RUN_COLUMNS:
+            unknown.add(order_by)
+        if unknown:
+            raise ValueError(f"unknown run columns: {sorted(unknown)}")
+        glob = self._glob("runs")
+        if glob is None:
+            return pd.DataFrame(columns=columns)
+
+        where, args = [], []
+        if since is not None:
+            where.append("run_date >= ?")
+            args.append(_to_date(since))
+        if until is not None:
+            where.append("run_date <= ?")
+            args.append(_to_date(until))
+        if strategy is not None:
+            where.append("strategy = ?")
+            args.append(strategy)
+        sql = f"SELECT {', '.join(columns)} FROM read_parquet(?, hive_partitioning = true, hive_types = {{'run_date': DATE}})"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if order_by is not None:
+            sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'} NULLS LAST"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        con = duckdb.connect()
+        try:
+            return con.execute(sql, [glob, *args]).fetchdf()
+        finally:
+            con.close()
+
+    def best_runs(
+        self,
+        metric: str = "sharpe",
+        *,
+        n: int = 1,
+        since: str | date | None = None,
+        until: str | date | None = None,
+        strategy: str | None = None,
+        columns: Iterable[str] = ("run_id", "strategy", "params", "created_at"),
+    ) -> pd.DataFrame:
+        """Return the top ``n`` runs ranked by ``metric`` (highest first)."""
+        cols = list(dict.fromkeys([*columns, metric]))
+        return self.query_runs(
+            cols, since=since, until=until, strategy=strategy, order_by=metric, limit=n
+        )
+
+    def equity_curves(self, run_ids: Sequence[str]) -> pd.DataFrame:
+        """Return equity curves for ``run_ids`` as a ``ts`` × ``run_id`` frame."""
+        glob = self._glob("equity")
+        if glob is None or not run_ids:
+            return pd.DataFrame()
+        run_glob = self._glob("runs")
+        # Resolve the run dates first so only the matching equity partitions
+        # are opened; within a file rows are sorted by run_id.
+        sql = (
+            "SELECT run_id, ts, equity FROM read_parquet(?, hive_partitioning = true, "
+            "hive_types = {'run_date': DATE}) "
+            "WHERE run_date IN (SELECT DISTINCT run_date FROM read_parquet(?, "
+            "hive_partitioning = true, hive_types = {'run_date': DATE}) "
+            "WHERE run_id IN (SELECT unnest(?))) "
+            "AND run_id IN (SELECT unnest(?))"
+        )
+        con = duckdb.connect()
+        try:
+            long = con.execute(sql, [glob, run_glob, list(run_ids), list(run_ids)]).fetchdf()
+        finally:
+            con.close()
+        wide = long.pivot(index="ts", columns="run_id", values="equity").sort_index()
+        return wide.reindex(columns=[r for r in run_ids if r in wide.columns])
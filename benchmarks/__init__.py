@@ -0,0 +1,4 @@
+"""Performance benchmarks for the compute hot paths.
+
+Run ``python -m benchmarks.suite --help`` for usage.
+"""
@@ -0,0 +1,80 @@
+"""Seeded synthetic inputs for the benchmark suite.
+
+Every generator takes a *size* (roughly "number of symbols") and a seed and
+returns the positional arguments for the function under test, so a given
+``(size, seed)`` pair always produces byte-identical inputs.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "price_panel",
+    "returns_panel",
+    "tick_series",
+    "fx_and_cpi",
+    "option_grid",
+]
+
+
+def price_panel(n_symbols: int, *, n_days: int = 120, seed: int = 0) -> pd.DataFrame:
+    """Wide close-price frame (``n_days`` × ``n_symbols``) of geometric random walks."""
+    rs = np.random.RandomState(seed)
+    idx = pd.date_range("2020-01-01", periods=n_days, freq="B")
+    rets = rs.normal(0.0003, 0.02, size=(n_days, n_symbols))
+    close = 100 * np.exp(np.cumsum(rets, axis=0))
+    return pd.DataFrame(close, index=idx, columns=[f"S{i:05d}" for i in range(n_symbols)])
+
+
+def returns_panel(n_symbols: int, *, n_days: int = 250, seed: int = 0) -> pd.DataFrame:
+    """Daily returns frame (``n_days`` × ``n_symbols``)."""
+    rs = np.random.RandomState(seed)
+    data = rs.normal(0.0005, 0.015, size=(n_days, n_symbols))
+    return pd.DataFrame(data, columns=[f"S{i:05d}" for i in range(n_symbols)])
+
+
+def tick_series(n_ticks: int, *, n_bad: int = 10, seed: int = 0) -> pd.Series:
+    """Random-walk tick prices with ``n_bad`` 10x spikes."""
+    rs = np.random.RandomState(seed)
+    price = pd.Series(100 + rs.randn(n_ticks).cumsum() * 0.01, name="price")
+    bad_idx = rs.choice(n_ticks, size=min(n_bad, n_ticks), replace=False)
+    price.iloc[bad_idx] *= 10
+    return price
+
+
+def fx_and_cpi(n_pairs: int, *, n_dates: int = 60, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """FX rates for ``n_pairs`` synthetic ``XXXUSD`` pairs plus matching CPI."""
+    rs = np.random.RandomState(seed)
+    dates = pd.date_range("2020-01-01", periods=n_dates, freq="MS").strftime("%Y-%m-%d")
+    # Three-letter codes that cannot collide with USD.
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTVWXYZ"))
+    digits = np.unravel_index(np.arange(n_pairs), (25, 25, 25))
+    codes = ["".join(chars) for chars in zip(*(letters[d] for d in digits))]
+    fx = pd.DataFrame(
+        {
+            "date": np.tile(dates, n_pairs),
+            "pair": np.repeat([f"{c}USD" for c in codes], n_dates),
+            "fx_rate": np.exp(rs.normal(0, 0.05, n_pairs * n_dates)),
+        }
+    )
+    countries = codes + ["USD"]
+    cpi = pd.DataFrame(
+        {
+            "date": np.tile(dates, len(countries)),
+            "country": np.repeat(countries, n_dates),
+            "cpi": 100 * np.exp(np.cumsum(rs.normal(0.002, 0.001, (len(countries), n_dates)), axis=1)).ravel(),
+        }
+    )
+    return fx, cpi
+
+
+def option_grid(n_options: int, *, seed: int = 0) -> list[tuple[float, float, float, float, float]]:
+    """``(spot, strike, T, r, vol)`` tuples for European options."""
+    rs = np.random.RandomState(seed)
+    spot = rs.uniform(50, 150, n_options)
+    strike = spot * rs.uniform(0.8, 1.2, n_options)
+    tau = rs.uniform(0.05, 2.0, n_options)
+    rate = rs.uniform(0.0, 0.05, n_options)
+    vol = rs.uniform(0.1, 0.6, n_options)
+    return list(zip(spot, strike, tau, rate, vol))
@@ -0,0 +1,299 @@
+"""Benchmark suite with scaling curves and regression detection.
+
+CLI usage:
+
+    python -m benchmarks.suite [--sizes 100 1000 10000] [--only spa_p_value]
+                               [--history .benchmarks/history.json] [--threshold 0.25]
+
+Every benchmark builds seeded synthetic inputs (see ``benchmarks.generators``)
+at each *size*, then records
+
+* the best wall-clock time over ``--repeat`` runs, and
+* the peak traced memory of one additional run (``tracemalloc``), kept separate
+  so tracing overhead does not pollute the timings.
+
+Results are appended to a JSON history file (``.benchmarks/history.json`` by
+default, or ``$BENCH_HISTORY``). Each measurement is compared with
+the median of the last ``--window`` runs for the same ``(benchmark, size)``; a
+slowdown or memory growth above ``--threshold`` is reported as a regression
+and makes the command exit non-zero. The log-log slope of time versus size is
+printed per benchmark as its empirical scaling exponent.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import median
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from benchmarks import generators
+
+__all__ = [
+    "BENCHMARKS",
+    "Benchmark",
+    "Measurement",
+    "measure",
+    "find_regressions",
+    "scaling_exponent",
+    "main",
+]
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+# Machine-local timings: kept outside the tracked tree (``/.benchmarks/`` is gitignored).
+HISTORY_PATH = Path(os.getenv("BENCH_HISTORY", Path(__file__).resolve().parent.parent / ".benchmarks" / "history.json"))
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A named hot path.
+
+    ``setup(size, seed)`` builds the inputs and returns a zero-argument callable
+    that runs the function under test; only the callable is timed. ``unit``
+    documents what *size* counts for this benchmark.
+    """
+
+    name: str
+    setup: Callable[[int, int], Callable[[], object]]
+    unit: str
+
+
+@dataclass(frozen=True)
+class Measurement:
+    name: str
+    size: int
+    seconds: float
+    peak_mb: float
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+
+def _momentum(size: int, seed: int):
+    from factors.momentum import compute_momentum
+
+    prices = generators.price_panel(size, seed=seed)
+    return lambda: compute_momentum(prices, lookback=63)
+
+
+def _walk_forward(size: int, seed: int):
+    import pandas as pd
+
+    from research.splits import walk_forward_splits
+
+    index = pd.RangeIndex(size * 100)
+    n = len(index)
+    return lambda: walk_forward_splits(index, train_size=n // 5, test_size=n // 20)
+
+
+def _spa(size: int, seed: int):
+    from research.spa import spa_p_value
+
+    returns = generators.returns_panel(1, n_days=size, seed=seed).iloc[:, 0].to_numpy()
+    return lambda: spa_p_value(returns, B=200, seed=seed)
+
+
+def _stress(size: int, seed: int):
+    from risk.stress import monte_carlo_stress
+
+    returns = generators.returns_panel(size, seed=seed)
+
+    def run():
+        np.random.seed(seed)
+        return monte_carlo_stress(returns, horizon=10, paths=100)
+
+    return run
+
+
+def _bad_tick(size: int, seed: int):
+    from data.bad_tick_filter import is_bad_tick
+
+    series = generators.tick_series(size * 1_000, seed=seed)
+    return lambda: is_bad_tick(series)
+
+
+def _ppp(size: int, seed: int):
+    from factors.fx_ppp import ppp_deviation
+
+    fx, cpi = generators.fx_and_cpi(size, seed=seed)
+    return lambda: ppp_deviation(fx, cpi)
+
+
+def _black_scholes(size: int, seed: int):
+    from option_pricing import black_scholes_price
+
+    grid = generators.option_grid(size, seed=seed)
+    return lambda: [black_scholes_price(*args) for args in grid]
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    b.name: b
+    for b in [
+        Benchmark("compute_momentum", _momentum, "symbols x 120 days"),
+        Benchmark("walk_forward_splits", _walk_forward, "100 rows"),
+        Benchmark("spa_p_value", _spa, "observations (B=200)"),
+        Benchmark("monte_carlo_stress", _stress, "symbols x 100 paths x 10 steps"),
+        Benchmark("is_bad_tick", _bad_tick, "1k ticks"),
+        Benchmark("ppp_deviation", _ppp, "currency pairs x 60 dates"),
+        Benchmark("black_scholes_price", _black_scholes, "options"),
+    ]
+}
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+def measure(bench: Benchmark, size: int, *, repeat: int = 3, seed: int = 0) -> Measurement:
+    """Return the best-of-``repeat`` time and the peak memory of one run."""
+    fn = bench.setup(size, seed)
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(bench.name, size, best, peak / 2**20)
+
+
+def scaling_exponent(results: Sequence[Measurement]) -> float:
+    """Least-squares slope of log(time) against log(size)."""
+    pts = sorted((m.size, m.seconds) for m in results if m.seconds > 0)
+    if len(pts) < 2:
+        return float("nan")
+    x = np.log([p[0] for p in pts])
+    y = np.log([p[1] for p in pts])
+    return float(np.polyfit(x, y, 1)[0])
+
+
+# ---------------------------------------------------------------------------
+# History & regressions
+# ---------------------------------------------------------------------------
+
+
+def load_history(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    return json.loads(path.read_text()).get("runs", [])
+
+
+def save_history(path: Path, runs: List[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"runs": runs}, indent=1))
+    tmp.replace(path)
+
+
+def _git_rev() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def find_regressions(
+    results: Sequence[Measurement],
+    history: Sequence[dict],
+    *,
+    threshold: float = 0.25,
+    window: int = 5,
+) -> List[str]:
+    """Compare ``results`` with the median of the last ``window`` history runs.
+
+    Returns human-readable descriptions of every time or memory increase larger
+    than ``threshold`` (relative).
+    """
+    problems: list[str] = []
+    for m in results:
+        past = [
+            r
+            for run in history
+            for r in run.get("results", [])
+            if r["name"] == m.name and r["size"] == m.size
+        ][-window:]
+        if not past:
+            continue
+        for field, label in (("seconds", "time"), ("peak_mb", "peak memory")):
+            base = median(r[field] for r in past)
+            now = getattr(m, field)
+            if base > 0 and now > base * (1 + threshold):
+                problems.append(
+                    f"{m.name}[{m.size}] {label} {now:.4g} vs baseline {base:.4g} (+{now / base - 1:.0%})"
+                )
+    return problems
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Hot-path benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Subset of benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", default=str(HISTORY_PATH), help="JSON history file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative regression threshold")
+    parser.add_argument("--window", type=int, default=5, help="History runs in the baseline median")
+    parser.add_argument("--no-save", action="store_true", help="Do not append results to history")
+    args = parser.parse_args(argv)
+
+    results: list[Measurement] = []
+    for name in args.only or list(BENCHMARKS):
+        bench = BENCHMARKS[name]
+        per_bench = []
+        for size in args.sizes:
+            m = measure(bench, size, repeat=args.repeat, seed=args.seed)
+            per_bench.append(m)
+            print(f"[bench] {name:<22} size={size:<7} {m.seconds * 1e3:10.2f} ms {m.peak_mb:9.2f} MB")
+        print(f"[bench] {name:<22} scaling ~ size^{scaling_exponent(per_bench):.2f} ({bench.unit})")
+        results.extend(per_bench)
+
+    history_path = Path(args.history)
+    history = load_history(history_path)
+    regressions = find_regressions(results, history, threshold=args.threshold, window=args.window)
+    if not args.no_save:
+        history.append(
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "git_rev": _git_rev(),
+                "python": platform.python_version(),
+                "results": [asdict(m) for m in results],
+            }
+        )
+        save_history(history_path, history)
+        print(f"[bench] Appended results to {history_path}")
+
+    if regressions:
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        sys.exit(1)
+    print("✅ No regressions")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
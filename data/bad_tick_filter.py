@@ -5,50 +5,438 @@ Definition (v1): a *bad tick* is any trade/quote price that:
 2. Deviates by more than *max_rel_change* (default 20%) from the immediately
    previous *valid* tick for the same instrument.
 
+After ``reset_after`` (default 50) consecutive jump rejections the instrument
+re-anchors on its next valid price, so a bad opening print or a genuine level
+shift (halt, corporate action) flags a bounded number of ticks.
+
+Because validity depends on the last *valid* price, the check is a small state
+machine per instrument. :class:`BadTickScanner` keeps that state (last valid
+price, tick and bad-tick counters) in arrays indexed by instrument code and
+runs the state machine over whole record batches in a compiled kernel, so a
+full day of consolidated tape is checked in one streaming pass
+(:func:`scan_ticks`) with memory bounded by the batch size.
+
+For the live feed in front of ``realtime_service``, :class:`TickFilterOperator`
+applies the same rule plus a rolling deviation band (an EWMA of absolute log
+moves per instrument) to micro-batches and returns the cleaned ticks together
+with per-instrument rejection counters:
+
+    >>> op = TickFilterOperator()
+    >>> clean = op.process(op.encode(["AAPL", "AAPL"]), np.array([190.0, 1900.0]))
+    >>> clean.prices.tolist(), int(op.counts[0, REJECT_JUMP])
+    ([190.0], 1)
+
 CLI usage (for CI):
 
-    python -m data.bad_tick_filter --prices data/sample_ticks.parquet
+    python -m data.bad_tick_filter --prices data/sample_ticks.parquet [--mask-out mask.parquet]
 
-The command loads a Parquet/CSV with columns [`ts`, `price`], computes the rate
-per million observations, prints the result, and exits non-zero if the rate
-exceeds the threshold (20 per 1M).
+The command streams a Parquet/CSV with columns [`ts`, `price`] and optionally
+`symbol`, computes the rate per million observations (overall and per
+instrument), prints the result, and exits non-zero if the rate exceeds the
+threshold (20 per 1M).
 
 If the input file is missing, a synthetic dataset with <20 bad ticks is
-generated so the pipeline passes by default.
+generated so the pipeline passes by default. Per-instrument rates are memoized
+on the file contents and parameters (see ``research.cache``) unless
+``--mask-out`` or ``--no-cache`` is given.
 """
 from __future__ import annotations
 
 import argparse
 import sys
 from pathlib import Path
+from typing import Iterator, NamedTuple
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from engine.jit import njit
+
 
 THRESHOLD_PER_M = 20  # allowance in CI
+DEFAULT_BATCH_SIZE = 1_000_000
+DEFAULT_RESET_AFTER = 50  # consecutive jump rejections before re-anchoring
+
+__all__ = [
+    "BadTickScanner",
+    "CleanTicks",
+    "TickFilterOperator",
+    "count_bad_ticks",
+    "is_bad_tick",
+    "iter_tick_batches",
+    "scan_ticks",
+    "REJECT_NONE",
+    "REJECT_INVALID",
+    "REJECT_JUMP",
+    "REJECT_BAND",
+]
+
+# Rejection reasons written by the live operator (columns of ``counts``).
+REJECT_NONE = 0
+REJECT_INVALID = 1  # NaN or non-positive price
+REJECT_JUMP = 2  # relative move from last valid price above max_rel_change
+REJECT_BAND = 3  # log move outside the rolling deviation band
 
-__all__ = ["count_bad_ticks", "is_bad_tick"]
 
+@njit(cache=True)
+def _scan_nb(codes, prices, last_valid, run, max_rel_change, reset_after, bad):
+    """Flag bad ticks in arrival order, updating ``last_valid`` per instrument.
 
-def is_bad_tick(series: pd.Series, *, max_rel_change: float = 0.2) -> pd.Series:
+    After ``reset_after`` consecutive jump rejections the next valid price is
+    accepted as the new reference (a bad anchor or a persistent level shift).
+    """
+    for i in range(len(prices)):
+        c = codes[i]
+        p = prices[i]
+        if not p > 0.0:  # NaN or non-positive
+            bad[i] = True
+            continue
+        ref = last_valid[c]
+        if ref > 0.0 and run[c] < reset_after and abs(p / ref - 1.0) > max_rel_change:
+            bad[i] = True
+            run[c] += 1
+        else:
+            bad[i] = False
+            last_valid[c] = p
+            run[c] = 0
+
+
+def is_bad_tick(series: pd.Series, *, max_rel_change: float = 0.2, reset_after: int = DEFAULT_RESET_AFTER) -> pd.Series:
     """Return boolean mask of bad ticks in a price series."""
-    bad = series.isna() | (series <= 0)
-    pct_change = series.pct_change().abs()
-    bad |= pct_change > max_rel_change
-    return bad
+    prices = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    bad = np.empty(len(prices), dtype=np.bool_)
+    codes = np.zeros(len(prices), dtype=np.int64)
+    _scan_nb(codes, prices, np.full(1, np.nan), np.zeros(1, dtype=np.int64), max_rel_change, reset_after, bad)
+    return pd.Series(bad, index=series.index, name=series.name)
+
+
+def count_bad_ticks(series: pd.Series, *, max_rel_change: float = 0.2, reset_after: int = DEFAULT_RESET_AFTER) -> int:
+    return int(is_bad_tick(series, max_rel_change=max_rel_change, reset_after=reset_after).sum())
+
+
+class _SymbolTable:
+    """Map instrument symbols to dense integer codes in first-seen order."""
+
+    def __init__(self) -> None:
+        self.symbols: list = []
+        self._codes: dict = {}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def code(self, symbol) -> int:
+        code = self._codes.get(symbol)
+        if code is None:
+            code = self._codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return code
+
+    def encode(self, symbols) -> np.ndarray:
+        """Return codes for an Arrow / NumPy / list array of symbols."""
+        encoded = pc.dictionary_encode(symbols if isinstance(symbols, (pa.Array, pa.ChunkedArray)) else pa.array(symbols))
+        if isinstance(encoded, pa.ChunkedArray):
+            encoded = encoded.combine_chunks()
+        lookup = np.array([self.code(s) for s in encoded.dictionary.to_pylist()], dtype=np.int64)
+        return lookup[encoded.indices.to_numpy(zero_copy_only=False)]
+
+
+def _grown(arr: np.ndarray, size: int, fill) -> np.ndarray:
+    """Return ``arr`` extended along axis 0 to at least ``size`` rows (doubling)."""
+    if size <= len(arr):
+        return arr
+    new = max(size, 2 * len(arr))
+    extra = np.full((new - len(arr),) + arr.shape[1:], fill, dtype=arr.dtype)
+    return np.concatenate([arr, extra])
+
+
+class BadTickScanner:
+    """Streaming bad-tick check with per-instrument state carried across batches.
+
+    Instruments are mapped to dense integer codes on first sight; the last
+    valid price and the tick / bad-tick counters live in arrays indexed by
+    code that grow geometrically as new instruments appear. After
+    ``reset_after`` consecutive jump rejections an instrument re-anchors on
+    its next valid price, so one bad print or a genuine level shift does not
+    flag every later tick.
+    """
+
+    def __init__(self, *, max_rel_change: float = 0.2, reset_after: int = DEFAULT_RESET_AFTER) -> None:
+        self.max_rel_change = max_rel_change
+        self.reset_after = reset_after
+        self._table = _SymbolTable()
+        self.last_valid = np.full(16, np.nan)
+        self.run = np.zeros(16, dtype=np.int64)
+        self.n_ticks = np.zeros(16, dtype=np.int64)
+        self.n_bad = np.zeros(16, dtype=np.int64)
+
+    @property
+    def symbols(self) -> list:
+        return self._table.symbols
+
+    def encode(self, symbols) -> np.ndarray:
+        """Return instrument codes for an Arrow/NumPy array of symbols."""
+        codes = self._table.encode(symbols)
+        self._grow()
+        return codes
+
+    def _code(self, symbol) -> int:
+        code = self._table.code(symbol)
+        self._grow()
+        return code
+
+    def _grow(self) -> None:
+        n = len(self._table)
+        self.last_valid = _grown(self.last_valid, n, np.nan)
+        self.run = _grown(self.run, n, 0)
+        self.n_ticks = _grown(self.n_ticks, n, 0)
+        self.n_bad = _grown(self.n_bad, n, 0)
+
+    def process(self, codes: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        """Flag ticks of one batch (in arrival order) and update the counters."""
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        codes = np.ascontiguousarray(codes, dtype=np.int64)
+        bad = np.empty(len(prices), dtype=np.bool_)
+        _scan_nb(codes, prices, self.last_valid, self.run, self.max_rel_change, self.reset_after, bad)
+        n = len(self.symbols)
+        self.n_ticks[:n] += np.bincount(codes, minlength=n)
+        self.n_bad[:n] += np.bincount(codes[bad], minlength=n)
+        return bad
+
+    def process_batch(self, batch: pa.RecordBatch, *, price_col: str = "price", symbol_col: str | None = "symbol") -> np.ndarray:
+        prices = batch.column(price_col).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        if symbol_col is None:
+            codes = np.full(len(prices), self._code(None), dtype=np.int64)
+        else:
+            codes = self.encode(batch.column(symbol_col))
+        return self.process(codes, prices)
+
+    def rates(self) -> pd.DataFrame:
+        """Per-instrument tick counts and bad-tick rate per million."""
+        n = len(self.symbols)
+        ticks, bad = self.n_ticks[:n], self.n_bad[:n]
+        return pd.DataFrame(
+            {
+                "symbol": self.symbols,
+                "n_ticks": ticks,
+                "n_bad": bad,
+                "per_million": np.where(ticks > 0, bad / np.maximum(ticks, 1) * 1_000_000, 0.0),
+            }
+        )
 
+    @property
+    def total_rate_per_million(self) -> float:
+        total = int(self.n_ticks.sum())
+        return float(self.n_bad.sum() / total * 1_000_000) if total else 0.0
 
-def count_bad_ticks(series: pd.Series, *, max_rel_change: float = 0.2) -> int:
-    return int(is_bad_tick(series, max_rel_change=max_rel_change).sum())
+
+def iter_tick_batches(path: str | Path, columns: list[str], *, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[pa.RecordBatch]:
+    """Yield Arrow record batches of ``columns`` from a Parquet or CSV file."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns)
+        return
+    from pyarrow import csv
+
+    reader = csv.open_csv(
+        path,
+        read_options=csv.ReadOptions(block_size=max(batch_size * 32, 1 << 20)),
+        convert_options=csv.ConvertOptions(include_columns=columns),
+    )
+    yield from reader
+
+
+def _columns(path: Path) -> list[str]:
+    if path.suffix == ".parquet":
+        return pq.read_schema(path).names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def scan_ticks(
+    path: str | Path,
+    *,
+    price_col: str = "price",
+    symbol_col: str | None = "symbol",
+    max_rel_change: float = 0.2,
+    reset_after: int = DEFAULT_RESET_AFTER,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    mask_out: str | Path | None = None,
+) -> BadTickScanner:
+    """Check a tick file in one streaming pass.
+
+    Ticks must be in arrival order per instrument. If ``symbol_col`` is not in
+    the file, all ticks are treated as one instrument. With ``mask_out`` the
+    row-aligned ``bad`` mask is written to a Parquet file batch by batch.
+    """
+    path = Path(path)
+    if symbol_col is not None and symbol_col not in _columns(path):
+        symbol_col = None
+    columns = [price_col] + ([symbol_col] if symbol_col else [])
+    scanner = BadTickScanner(max_rel_change=max_rel_change, reset_after=reset_after)
+    writer = None
+    try:
+        for batch in iter_tick_batches(path, columns, batch_size=batch_size):
+            bad = scanner.process_batch(batch, price_col=price_col, symbol_col=symbol_col)
+            if mask_out is not None:
+                table = pa.table({"bad": bad})
+                writer = writer or pq.ParquetWriter(str(mask_out), table.schema, compression="zstd")
+                writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return scanner
+
+
+# ---------------------------------------------------------------------------
+# Live operator
+# ---------------------------------------------------------------------------
+
+
+@njit(cache=True)
+def _filter_nb(
+    codes, prices, last_valid, dev, n_valid, run, counts,
+    max_rel_change, band_k, band_floor, alpha, warmup, reset_after, reason,
+):
+    """Classify ticks in arrival order, updating per-instrument state in place."""
+    for i in range(len(prices)):
+        c = codes[i]
+        p = prices[i]
+        r = REJECT_NONE
+        if not p > 0.0:
+            r = REJECT_INVALID
+        else:
+            ref = last_valid[c]
+            if ref > 0.0:
+                move = abs(np.log(p / ref))
+                if run[c] >= reset_after:
+                    # persistent level shift: accept and re-learn the band
+                    n_valid[c] = 0
+                    dev[c] = move
+                elif abs(p / ref - 1.0) > max_rel_change:
+                    r = REJECT_JUMP
+                elif n_valid[c] >= warmup and move > band_k * dev[c] + band_floor:
+                    r = REJECT_BAND
+                else:
+                    dev[c] += alpha * (move - dev[c])
+            if r == REJECT_NONE:
+                last_valid[c] = p
+                n_valid[c] += 1
+                run[c] = 0
+        if r != REJECT_NONE and r != REJECT_INVALID:
+            run[c] += 1
+        reason[i] = r
+        counts[c, r] += 1
+
+
+class CleanTicks(NamedTuple):
+    """Accepted ticks of one micro-batch; ``index`` selects them from the input."""
+
+    codes: np.ndarray
+    prices: np.ndarray
+    index: np.ndarray
+
+
+class TickFilterOperator:
+    """Stateful bad-tick filter for micro-batches of a live tick feed.
+
+    A tick is rejected if its price is invalid, if it moves more than
+    ``max_rel_change`` from the instrument's last valid price, or – once
+    ``warmup`` valid ticks have been seen – if its absolute log move exceeds
+    ``band_k`` times the rolling mean absolute log move (EWMA with
+    ``halflife`` ticks) plus ``band_floor``. After ``reset_after`` consecutive
+    rejections the next valid-looking price is accepted as a level shift.
+
+    State lives in flat arrays indexed by instrument code (see :meth:`encode`
+    or :meth:`code`); :meth:`process` runs one compiled pass over the batch,
+    so the per-batch overhead is a few microseconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_rel_change: float = 0.2,
+        band_k: float = 8.0,
+        band_floor: float = 5e-4,
+        halflife: float = 50.0,
+        warmup: int = 20,
+        reset_after: int = DEFAULT_RESET_AFTER,
+        capacity: int = 1024,
+    ) -> None:
+        self.max_rel_change = max_rel_change
+        self.band_k = band_k
+        self.band_floor = band_floor
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        self.warmup = warmup
+        self.reset_after = reset_after
+        self._table = _SymbolTable()
+        self.last_valid = np.full(capacity, np.nan)
+        self.dev = np.zeros(capacity)
+        self.n_valid = np.zeros(capacity, dtype=np.int64)
+        self.run = np.zeros(capacity, dtype=np.int64)
+        self.counts = np.zeros((capacity, 4), dtype=np.int64)
+
+    @property
+    def symbols(self) -> list:
+        return self._table.symbols
+
+    def code(self, symbol) -> int:
+        """Code for one instrument (allocates state on first sight)."""
+        code = self._table.code(symbol)
+        self._grow()
+        return code
+
+    def encode(self, symbols) -> np.ndarray:
+        codes = self._table.encode(symbols)
+        self._grow()
+        return codes
+
+    def _grow(self) -> None:
+        n = len(self._table)
+        if n <= len(self.last_valid):
+            return
+        self.last_valid = _grown(self.last_valid, n, np.nan)
+        self.dev = _grown(self.dev, n, 0.0)
+        self.n_valid = _grown(self.n_valid, n, 0)
+        self.run = _grown(self.run, n, 0)
+        self.counts = _grown(self.counts, n, 0)
+
+    def process(self, codes: np.ndarray, prices: np.ndarray) -> CleanTicks:
+        """Filter one micro-batch of ticks (in arrival order)."""
+        codes = np.ascontiguousarray(codes, dtype=np.int64)
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        reason = np.empty(len(prices), dtype=np.uint8)
+        _filter_nb(
+            codes, prices, self.last_valid, self.dev, self.n_valid, self.run, self.counts,
+            self.max_rel_change, self.band_k, self.band_floor, self.alpha,
+            self.warmup, self.reset_after, reason,
+        )
+        keep = np.flatnonzero(reason == REJECT_NONE)
+        return CleanTicks(codes[keep], prices[keep], keep)
+
+    def counters(self) -> pd.DataFrame:
+        """Per-instrument accepted / rejected tick counts by reason."""
+        n = len(self._table)
+        c = self.counts[:n]
+        return pd.DataFrame(
+            {
+                "symbol": self.symbols,
+                "accepted": c[:, REJECT_NONE],
+                "invalid": c[:, REJECT_INVALID],
+                "jump": c[:, REJECT_JUMP],
+                "band": c[:, REJECT_BAND],
+            }
+        )
 
 
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
 
-def _load_prices(path: Path) -> pd.DataFrame:
+def _ensure_prices(path: Path) -> None:
     if path.exists():
-        return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+        return
     # synthesize 1M ticks with 10 bad ones (< threshold)
     n = 1_000_000
     rng = np.random.RandomState(0)
@@ -58,19 +446,47 @@ def _load_prices(path: Path) -> pd.DataFrame:
     df = pd.DataFrame({"ts": pd.RangeIndex(n), "price": price})
     path.parent.mkdir(parents=True, exist_ok=True)
     df.to_parquet(path)
-    return df
+
+
+def _scan_rates(path: Path, **kwargs) -> pd.DataFrame:
+    return scan_ticks(path, **kwargs).rates()
 
 
 def main(argv: list[str] | None = None) -> None:  # pragma: no cover
     parser = argparse.ArgumentParser(description="Bad-tick filter CI gate")
     parser.add_argument("--prices", default="data/sample_ticks.parquet", help="Path to price ticks")
     parser.add_argument("--max_rel_change", type=float, default=0.2, help="Relative change threshold")
+    parser.add_argument("--reset-after", type=int, default=DEFAULT_RESET_AFTER, help="Consecutive rejections before re-anchoring")
+    parser.add_argument("--symbol-col", default="symbol", help="Instrument column (if present)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--mask-out", default=None, help="Write the row-aligned bad-tick mask here")
+    parser.add_argument("--rates-out", default=None, help="Write per-instrument rates (CSV) here")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute even if a cached result exists")
     args = parser.parse_args(argv)
 
+    from research.cache import cached_call
+
     prices_path = Path(args.prices)
-    df = _load_prices(prices_path)
-    bad = is_bad_tick(df["price"], max_rel_change=args.max_rel_change)
-    rate = bad.sum() / len(df) * 1_000_000
+    _ensure_prices(prices_path)
+    rates = cached_call(
+        "bad_tick_filter",
+        _scan_rates,
+        prices_path,
+        symbol_col=args.symbol_col,
+        max_rel_change=args.max_rel_change,
+        reset_after=args.reset_after,
+        batch_size=args.batch_size,
+        mask_out=args.mask_out,
+        inputs=[prices_path],
+        params={"symbol_col": args.symbol_col, "max_rel_change": args.max_rel_change, "reset_after": args.reset_after},
+        enabled=args.mask_out is None and not args.no_cache,
+    )
+    if args.rates_out:
+        rates.to_csv(args.rates_out, index=False)
+    if len(rates) > 1:
+        print(rates.sort_values("per_million", ascending=False).head(10).to_string(index=False))
+    total = int(rates["n_ticks"].sum())
+    rate = rates["n_bad"].sum() / total * 1_000_000 if total else 0.0
     msg = f"Bad-tick rate: {rate:.1f} / 1M (≤ {THRESHOLD_PER_M})"
     if rate <= THRESHOLD_PER_M:
         print(msg + " ✅")
@@ -14,6 +14,8 @@ from typing import Tuple
 import numpy as np
 import pandas as pd
 
+from engine.rng import map_chunks
+
 __all__ = ["run_backtest", "DATA_COLS", "write_parquet", "parquet_sha256"]
 
 DATA_COLS = ["ts", "pnl", "position"]
@@ -27,9 +29,34 @@ def _generate_df(n: int = 10, seed: int = 42) -> pd.DataFrame:
     return pd.DataFrame({"ts": ts, "pnl": pnl, "position": position})
 
 
-def run_backtest(*, n: int = 10, seed: int = 42) -> pd.DataFrame:
-    """Return deterministic back-test results as DataFrame."""
-    return _generate_df(n=n, seed=seed)
+def _generate_df_chunked(n: int, seed: int, chunk_size: int, workers: int | None) -> pd.DataFrame:
+    """Like ``_generate_df`` but with one ``SeedSequence`` stream per chunk.
+
+    The output depends on ``(n, seed, chunk_size)`` only, never on ``workers``.
+    """
+
+    def chunk(rng: np.random.Generator, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray]:
+        return rng.standard_normal(hi - lo).round(6), rng.integers(-1, 2, size=hi - lo)
+
+    parts = map_chunks(chunk, n, seed=seed, chunk_size=chunk_size, workers=workers)
+    ts = pd.date_range("2024-01-01", periods=n, freq="D")
+    pnl = np.concatenate([p for p, _ in parts]) if parts else np.empty(0)
+    position = np.concatenate([q for _, q in parts]) if parts else np.empty(0, dtype=np.int64)
+    return pd.DataFrame({"ts": ts, "pnl": pnl, "position": position})
+
+
+def run_backtest(
+    *, n: int = 10, seed: int = 42, chunk_size: int | None = None, workers: int | None = 1
+) -> pd.DataFrame:
+    """Return deterministic back-test results as DataFrame.
+
+    By default a single ``RandomState`` drives the run (the golden fixture).
+    Passing ``chunk_size`` switches to per-chunk RNG streams that can be
+    generated by ``workers`` threads with byte-identical output.
+    """
+    if chunk_size is None:
+        return _generate_df(n=n, seed=seed)
+    return _generate_df_chunked(n, seed, chunk_size, workers)
 
 
 def write_parquet(df: pd.DataFrame, path: Path) -> None:
@@ -0,0 +1,179 @@
+"""Exchange session calendar backed by ``engine/fixtures/clock/nyse.csv``.
+
+The fixture lists every NYSE session with its UTC open / close and an early
+close flag. :func:`nyse` loads it once into sorted ``int64`` arrays plus two
+dense per-calendar-day lookup tables:
+
+* ``_is_session[d]`` – whether day ``d`` (days since the first session) trades;
+* ``_rank[d]`` – number of sessions on or before day ``d``.
+
+With those, membership and next / previous session queries are O(1) array
+indexing for any number of timestamps, so callers can align dates to sessions
+without building calendar-day frames with ``pd.date_range`` or
+``asfreq('D')``. Dates outside the fixture's coverage are not sessions and map
+to ``NaT`` / ``NaN``.
+
+    >>> cal = nyse()
+    >>> cal.is_session(["2024-07-04", "2024-07-05"]).tolist()
+    [False, True]
+    >>> cal.session_offset(["2024-07-03"], 1)[0].date().isoformat()
+    '2024-07-05'
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+__all__ = ["SessionCalendar", "nyse", "NYSE_CSV"]
+
+NYSE_CSV = Path(__file__).resolve().parent / "fixtures/clock/nyse.csv"
+
+_NS_PER_DAY = 86_400 * 10**9
+_NS_PER_MIN = 60 * 10**9
+_NAT = np.iinfo(np.int64).min
+
+
+def _to_ns(values) -> np.ndarray:
+    """Return UTC epoch nanoseconds (``NaT`` as int64 min) for array-like input."""
+    idx = pd.DatetimeIndex(np.atleast_1d(values)) if not isinstance(values, pd.DatetimeIndex) else values
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return idx.asi8
+
+
+class SessionCalendar:
+    """Vectorised session lookups over sorted ``int64`` arrays.
+
+    Parameters
+    ----------
+    open_ns, close_ns : np.ndarray
+        UTC epoch nanoseconds of each session's open and close, sorted.
+    early_close : np.ndarray
+        Boolean flag per session.
+    """
+
+    def __init__(self, open_ns: np.ndarray, close_ns: np.ndarray, early_close: np.ndarray) -> None:
+        self.open_ns = np.asarray(open_ns, dtype=np.int64)
+        self.close_ns = np.asarray(close_ns, dtype=np.int64)
+        self.early_close = np.asarray(early_close, dtype=bool)
+        if len(self.open_ns) == 0:
+            raise ValueError("calendar has no sessions")
+        self.days = self.open_ns // _NS_PER_DAY  # session dates as days since epoch
+        if np.any(np.diff(self.days) <= 0):
+            raise ValueError("sessions must be sorted and unique")
+        self._first = int(self.days[0])
+        span = int(self.days[-1]) - self._first + 1
+        self._is_session = np.zeros(span, dtype=bool)
+        self._is_session[self.days - self._first] = True
+        self._rank = np.cumsum(self._is_session)
+
+    @classmethod
+    def from_csv(cls, path: str | Path) -> "SessionCalendar":
+        """Load a ``date, open_utc, close_utc, early_close`` session file."""
+        df = pd.read_csv(path, dtype={"date": str, "open_utc": str, "close_utc": str, "early_close": bool})
+        df = df.sort_values("date")
+        open_ns = pd.to_datetime(df["date"] + " " + df["open_utc"]).to_numpy("datetime64[ns]").view(np.int64)
+        close_ns = pd.to_datetime(df["date"] + " " + df["close_utc"]).to_numpy("datetime64[ns]").view(np.int64)
+        return cls(open_ns, close_ns, df["early_close"].to_numpy())
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def sessions(self) -> pd.DatetimeIndex:
+        """Session dates (midnight, tz-naive)."""
+        return pd.DatetimeIndex((self.days * _NS_PER_DAY).view("datetime64[ns]"))
+
+    def _day_offsets(self, values) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (ns, offset into the dense tables clipped to range, in-range mask)."""
+        ns = _to_ns(values)
+        valid = ns != _NAT
+        day = np.where(valid, np.floor_divide(ns, _NS_PER_DAY), self._first - 1)
+        off = day - self._first
+        in_range = valid & (off >= 0) & (off < len(self._is_session))
+        return ns, np.clip(off, 0, len(self._is_session) - 1), in_range
+
+    def _dates(self, pos: np.ndarray, ok: np.ndarray) -> pd.DatetimeIndex:
+        pos = np.clip(pos, 0, len(self.days) - 1)
+        ns = np.where(ok, self.days[pos] * _NS_PER_DAY, _NAT)
+        return pd.DatetimeIndex(ns.view("datetime64[ns]"))
+
+    def _floor_pos(self, values) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Position of the last session on or before each date (may be -1)."""
+        ns, off, in_range = self._day_offsets(values)
+        pos = np.where(in_range, self._rank[off] - 1, -1)
+        return pos, in_range & self._is_session[off], ns != _NAT
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def is_session(self, dates) -> np.ndarray:
+        """Boolean array: does the (UTC) date of each timestamp trade?"""
+        _, off, in_range = self._day_offsets(dates)
+        return in_range & self._is_session[off]
+
+    def previous_session(self, dates, *, strict: bool = False) -> pd.DatetimeIndex:
+        """Last session on or before each date (strictly before if ``strict``)."""
+        pos, is_sess, valid = self._floor_pos(dates)
+        if strict:
+            pos = pos - is_sess
+        return self._dates(pos, valid & (pos >= 0) & self._covered(dates))
+
+    def next_session(self, dates, *, strict: bool = False) -> pd.DatetimeIndex:
+        """First session on or after each date (strictly after if ``strict``)."""
+        pos, is_sess, valid = self._floor_pos(dates)
+        pos = pos + np.where(is_sess & ~strict, 0, 1)
+        return self._dates(pos, valid & (pos < len(self.days)) & self._covered(dates))
+
+    def session_offset(self, dates, n: int) -> pd.DatetimeIndex:
+        """Shift each date by ``n`` sessions.
+
+        Follows ``pd.offsets.BDay`` semantics for non-session dates: they sit
+        between two sessions, so ``+1`` gives the next session, ``-1`` the
+        previous one and ``0`` rolls forward.
+        """
+        pos, is_sess, valid = self._floor_pos(dates)
+        pos = pos + n + np.where(is_sess | (n > 0), 0, 1)
+        return self._dates(pos, valid & (pos >= 0) & (pos < len(self.days)) & self._covered(dates))
+
+    def session_index(self, dates) -> np.ndarray:
+        """Position of each date in :attr:`sessions`; ``-1`` for non-sessions."""
+        pos, is_sess, _ = self._floor_pos(dates)
+        return np.where(is_sess, pos, -1)
+
+    def minutes_to_close(self, timestamps) -> np.ndarray:
+        """Minutes from each timestamp to its session close; NaN when closed."""
+        ns = _to_ns(timestamps)
+        pos, is_sess, _ = self._floor_pos(timestamps)
+        pos = np.clip(pos, 0, len(self.days) - 1)
+        open_ = is_sess & (ns >= self.open_ns[pos]) & (ns < self.close_ns[pos])
+        return np.where(open_, (self.close_ns[pos] - ns) / _NS_PER_MIN, np.nan)
+
+    def is_open(self, timestamps) -> np.ndarray:
+        """Boolean array: is the market open at each timestamp?"""
+        return ~np.isnan(self.minutes_to_close(timestamps))
+
+    def sessions_between(self, start, end) -> pd.DatetimeIndex:
+        """Sessions in ``[start, end]`` via binary search on the session days."""
+        lo, hi = np.floor_divide(_to_ns([start, end]), _NS_PER_DAY)
+        return self.sessions[np.searchsorted(self.days, lo, "left"): np.searchsorted(self.days, hi, "right")]
+
+    def _covered(self, dates) -> np.ndarray:
+        """Dates before the first or after the last session have no answer."""
+        ns = _to_ns(dates)
+        day = np.floor_divide(ns, _NS_PER_DAY)
+        return (ns != _NAT) & (day >= self._first) & (day <= self.days[-1])
+
+
+@lru_cache(maxsize=None)
+def nyse(path: str | Path = NYSE_CSV) -> SessionCalendar:
+    """Return the NYSE calendar, loaded once per process."""
+    return SessionCalendar.from_csv(path)
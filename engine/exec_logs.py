@@ -0,0 +1,267 @@
+"""Streaming parser for ZeroMQ execution logs.
+
+Step 1 of the calibration procedure in ``engine/fidelity.md``: turn raw
+execution records into ``latency_ms``, ``spread_bps`` and ``is_bps`` columns.
+Each record is one JSON object, either a line of a (rotating, optionally
+gzipped) log file or the payload frame of a ``[topic, payload]`` ZMQ message:
+
+    {"ts": "2024-06-14T13:30:00.125Z", "symbol": "AAPL", "venue": "ARCA",
+     "qty": 100, "latency_ms": 12.5, "spread_bps": 3.1, "is_bps": 2.4}
+
+``ts`` may also be epoch nanoseconds. Records are decoded into a preallocated
+:class:`ColumnBatch`; when it is full the rows are written as Parquet files
+partitioned by UTC trading day (``<out>/date=YYYY-MM-DD/part-*.parquet``) and
+the batch is reused. Memory is therefore bounded by ``batch_size`` regardless
+of log volume, and the output can be fed directly to
+``engine.models.calibration``.
+
+CLI usage:
+
+    python -m engine.exec_logs --logs /var/log/exec/fills.log --out data/exec
+    python -m engine.exec_logs --zmq tcp://localhost:5557 --out data/exec
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+__all__ = [
+    "EXEC_LOG_SCHEMA",
+    "ColumnBatch",
+    "ExecLogParser",
+    "iter_rotated_lines",
+    "iter_zmq_payloads",
+]
+
+EXEC_LOG_SCHEMA = pa.schema(
+    [
+        ("ts", pa.timestamp("us", tz="UTC")),
+        ("symbol", pa.string()),
+        ("venue", pa.string()),
+        ("qty", pa.float64()),
+        ("latency_ms", pa.float64()),
+        ("spread_bps", pa.float64()),
+        ("is_bps", pa.float64()),
+    ]
+)
+_FLOAT_COLS = ("qty", "latency_ms", "spread_bps", "is_bps")
+_STR_COLS = ("symbol", "venue")
+_REQUIRED = ("ts", "latency_ms", "spread_bps", "is_bps")
+_US_PER_DAY = 86_400 * 10**6
+DEFAULT_BATCH_SIZE = 65_536
+
+
+def _parse_ts_us(value) -> int:
+    """Return epoch microseconds for an ISO-8601 string or epoch-ns integer."""
+    if isinstance(value, (int, float)):
+        return int(value) // 1_000
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86_400 + delta.seconds) * 10**6 + delta.microseconds
+
+
+class ColumnBatch:
+    """Fixed-capacity columnar buffer reused across flushes."""
+
+    def __init__(self, capacity: int = DEFAULT_BATCH_SIZE) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.ts = np.empty(capacity, dtype=np.int64)
+        self.floats = {col: np.empty(capacity, dtype=np.float64) for col in _FLOAT_COLS}
+        self.strings = {col: np.empty(capacity, dtype=object) for col in _STR_COLS}
+        self.size = 0
+
+    @property
+    def full(self) -> bool:
+        return self.size >= self.capacity
+
+    def append(self, rec: dict) -> None:
+        """Store one decoded record; raises ``KeyError``/``ValueError`` if invalid."""
+        i = self.size
+        self.ts[i] = _parse_ts_us(rec["ts"])
+        for col in _FLOAT_COLS:
+            value = rec.get(col)
+            self.floats[col][i] = np.nan if value is None else float(value)
+        for col in _STR_COLS:
+            self.strings[col][i] = rec.get(col)
+        self.size = i + 1
+
+    def to_arrow(self) -> pa.Table:
+        n = self.size
+        arrays = {
+            "ts": pa.array(self.ts[:n], type=pa.int64()).cast(EXEC_LOG_SCHEMA.field("ts").type),
+            **{col: pa.array(self.strings[col][:n], type=pa.string()) for col in _STR_COLS},
+            **{col: pa.array(self.floats[col][:n]) for col in _FLOAT_COLS},
+        }
+        return pa.table([arrays[name] for name in EXEC_LOG_SCHEMA.names], schema=EXEC_LOG_SCHEMA)
+
+    def days(self) -> np.ndarray:
+        return self.ts[: self.size] // _US_PER_DAY
+
+    def clear(self) -> None:
+        self.size = 0
+        for col in _STR_COLS:
+            self.strings[col][:] = None  # drop references
+
+
+class ExecLogParser:
+    """Decode execution records and write day-partitioned Parquet.
+
+    Parameters
+    ----------
+    out_dir : Path
+        Root of the partitioned output dataset.
+    batch_size : int
+        Rows buffered before a flush.
+    """
+
+    def __init__(self, out_dir: str | Path, *, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self.out_dir = Path(out_dir)
+        self.batch = ColumnBatch(batch_size)
+        self.n_records = 0
+        self.n_errors = 0
+        self.files_written: list[Path] = []
+
+    def feed(self, raw: str | bytes) -> None:
+        """Decode one JSON record; malformed records are counted and skipped."""
+        try:
+            rec = json.loads(raw)
+            if not all(rec.get(col) is not None for col in _REQUIRED):
+                raise KeyError("missing required field")
+            self.batch.append(rec)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.n_errors += 1
+            return
+        self.n_records += 1
+        if self.batch.full:
+            self.flush()
+
+    def feed_many(self, records: Iterable[str | bytes]) -> "ExecLogParser":
+        for raw in records:
+            if raw.strip():
+                self.feed(raw)
+        return self
+
+    def flush(self) -> list[Path]:
+        """Write buffered rows, one file per UTC day present in the batch."""
+        if self.batch.size == 0:
+            return []
+        table = self.batch.to_arrow()
+        days = self.batch.days()
+        written = []
+        tag = uuid.uuid4().hex[:12]
+        unique_days = np.unique(days)
+        for day in unique_days:
+            part = table.filter(pa.array(days == day)) if len(unique_days) > 1 else table
+            date = np.datetime64(int(day), "D")
+            target = self.out_dir / f"date={date}"
+            target.mkdir(parents=True, exist_ok=True)
+            path = target / f"part-{tag}.parquet"
+            tmp = target / f".part-{tag}.parquet.tmp"
+            pq.write_table(part, tmp, compression="zstd")
+            tmp.replace(path)
+            written.append(path)
+        self.batch.clear()
+        self.files_written.extend(written)
+        return written
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ExecLogParser":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+_ROTATION = re.compile(r"\.(\d+)(\.gz)?$")
+
+
+def _rotation_order(path: Path) -> tuple[int, str]:
+    m = _ROTATION.search(path.name)
+    # fills.log.3 is older than fills.log.1, which is older than fills.log
+    return (-int(m.group(1)) if m else 0, path.name)
+
+
+def iter_rotated_lines(base: str | Path) -> Iterator[bytes]:
+    """Yield lines of ``base`` and its rotations (``base.N[.gz]``), oldest first."""
+    base = Path(base)
+    files = [p for p in base.parent.glob(base.name + "*") if p == base or _ROTATION.search(p.name)]
+    for path in sorted(files, key=_rotation_order):
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rb") as fh:
+            yield from fh
+
+
+def iter_zmq_payloads(
+    endpoint: str,
+    *,
+    topic: str = "",
+    max_messages: int | None = None,
+    idle_timeout_ms: int | None = None,
+    context=None,
+) -> Iterator[bytes]:
+    """Yield payload frames from a live ZMQ ``SUB`` socket.
+
+    Multipart ``[topic, payload]`` messages yield the last frame. Iteration
+    stops after ``max_messages`` or when nothing arrives for
+    ``idle_timeout_ms`` (both unbounded by default).
+    """
+    import zmq
+
+    ctx = context or zmq.Context.instance()
+    sock = ctx.socket(zmq.SUB)
+    sock.connect(endpoint)
+    sock.setsockopt_string(zmq.SUBSCRIBE, topic)
+    poller = zmq.Poller()
+    poller.register(sock, zmq.POLLIN)
+    seen = 0
+    try:
+        while max_messages is None or seen < max_messages:
+            if not poller.poll(idle_timeout_ms):
+                break
+            yield sock.recv_multipart()[-1]
+            seen += 1
+    finally:
+        sock.close(linger=0)
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Parse execution logs into Parquet")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--logs", help="Base log file; rotations base.N[.gz] are included")
+    src.add_argument("--zmq", help="ZMQ endpoint to subscribe to")
+    parser.add_argument("--topic", default="", help="ZMQ topic filter")
+    parser.add_argument("--out", required=True, help="Output dataset directory")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    source = iter_rotated_lines(args.logs) if args.logs else iter_zmq_payloads(args.zmq, topic=args.topic)
+    with ExecLogParser(args.out, batch_size=args.batch_size) as p:
+        try:
+            p.feed_many(source)
+        except KeyboardInterrupt:
+            pass
+    print(f"[exec_logs] {p.n_records} records, {p.n_errors} rejected, {len(p.files_written)} files")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,22 @@
+"""Optional Numba JIT.
+
+Compiled kernels import ``njit`` and ``prange`` from here. Without Numba,
+``njit`` (bare or called with options) returns the function unchanged and
+``prange`` is ``range``, so the kernels run as plain Python: correct but slow.
+"""
+from __future__ import annotations
+
+__all__ = ["NUMBA_AVAILABLE", "njit", "prange"]
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,196 @@
+"""Streaming OLS calibration of :class:`CostModel` from execution logs.
+
+Implements step 2 of the calibration procedure in ``engine/fidelity.md``
+without loading the logs into memory. CSV or Parquet files are read in chunks
+and each chunk only updates the OLS sufficient statistics
+
+    XᵀX (3 × 3),  Xᵀy (3),  n
+
+with ``X = [1, spread_bps, latency_ms / 1000]`` and ``y = is_bps``, optionally
+per group (venue, trading day, ...). A fixed-size random sample of rows per
+group is kept alongside (priority sampling), so the MAPE of the fitted model
+is computed in the same pass; it is exact whenever a group has no more rows
+than ``sample_size``.
+
+CLI usage:
+
+    python -m engine.models.calibration --logs fills/*.parquet [--by venue|day]
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from engine.models.cost_model import CostModel, mape
+
+__all__ = [
+    "CalibrationResult",
+    "OLSAccumulator",
+    "calibrate",
+    "calibrate_groups",
+    "iter_log_chunks",
+]
+
+FEATURE_COLS = ["latency_ms", "spread_bps"]
+TARGET_COL = "is_bps"
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def _design(latency_ms: np.ndarray, spread_bps: np.ndarray) -> np.ndarray:
+    return np.column_stack([np.ones(len(latency_ms)), spread_bps, latency_ms / 1000.0])
+
+
+@dataclass
+class OLSAccumulator:
+    """Running OLS sufficient statistics plus a bounded row sample for MAPE."""
+
+    sample_size: int = 100_000
+    xtx: np.ndarray = field(default_factory=lambda: np.zeros((3, 3)))
+    xty: np.ndarray = field(default_factory=lambda: np.zeros(3))
+    n: int = 0
+    _keys: np.ndarray = field(default_factory=lambda: np.empty(0))
+    _x: np.ndarray = field(default_factory=lambda: np.empty((0, 3)))
+    _y: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    def update(self, X: np.ndarray, y: np.ndarray, keys: np.ndarray) -> None:
+        """Add rows ``X`` / ``y``; ``keys`` are uniform priorities for sampling."""
+        self.xtx += X.T @ X
+        self.xty += X.T @ y
+        self.n += len(y)
+        if self.sample_size <= 0:
+            return
+        keys = np.concatenate([self._keys, keys])
+        X = np.concatenate([self._x, X])
+        y = np.concatenate([self._y, y])
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[: self.sample_size]
+            keys, X, y = keys[keep], X[keep], y[keep]
+        self._keys, self._x, self._y = keys, X, y
+
+    def solve(self) -> np.ndarray:
+        """Return ``[k0, k1, k2]``; least-squares solution if XᵀX is singular."""
+        if self.n == 0:
+            raise ValueError("no observations to calibrate on")
+        return np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+
+    def result(self) -> "CalibrationResult":
+        k0, k1, k2 = self.solve()
+        model = CostModel(k0=float(k0), k1=float(k1), k2=float(k2))
+        nonzero = self._y != 0
+        if nonzero.any():
+            pred = self._x[nonzero] @ np.array([k0, k1, k2])
+            err = mape(self._y[nonzero], pred)
+        else:
+            err = float("nan")
+        return CalibrationResult(model=model, mape=err, n=self.n)
+
+
+@dataclass(frozen=True)
+class CalibrationResult:
+    model: CostModel
+    mape: float  # in %, on the sampled rows
+    n: int
+
+
+def iter_log_chunks(
+    paths: Iterable[str | Path],
+    columns: Sequence[str],
+    *,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Iterator[pd.DataFrame]:
+    """Yield ``columns`` of CSV / Parquet execution logs in bounded chunks."""
+    for path in map(Path, paths):
+        if path.suffix == ".parquet":
+            pf = pq.ParquetFile(path)
+            for batch in pf.iter_batches(batch_size=chunksize, columns=list(columns)):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(path, usecols=list(columns), chunksize=chunksize)
+
+
+def _group_keys(chunk: pd.DataFrame, by: str | None, ts_col: str) -> pd.Series | None:
+    if by is None:
+        return None
+    if by == "day":
+        return pd.to_datetime(chunk[ts_col], utc=True).dt.strftime("%Y-%m-%d")
+    return chunk[by]
+
+
+def calibrate_groups(
+    paths: Iterable[str | Path],
+    *,
+    by: str | None = None,
+    ts_col: str = "ts",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    sample_size: int = 100_000,
+    seed: int = 0,
+) -> Dict[Hashable, CalibrationResult]:
+    """Fit one :class:`CostModel` per group in a single pass over ``paths``.
+
+    Parameters
+    ----------
+    paths
+        CSV or Parquet logs with ``latency_ms``, ``spread_bps`` and ``is_bps``.
+    by
+        Grouping column (e.g. ``"venue"``), ``"day"`` to group by the UTC date
+        of ``ts_col``, or ``None`` for a single pooled fit (key ``None``).
+    chunksize
+        Rows per chunk; memory use is bounded by this and ``sample_size``.
+    sample_size
+        Rows per group retained for the MAPE estimate.
+    """
+    columns = FEATURE_COLS + [TARGET_COL]
+    if by == "day":
+        columns.append(ts_col)
+    elif by is not None:
+        columns.append(by)
+    rng = np.random.default_rng(seed)
+    accs: dict[Hashable, OLSAccumulator] = {}
+    for chunk in iter_log_chunks(paths, columns, chunksize=chunksize):
+        chunk = chunk.dropna(subset=columns)
+        if chunk.empty:
+            continue
+        X = _design(chunk["latency_ms"].to_numpy(float), chunk["spread_bps"].to_numpy(float))
+        y = chunk[TARGET_COL].to_numpy(float)
+        keys = rng.random(len(y))
+        groups = _group_keys(chunk, by, ts_col)
+        if groups is None:
+            accs.setdefault(None, OLSAccumulator(sample_size)).update(X, y, keys)
+            continue
+        for key, idx in groups.groupby(groups.to_numpy(), sort=False).indices.items():
+            accs.setdefault(key, OLSAccumulator(sample_size)).update(X[idx], y[idx], keys[idx])
+    return {key: acc.result() for key, acc in accs.items()}
+
+
+def calibrate(paths: Iterable[str | Path], **kwargs) -> CalibrationResult:
+    """Pooled single-pass calibration; see :func:`calibrate_groups`."""
+    results = calibrate_groups(paths, by=None, **kwargs)
+    if None not in results:
+        raise ValueError("no observations to calibrate on")
+    return results[None]
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Calibrate CostModel from execution logs")
+    parser.add_argument("--logs", nargs="+", required=True, help="CSV / Parquet execution logs")
+    parser.add_argument("--by", default=None, help="Group column, or 'day'")
+    parser.add_argument("--ts-col", default="ts", help="Timestamp column used with --by day")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    results = calibrate_groups(args.logs, by=args.by, ts_col=args.ts_col, chunksize=args.chunksize)
+    rows = [
+        {"group": key, "n": r.n, "k0": r.model.k0, "k1": r.model.k1, "k2": r.model.k2, "mape_pct": r.mape}
+        for key, r in results.items()
+    ]
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
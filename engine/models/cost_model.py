@@ -2,6 +2,11 @@
 
 Implements the linear model described in `engine/fidelity.md` and provides
 APIs to estimate implementation shortfall (IS) in basis points.
+
+Size-dependent market impact is modelled separately by power-law models in
+participation rate and volatility (:class:`PowerLawImpact`,
+:class:`SquareRootImpact`). :class:`ImpactTable` holds per-symbol parameters so
+arrays of child orders across many symbols are priced in one vectorised call.
 """
 from __future__ import annotations
 
@@ -11,12 +16,23 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
-__all__ = ["CostModel", "load_fixture_logs", "mape"]
+__all__ = [
+    "CostModel",
+    "PowerLawImpact",
+    "SquareRootImpact",
+    "ImpactTable",
+    "load_fixture_logs",
+    "mape",
+]
 
 K0 = 1.2
 K1 = 0.5
 K2 = 0.9
 
+# Square-root law prefactor (Y) and generic power-law exponent.
+ETA = 1.0
+BETA = 0.6
+
 
 @dataclass(frozen=True)
 class CostModel:
@@ -29,6 +45,96 @@ class CostModel:
         return self.k0 + self.k1 * spread_bps + self.k2 * (latency_ms / 1000.0)
 
 
+# ---------------------------------------------------------------------------
+# Nonlinear market impact
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class PowerLawImpact:
+    """Impact ``eta * sigma * participation ** beta`` expressed in bps.
+
+    ``participation`` is order quantity over daily volume and ``volatility``
+    the daily return volatility (0.02 = 2 %).
+    """
+
+    eta: float = ETA
+    beta: float = BETA
+
+    def estimate_bps(self, participation: np.ndarray, volatility: np.ndarray) -> np.ndarray:
+        """Return estimated impact in bps for arrays of orders."""
+        participation = np.asarray(participation, dtype=float)
+        volatility = np.asarray(volatility, dtype=float)
+        return 1e4 * self.eta * volatility * np.power(participation, self.beta)
+
+
+@dataclass(frozen=True)
+class SquareRootImpact(PowerLawImpact):
+    """Square-root law: :class:`PowerLawImpact` with ``beta = 0.5``."""
+
+    beta: float = 0.5
+
+
+@dataclass(frozen=True)
+class ImpactTable:
+    """Per-symbol power-law parameters for batch evaluation.
+
+    ``symbols`` is sorted so lookups are a single ``searchsorted``. Symbols not
+    in the table use ``default``.
+    """
+
+    symbols: np.ndarray
+    eta: np.ndarray
+    beta: np.ndarray
+    default: PowerLawImpact = PowerLawImpact()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, *, default: PowerLawImpact = PowerLawImpact()) -> "ImpactTable":
+        """Build from a frame with ``symbol``, ``eta`` and ``beta`` columns."""
+        df = df.sort_values("symbol")
+        if df["symbol"].duplicated().any():
+            raise ValueError("duplicate symbols in impact table")
+        return cls(
+            symbols=df["symbol"].to_numpy(dtype=str),
+            eta=df["eta"].to_numpy(dtype=float),
+            beta=df["beta"].to_numpy(dtype=float),
+            default=default,
+        )
+
+    def codes(self, symbols: np.ndarray) -> np.ndarray:
+        """Map symbols to row positions; ``-1`` for unknown symbols.
+
+        Compute codes once and pass them to :meth:`estimate_bps` when the same
+        orders are priced repeatedly.
+        """
+        symbols = np.asarray(symbols, dtype=str)
+        if len(self.symbols) == 0:
+            return np.full(symbols.shape, -1, dtype=np.int64)
+        pos = np.searchsorted(self.symbols, symbols)
+        pos = np.minimum(pos, len(self.symbols) - 1)
+        return np.where(self.symbols[pos] == symbols, pos, -1).astype(np.int64)
+
+    def estimate_bps(
+        self,
+        symbols: np.ndarray,
+        participation: np.ndarray,
+        volatility: np.ndarray,
+    ) -> np.ndarray:
+        """Return impact in bps for each order.
+
+        ``symbols`` may be symbol strings or integer codes from :meth:`codes`.
+        """
+        symbols = np.asarray(symbols)
+        codes = symbols if np.issubdtype(symbols.dtype, np.integer) else self.codes(symbols)
+        # Unknown symbols (-1) index the appended default parameters.
+        idx = np.where(codes >= 0, codes, len(self.eta))
+        eta = np.append(self.eta, self.default.eta)[idx]
+        beta = np.append(self.beta, self.default.beta)[idx]
+        participation = np.asarray(participation, dtype=float)
+        volatility = np.asarray(volatility, dtype=float)
+        return 1e4 * eta * volatility * np.power(participation, beta)
+
+
 # ---------------------------------------------------------------------------
 # Fixture log utilities
 # ---------------------------------------------------------------------------
@@ -0,0 +1,79 @@
+"""Deterministic parallel random streams.
+
+Simulations that draw from one global ``RandomState`` produce different
+numbers as soon as the work is split across workers, which breaks the
+byte-identical determinism harness. Here the work is cut into *chunks of a
+fixed size* and chunk ``i`` always receives the ``i``-th child of
+``SeedSequence(seed).spawn``. Because the chunking does not depend on the
+number of workers, results are identical whether the chunks run serially, on
+4 threads or on 64 processes:
+
+    >>> a = map_chunks(lambda rng, lo, hi: rng.standard_normal(hi - lo), 10, seed=1, chunk_size=3)
+    >>> b = map_chunks(lambda rng, lo, hi: rng.standard_normal(hi - lo), 10, seed=1, chunk_size=3, workers=4)
+    >>> all((x == y).all() for x, y in zip(a, b))
+    True
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+__all__ = ["spawn_generators", "chunk_bounds", "map_chunks"]
+
+T = TypeVar("T")
+
+
+def spawn_generators(seed: int | np.random.SeedSequence, n: int) -> List[np.random.Generator]:
+    """Return ``n`` independent ``Generator`` objects derived from ``seed``."""
+    ss = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in ss.spawn(n)]
+
+
+def chunk_bounds(total: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Split ``range(total)`` into ``[lo, hi)`` chunks of ``chunk_size``."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    return [(lo, min(lo + chunk_size, total)) for lo in range(0, total, chunk_size)]
+
+
+def _call(args):
+    fn, rng, lo, hi = args
+    return fn(rng, lo, hi)
+
+
+def map_chunks(
+    fn: Callable[[np.random.Generator, int, int], T],
+    total: int,
+    *,
+    seed: int | np.random.SeedSequence,
+    chunk_size: int,
+    workers: int | None = 1,
+    processes: bool = False,
+) -> List[T]:
+    """Apply ``fn(rng, lo, hi)`` to every chunk and return results in chunk order.
+
+    Parameters
+    ----------
+    fn
+        Work for rows ``[lo, hi)`` using only ``rng`` for randomness. Must be
+        picklable when ``processes=True``.
+    total, chunk_size
+        Work size and fixed chunk length; together with ``seed`` these fully
+        determine the output.
+    workers
+        Number of parallel workers (``None`` lets the executor decide). ``1``
+        runs inline.
+    processes
+        Use a process pool instead of threads (for pure-Python work that holds
+        the GIL).
+    """
+    bounds = chunk_bounds(total, chunk_size)
+    rngs = spawn_generators(seed, len(bounds))
+    tasks: Sequence = [(fn, rng, lo, hi) for rng, (lo, hi) in zip(rngs, bounds)]
+    if workers == 1 or len(tasks) <= 1:
+        return [_call(t) for t in tasks]
+    pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with pool(max_workers=workers) as ex:
+        return list(ex.map(_call, tasks))
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.models.calibration import calibrate, calibrate_groups
+from engine.models.cost_model import FIXTURE_PATH
+
+
+def _synthetic_logs(n=5_000, seed=0):
+    rs = np.random.RandomState(seed)
+    venue = rs.choice(["ARCA", "NSDQ"], size=n)
+    latency = rs.uniform(10, 500, n)
+    spread = rs.uniform(1, 20, n)
+    k = {"ARCA": (1.0, 0.4, 0.8), "NSDQ": (2.0, 0.6, 1.5)}
+    coefs = np.array([k[v] for v in venue])
+    is_bps = coefs[:, 0] + coefs[:, 1] * spread + coefs[:, 2] * latency / 1000 + rs.normal(0, 0.05, n)
+    ts = pd.Timestamp("2024-06-14", tz="UTC") + pd.to_timedelta(rs.randint(0, 2 * 86400, n), unit="s")
+    return pd.DataFrame({"ts": ts, "venue": venue, "latency_ms": latency, "spread_bps": spread, "is_bps": is_bps})
+
+
+def test_streaming_matches_in_memory_ols(tmp_path):
+    df = _synthetic_logs()
+    df.iloc[:2500].to_csv(tmp_path / "a.csv", index=False)
+    df.iloc[2500:].to_parquet(tmp_path / "b.parquet", index=False)
+    res = calibrate([tmp_path / "a.csv", tmp_path / "b.parquet"], chunksize=333, sample_size=1_000)
+
+    X = np.column_stack([np.ones(len(df)), df["spread_bps"], df["latency_ms"] / 1000])
+    expected = np.linalg.lstsq(X, df["is_bps"], rcond=None)[0]
+    np.testing.assert_allclose([res.model.k0, res.model.k1, res.model.k2], expected, rtol=1e-8)
+    assert res.n == len(df)
+    assert np.isfinite(res.mape)
+
+
+def test_per_venue_and_per_day_groups(tmp_path):
+    df = _synthetic_logs()
+    path = tmp_path / "logs.parquet"
+    df.to_parquet(path, index=False)
+    by_venue = calibrate_groups([path], by="venue", chunksize=1_000)
+    assert by_venue["ARCA"].model.k1 == pytest.approx(0.4, abs=0.01)
+    assert by_venue["NSDQ"].model.k2 == pytest.approx(1.5, abs=0.1)
+    assert by_venue["ARCA"].n + by_venue["NSDQ"].n == len(df)
+
+    by_day = calibrate_groups([path], by="day", chunksize=1_000)
+    assert set(by_day) == {"2024-06-14", "2024-06-15"}
+
+
+def test_fixture_calibration_mape():
+    res = calibrate([FIXTURE_PATH])
+    assert res.mape < 20.0
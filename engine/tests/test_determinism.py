@@ -23,3 +23,10 @@ def test_deterministic_sha256(tmp_path):
     else:
         # First run will write the golden file so that subsequent CI runs compare against it.
         write_parquet(df1, golden_path)
+
+
+def test_parallel_streams_independent_of_workers():
+    serial = run_backtest(n=1_000, chunk_size=64, workers=1)
+    parallel = run_backtest(n=1_000, chunk_size=64, workers=4)
+    assert parquet_sha256(serial) == parquet_sha256(parallel)
+    assert not serial.equals(run_backtest(n=1_000, seed=7, chunk_size=64))
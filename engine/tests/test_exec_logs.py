@@ -0,0 +1,73 @@
+import gzip
+import json
+import threading
+import time
+
+import pyarrow.dataset as ds
+import pytest
+
+from engine.exec_logs import ExecLogParser, iter_rotated_lines, iter_zmq_payloads
+from engine.models.calibration import calibrate_groups
+
+
+def _record(i):
+    day = 14 + (i >= 10)
+    return json.dumps(
+        {
+            "ts": f"2024-06-{day}T13:30:{i % 60:02d}.5Z",
+            "symbol": "AAPL",
+            "venue": "ARCA",
+            "qty": 100 + i,
+            "latency_ms": 10.0 * (i % 7 + 1),
+            "spread_bps": float(i % 5 + 1),
+            "is_bps": 1.0 + 0.5 * (i % 5 + 1) + 0.9 * (i % 7 + 1) / 100,
+        }
+    )
+
+
+def test_rotated_logs_to_day_partitions(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    lines = [_record(i) for i in range(15)]
+    with gzip.open(logs / "fills.log.2.gz", "wt") as fh:
+        fh.write("\n".join(lines[:5]) + "\n")
+    (logs / "fills.log.1").write_text("\n".join(lines[5:10]) + "\nnot json\n")
+    (logs / "fills.log").write_text("\n".join(lines[10:]) + '\n{"ts": "2024-06-15"}\n')
+
+    out = tmp_path / "out"
+    with ExecLogParser(out, batch_size=4) as parser:
+        parser.feed_many(iter_rotated_lines(logs / "fills.log"))
+    assert parser.n_records == 15
+    assert parser.n_errors == 2
+    assert sorted(p.name for p in out.iterdir()) == ["date=2024-06-14", "date=2024-06-15"]
+
+    table = ds.dataset(out, format="parquet", partitioning="hive").to_table()
+    df = table.to_pandas().sort_values("ts")
+    assert df["qty"].tolist() == [100.0 + i for i in range(15)]
+    assert str(df["ts"].dt.tz) == "UTC"
+    assert df["ts"].iloc[0].microsecond == 500_000
+
+    by_day = calibrate_groups(sorted(out.glob("date=*/*.parquet")), by="day")
+    assert by_day["2024-06-14"].model.k1 == pytest.approx(0.5)
+
+
+def test_zmq_subscriber(tmp_path):
+    zmq = pytest.importorskip("zmq")
+    ctx = zmq.Context()
+    pub = ctx.socket(zmq.PUB)
+    pub.bind("inproc://exec")
+
+    def publish():
+        time.sleep(0.2)  # let the subscription propagate
+        for i in range(3):
+            pub.send_multipart([b"EXEC", _record(i).encode()])
+
+    thread = threading.Thread(target=publish)
+    thread.start()
+    payloads = iter_zmq_payloads("inproc://exec", topic="EXEC", max_messages=3, idle_timeout_ms=2000, context=ctx)
+    parser = ExecLogParser(tmp_path).feed_many(payloads)
+    parser.close()
+    thread.join()
+    pub.close()
+    ctx.term()
+    assert parser.n_records == 3
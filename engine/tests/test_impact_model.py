@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.models.cost_model import ImpactTable, PowerLawImpact, SquareRootImpact
+
+
+def test_square_root_law_scaling():
+    model = SquareRootImpact(eta=1.0)
+    bps = model.estimate_bps(np.array([0.01, 0.04]), np.array([0.02, 0.02]))
+    np.testing.assert_allclose(bps, [20.0, 40.0])
+    assert PowerLawImpact(eta=1.0, beta=1.0).estimate_bps(0.01, 0.02) == pytest.approx(2.0)
+
+
+def test_table_matches_per_symbol_models():
+    table = ImpactTable.from_frame(
+        pd.DataFrame({"symbol": ["MSFT", "AAPL"], "eta": [0.8, 1.2], "beta": [0.5, 0.7]}),
+        default=SquareRootImpact(eta=2.0),
+    )
+    rs = np.random.RandomState(0)
+    n = 10_000
+    symbols = rs.choice(["AAPL", "MSFT", "ZZZZ"], size=n)
+    part = rs.uniform(1e-4, 0.2, n)
+    vol = rs.uniform(0.01, 0.05, n)
+    out = table.estimate_bps(symbols, part, vol)
+
+    models = {"AAPL": PowerLawImpact(1.2, 0.7), "MSFT": PowerLawImpact(0.8, 0.5), "ZZZZ": SquareRootImpact(2.0)}
+    expected = np.array([models[s].estimate_bps(p, v) for s, p, v in zip(symbols, part, vol)])
+    np.testing.assert_allclose(out, expected)
+
+    codes = table.codes(symbols)
+    assert set(np.unique(codes)) == {-1, 0, 1}
+    np.testing.assert_allclose(table.estimate_bps(codes, part, vol), out)
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from engine.rng import chunk_bounds, map_chunks, spawn_generators
+from research.spa import spa_p_value
+from risk.stress import monte_carlo_stress
+
+
+def test_chunk_bounds_and_streams():
+    assert chunk_bounds(7, 3) == [(0, 3), (3, 6), (6, 7)]
+    a, b = spawn_generators(5, 2)
+    assert a.random() != b.random()
+    draws = map_chunks(lambda rng, lo, hi: rng.random(hi - lo), 10, seed=5, chunk_size=3)
+    assert [len(d) for d in draws] == [3, 3, 3, 1]
+
+
+def test_monte_carlo_identical_across_workers():
+    returns = pd.DataFrame(np.random.RandomState(0).normal(0, 0.01, (50, 3)))
+    serial = monte_carlo_stress(returns, horizon=5, paths=3_000, seed=11, workers=1)
+    threaded = monte_carlo_stress(returns, horizon=5, paths=3_000, seed=11, workers=4)
+    assert serial.shape == (3_000, 5, 3)
+    assert np.array_equal(serial, threaded)
+
+
+def test_spa_identical_across_workers():
+    returns = np.random.RandomState(1).normal(0.001, 0.01, 100)
+    assert spa_p_value(returns, B=600, workers=1) == spa_p_value(returns, B=600, workers=2)
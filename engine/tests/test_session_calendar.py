@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from engine.clock import nyse
+
+
+def test_is_session_and_navigation():
+    cal = nyse()
+    assert len(cal) == 252
+    dates = ["2024-07-03", "2024-07-04", "2024-07-06", "2024-07-08"]
+    assert cal.is_session(dates).tolist() == [True, False, False, True]
+    nxt = cal.next_session(dates)
+    prv = cal.previous_session(dates)
+    assert [d.strftime("%m-%d") for d in nxt] == ["07-03", "07-05", "07-08", "07-08"]
+    assert [d.strftime("%m-%d") for d in prv] == ["07-03", "07-03", "07-05", "07-08"]
+    assert cal.next_session(["2024-07-03"], strict=True)[0] == pd.Timestamp("2024-07-05")
+    assert cal.previous_session(["2024-07-08"], strict=True)[0] == pd.Timestamp("2024-07-05")
+
+
+def test_offsets_match_fixture_sessions():
+    cal = nyse()
+    sessions = cal.sessions
+    rs = np.random.RandomState(0)
+    idx = rs.randint(0, len(sessions) - 10, size=100)
+    shifted = cal.session_offset(sessions[idx], 5)
+    assert (shifted == sessions[idx + 5]).all()
+    assert cal.session_offset(["2024-12-31"], 1).isna().all()
+    holiday = ["2024-01-15"]  # same convention as pd.offsets.BDay
+    assert cal.session_offset(holiday, 1)[0] == pd.Timestamp("2024-01-16")
+    assert cal.session_offset(holiday, -1)[0] == pd.Timestamp("2024-01-12")
+    assert cal.session_offset(holiday, 0)[0] == pd.Timestamp("2024-01-16")
+    assert cal.session_offset(["2024-01-01"], 1).isna().all()  # before fixture coverage
+    assert (cal.session_index(sessions) == np.arange(len(sessions))).all()
+    assert len(cal.sessions_between("2024-12-20", "2024-12-31")) == 7
+
+
+def test_minutes_to_close_handles_dst_and_early_close():
+    cal = nyse()
+    ts = pd.to_datetime(
+        [
+            "2024-01-02 20:00",  # EST, close 21:00 UTC
+            "2024-06-03 19:30",  # EDT, close 20:00 UTC
+            "2024-11-29 17:00",  # early close 18:00 UTC
+            "2024-11-29 18:30",  # after early close
+            "2024-07-04 15:00",  # holiday
+        ]
+    ).tz_localize("UTC")
+    np.testing.assert_array_equal(cal.minutes_to_close(ts), [60.0, 30.0, 60.0, np.nan, np.nan])
+    assert cal.is_open(ts.tz_convert("America/New_York")).tolist() == [True, True, True, False, False]
+    assert not cal.is_session(["2023-12-29", "NaT"]).any()
@@ -1,39 +1,623 @@
+"""Partitioned Parquet feature store.
+
+Tables live under ``FEATURE_STORE_ROOT/<table>/as_of_ts=YYYY-MM-DD/``. Each
+table keeps a manifest, ``_manifest.json``, listing its partitions in date
+order together with their files, row counts and per-column min/max
+statistics (taken from the Parquet footers). :func:`save` rewrites the
+manifest atomically (temporary file + ``os.replace``) after the partition is
+in place, and :func:`load` prunes partitions with a binary search over the
+manifest instead of listing directories, so load latency stays flat as the
+store grows. Stores written before the manifest existed are indexed once on
+first access.
+
+``save`` accepts pandas, Polars or Arrow tables (Arrow and Polars are written
+without a pandas round trip) and either replaces a partition or writes only a
+delta to it:
+
+* ``mode="append"`` adds one more file of rows (intraday updates, late
+  symbols); the rows must have the partition's columns and are cast to its
+  schema;
+* ``mode="merge"`` adds a column file keyed on ``(symbol, as_of_ts)`` (the key
+  columns present in the partition). It is left-joined onto the partition's
+  rows at read time, so adding or correcting a feature column writes just
+  that column; :func:`compact` folds the deltas back into one file.
+
+Tables whose partitions have different columns are read back with a diagonal
+concat (missing columns are null).
+
+With :func:`enable_cache` (or ``FEATURE_STORE_CACHE_MB`` set), ``load`` keeps
+recently read partitions as memory-mapped Arrow IPC files, LRU-evicted by
+size and invalidated whenever ``save`` writes to the partition. A miss is
+served by the usual lazy scan, so filters are still pushed into Parquet; the
+whole partition is decoded into the cache by a background thread.
+
+:func:`compact` (``python -m feature_store compact <table>``) merges appended
+files and rewrites partitions sorted by symbol, or other keys, in small row
+groups so symbol filters skip most of the file.
+
+:func:`as_of_join` assembles point-in-time training sets: a lazy plan of
+backward as-of joins on ``(symbol, as_of_ts)`` against each feature table,
+scanning only the partitions inside the entity frame's time range. Rows
+without their own timestamp count as known one day after their partition
+date (``available_after``), so end-of-day values never reach intraday rows of
+the same day.
+"""
+import bisect
+import json
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from pathlib import Path
 import pandas as pd
 import polars as pl
+import pyarrow.parquet as pq
+import pyarrow as pa
 import tempfile
 import shutil
-from typing import Optional
+import uuid
+from typing import Dict, List, Optional, Sequence, Union
+
+Frame = Union[pd.DataFrame, pl.DataFrame, pl.LazyFrame, pa.Table, pa.RecordBatch]
 
 FEATURE_STORE_ROOT = Path(os.environ.get("FEATURE_STORE_ROOT", "./feature_store"))
+MANIFEST_NAME = "_manifest.json"
+PARTITION_KEY = "as_of_ts"
+SAVE_MODES = ("overwrite", "append", "merge")
+MERGE_KEYS = ("symbol", PARTITION_KEY)
+COMPACT_SORT_BY = ("symbol",)
+COMPACT_ROW_GROUP_SIZE = 64_000
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+_manifest_cache: Dict[Path, tuple] = {}
+
+
+def _root() -> Path:
+    """Store root, resolved per call so ``FEATURE_STORE_ROOT`` can change at runtime."""
+    env = os.environ.get("FEATURE_STORE_ROOT")
+    return Path(env) if env else FEATURE_STORE_ROOT
+
+
+# ---------------------------------------------------------------------------
+# Manifest
+# ---------------------------------------------------------------------------
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return None  # bytes, decimals, ...: no usable statistic
+
+
+def _file_entry(path: Path, rel_to: Path) -> dict:
+    """Row count, size and per-column min/max of one Parquet file."""
+    meta = pq.ParquetFile(path).metadata
+    stats: Dict[str, dict] = {}
+    for rg in range(meta.num_row_groups):
+        group = meta.row_group(rg)
+        for c in range(group.num_columns):
+            col = group.column(c)
+            st = col.statistics
+            name = col.path_in_schema
+            if st is None or not st.has_min_max:
+                stats[name] = {"min": None, "max": None, "invalid": True}
+                continue
+            lo, hi = _json_value(st.min), _json_value(st.max)
+            cur = stats.setdefault(name, {"min": lo, "max": hi})
+            if cur.get("invalid") or lo is None or hi is None:
+                cur.update(min=None, max=None, invalid=True)
+                continue
+            cur["min"] = min(cur["min"], lo)
+            cur["max"] = max(cur["max"], hi)
+    schema = meta.schema.to_arrow_schema()
+    entry = {
+        "path": path.relative_to(rel_to).as_posix(),
+        "columns": schema.names,
+        "rows": meta.num_rows,
+        "bytes": path.stat().st_size,
+        "token": uuid.uuid4().hex[:12],  # unique per write; part of the cache version
+        "stats": {k: {"min": v["min"], "max": v["max"]} for k, v in stats.items()},
+    }
+    sorting = meta.row_group(0).sorting_columns if meta.num_row_groups else ()
+    if sorting:
+        entry["sorted_by"] = [c for c, _ in pq.SortingColumn.to_ordering(schema, sorting)[0]]
+    return entry
+
+
+def _is_delta(entry: dict) -> bool:
+    return entry.get("kind") == "columns"
+
+
+def _columns(entry: dict) -> List[str]:
+    return list(entry.get("columns") or entry["stats"])
+
+
+def _partition_entry(as_of_ts: str, files: List[dict]) -> dict:
+    stats: Dict[str, dict] = {}
+    for f in files:
+        for name, st in f["stats"].items():
+            cur = stats.setdefault(name, dict(st))
+            if None in (cur["min"], st["min"]):
+                cur.update(min=None, max=None)
+            else:
+                cur["min"] = min(cur["min"], st["min"])
+                cur["max"] = max(cur["max"], st["max"])
+    return {
+        PARTITION_KEY: as_of_ts,
+        "files": files,
+        "rows": sum(f["rows"] for f in files if not _is_delta(f)),
+        "stats": stats,
+    }
+
+
+@contextmanager
+def _locked(table_path: Path):
+    """Serialise manifest updates of one table across processes (POSIX only)."""
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+    with open(table_path / "_manifest.lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _write_manifest(table_path: Path, manifest: dict) -> None:
+    manifest["partitions"].sort(key=lambda p: p[PARTITION_KEY])
+    tmp = table_path / f".{MANIFEST_NAME}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(manifest, separators=(",", ":")))
+    os.replace(tmp, table_path / MANIFEST_NAME)
+
+
+def rebuild_manifest(table_name: str) -> dict:
+    """Index a table's partitions from disk and write its manifest."""
+    table_path = _root() / table_name
+    parts = []
+    for p in sorted(table_path.glob(f"{PARTITION_KEY}=*")):
+        if p.is_dir():
+            files = [_file_entry(f, table_path) for f in sorted(p.glob("*.parquet"))]
+            parts.append(_partition_entry(p.name.split("=", 1)[1], files))
+    manifest = {"version": 1, "table": table_name, "partitions": parts}
+    with _locked(table_path):
+        _write_manifest(table_path, manifest)
+    return manifest
+
+
+def read_manifest(table_name: str) -> dict:
+    """Return the table manifest (empty if the table does not exist).
+
+    Parsed manifests are memoised on the file's mtime, size and inode, so
+    repeated loads cost a single ``stat``.
+    """
+    table_path = _root() / table_name
+    path = table_path / MANIFEST_NAME
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        if not table_path.exists():
+            return {"version": 1, "table": table_name, "partitions": []}
+        return rebuild_manifest(table_name)
+    version = (st.st_mtime_ns, st.st_size, st.st_ino)
+    cached = _manifest_cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    manifest = json.loads(path.read_text())
+    manifest["_keys"] = [p[PARTITION_KEY] for p in manifest["partitions"]]
+    _manifest_cache[path] = (version, manifest)
+    return manifest
+
+
+def partitions(table_name: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[dict]:
+    """Manifest entries with ``date_from <= as_of_ts <= date_to`` (binary search)."""
+    manifest = read_manifest(table_name)
+    keys = manifest.get("_keys") or [p[PARTITION_KEY] for p in manifest["partitions"]]
+    lo = bisect.bisect_left(keys, date_from) if date_from else 0
+    hi = bisect.bisect_right(keys, date_to) if date_to else len(keys)
+    return manifest["partitions"][lo:hi]
+
+
+def _update_manifest(table_path: Path, table_name: str, as_of_ts: str, files: List[dict], *, append: bool) -> None:
+    with _locked(table_path):
+        path = table_path / MANIFEST_NAME
+        if path.exists():
+            manifest = json.loads(path.read_text())
+        else:
+            manifest = {"version": 1, "table": table_name, "partitions": []}
+        old = [p for p in manifest["partitions"] if p[PARTITION_KEY] == as_of_ts]
+        if append and old:
+            files = old[0]["files"] + files
+        parts = [p for p in manifest["partitions"] if p[PARTITION_KEY] != as_of_ts]
+        parts.append(_partition_entry(as_of_ts, files))
+        manifest["partitions"] = parts
+        _write_manifest(table_path, manifest)
+
+
+# ---------------------------------------------------------------------------
+# Hot-partition cache
+# ---------------------------------------------------------------------------
+
+
+class PartitionCache:
+    """LRU cache of decoded partitions as memory-mapped Arrow IPC files.
+
+    A partition read through :func:`load` is written once to ``directory`` in
+    the Arrow IPC file format; later reads map that file instead of decoding
+    Parquet again, so repeated loads of hot dates are zero-copy. Entries are
+    keyed by table and partition and versioned by the manifest's per-write
+    file tokens, so a stale entry is never served even when another process
+    rewrote the partition with identical file names and sizes. Entries are
+    filled off the read path by :meth:`fill` on one background thread.
+    Least-recently-used entries are dropped once the cached files exceed
+    ``max_bytes``.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Size budget of the cached IPC files.
+    directory : str or Path, optional
+        Where to keep the IPC files; a fresh temporary directory by default.
+    """
+
+    def __init__(self, max_bytes: int, directory: Optional[Union[str, Path]] = None) -> None:
+        self.max_bytes = int(max_bytes)
+        self.directory = Path(directory) if directory is not None else Path(tempfile.mkdtemp(prefix="feature-cache-"))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (version, path, nbytes)
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, tuple] = {}  # key -> (token, future) of the fill in flight
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feature-cache")
+
+    @property
+    def nbytes(self) -> int:
+        return sum(e[2] for e in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple, version: tuple) -> Optional[pa.Table]:
+        """Memory-mapped table for ``key`` if cached at ``version``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            path = entry[1]
+        try:
+            with pa.memory_map(str(path)) as source:
+                return pa.ipc.open_file(source).read_all()
+        except (OSError, pa.ArrowInvalid):
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+
+    def put(self, key: tuple, version: tuple, table: pa.Table) -> pa.Table:
+        """Cache ``table`` and return its memory-mapped copy."""
+        if table.nbytes > self.max_bytes:
+            return table
+        path = self.directory / f"{uuid.uuid4().hex}.arrow"
+        tmp = path.with_name(f".{path.name}.tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        tmp.replace(path)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (version, path, path.stat().st_size)
+            self._evict()
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def fill(self, key: tuple, version: tuple, lf: pl.LazyFrame) -> None:
+        """Collect ``lf`` and cache it at ``version`` in the background.
+
+        At most one fill per key is in flight. A fill that fails (e.g. the
+        files were rewritten under it) only leaves the entry uncached, and one
+        finishing after an invalidation is discarded.
+        """
+        token = object()
+
+        def run() -> None:
+            try:
+                table = lf.collect().to_arrow()
+                with self._lock:
+                    current = self._pending.get(key, (None,))[0] is token
+                if current:
+                    self.put(key, version, table)
+            except Exception:  # noqa: BLE001 - a failed fill is just a later miss
+                pass
+            finally:
+                with self._lock:
+                    if self._pending.get(key, (None,))[0] is token:
+                        del self._pending[key]
+
+        with self._lock:
+            if key not in self._pending:
+                self._pending[key] = (token, self._executor.submit(run))
+
+    def wait(self) -> None:
+        """Block until the fills in flight have finished."""
+        with self._lock:
+            pending = [future for _, future in self._pending.values()]
+        for future in pending:
+            future.result()
+
+    def invalidate(self, table_path: Union[str, Path], as_of_ts: Optional[str] = None) -> None:
+        """Drop the cached partition (or every partition of the table)."""
+        table = str(Path(table_path).resolve())
+        with self._lock:
+            for key in [k for k in self._pending if k[0] == table and as_of_ts in (None, k[1])]:
+                del self._pending[key]
+            for key in [k for k in self._entries if k[0] == table and as_of_ts in (None, k[1])]:
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            for key in list(self._entries):
+                self._drop(key)
+
+    def close(self) -> None:
+        """Stop the fill thread and delete the cached files."""
+        self.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _drop(self, key: tuple) -> None:
+        # Frames already mapped from the file stay valid after the unlink (POSIX).
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[1].unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        total = self.nbytes
+        while total > self.max_bytes and self._entries:
+            key, (_, path, size) = self._entries.popitem(last=False)
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+_partition_cache: Optional[PartitionCache] = None
 
 
-def save(df: pd.DataFrame, table_name: str, as_of_ts: str) -> None:
+def enable_cache(max_mb: float = 512, directory: Optional[Union[str, Path]] = None) -> PartitionCache:
+    """Turn on the in-process hot-partition cache used by :func:`load`."""
+    global _partition_cache
+    disable_cache()
+    _partition_cache = PartitionCache(int(max_mb * 2**20), directory)
+    return _partition_cache
+
+
+def disable_cache() -> None:
+    """Turn off the hot-partition cache and delete its files."""
+    global _partition_cache
+    if _partition_cache is not None:
+        _partition_cache.close()
+    _partition_cache = None
+
+
+def _cached_partition(table_path: Path, part: dict) -> pl.LazyFrame:
+    cache = _partition_cache
+    key = (str(table_path.resolve()), part[PARTITION_KEY])
+    version = tuple((f["path"], f.get("token"), f["rows"], f["bytes"]) for f in part["files"])
+    table = cache.get(key, version)
+    if table is None:
+        lf = _scan_parts(table_path, [part])
+        cache.fill(key, version, lf)
+        return lf
+    return pl.from_arrow(table, rechunk=False).lazy()
+
+
+if os.environ.get("FEATURE_STORE_CACHE_MB"):
+    enable_cache(float(os.environ["FEATURE_STORE_CACHE_MB"]))
+
+
+# ---------------------------------------------------------------------------
+# Read / write
+# ---------------------------------------------------------------------------
+
+
+def _to_arrow(df: Frame) -> pa.Table:
+    if isinstance(df, pa.Table):
+        return df
+    if isinstance(df, pa.RecordBatch):
+        return pa.Table.from_batches([df])
+    if isinstance(df, pl.LazyFrame):
+        df = df.collect()
+    if isinstance(df, pl.DataFrame):
+        return df.to_arrow()
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _row_schema(table_path: Path, part: dict) -> pa.Schema:
+    rows = [f for f in part["files"] if not _is_delta(f)]
+    return pq.read_schema(table_path / rows[0]["path"]).remove_metadata()
+
+
+def _conform(table: pa.Table, schema: pa.Schema, target: str) -> pa.Table:
+    """Cast appended rows to the partition's row ``schema``."""
+    if set(table.column_names) != set(schema.names):
+        raise ValueError(
+            f"append to {target} must have columns {sorted(schema.names)}, got {sorted(table.column_names)}; "
+            'use mode="merge" to add columns'
+        )
+    try:
+        return table.select(schema.names).cast(schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as exc:
+        raise ValueError(f"append to {target} does not match the partition schema: {exc}") from exc
+
+
+def _column_delta(table: pa.Table, schema: pa.Schema, keys: Optional[Sequence[str]], target: str) -> tuple:
+    """Validate a column delta; return it with key columns cast to the partition's types."""
+    keys = list(keys) if keys is not None else [k for k in MERGE_KEYS if k in table.column_names]
+    missing = [k for k in keys if k not in table.column_names or k not in schema.names]
+    if not keys or missing:
+        raise ValueError(f"merge into {target} needs key columns present in both frames, got {keys}")
+    if len(keys) == table.num_columns:
+        raise ValueError(f"merge into {target} has no value columns")
+    if pl.from_arrow(table.select(keys)).is_duplicated().any():
+        raise ValueError(f"merge into {target} has duplicate keys {keys}")
+    for k in keys:
+        i = table.schema.get_field_index(k)
+        table = table.set_column(i, k, table.column(k).cast(schema.field(k).type))
+    return table, keys
+
+
+def save(
+    df: Frame,
+    table_name: str,
+    as_of_ts: str,
+    *,
+    mode: str = "overwrite",
+    row_group_size: Optional[int] = None,
+    compression: str = "snappy",
+    sort_by: Optional[Sequence[str]] = None,
+    keys: Optional[Sequence[str]] = None,
+) -> None:
     """Save a DataFrame to partitioned Parquet files.
 
     Parameters
     ----------
-    df : pd.DataFrame
+    df : pd.DataFrame, pl.DataFrame, pl.LazyFrame or pa.Table
         Data to store.
     table_name : str
         Name of the table folder.
     as_of_ts : str
         Partition timestamp in ``YYYY-MM-DD`` format.
+    mode : {"overwrite", "append", "merge"}
+        Replace the partition; add the rows of ``df`` as one more file (they
+        must have the partition's columns); or add the columns of ``df`` as a
+        delta joined onto the partition's rows on ``keys`` at read time, where
+        the delta's values replace existing ones for matching keys. A
+        ``ValueError`` is raised when ``df`` does not fit the mode.
+    row_group_size : int, optional
+        Maximum rows per Parquet row group (pyarrow default if ``None``).
+    compression : str
+        Parquet codec, e.g. ``"snappy"``, ``"zstd"`` or ``"none"``.
+    sort_by : sequence of str, optional
+        Sort the rows by these columns before writing and record the order in
+        the footer, together with a page index, so readers can skip row groups
+        and pages by min/max statistics.
+    keys : sequence of str, optional
+        Join keys of a ``"merge"`` delta; by default ``symbol`` and
+        ``as_of_ts``, whichever are in ``df``. Keys must be unique in ``df``.
     """
-    table_path = FEATURE_STORE_ROOT / table_name
+    if mode not in SAVE_MODES:
+        raise ValueError(f"mode must be one of {SAVE_MODES}")
+    table = _to_arrow(df)
+    write = dict(row_group_size=row_group_size, compression=compression)
+    if sort_by:
+        ordering = [(c, "ascending") for c in sort_by]
+        table = table.sort_by(ordering)
+        write.update(sorting_columns=pq.SortingColumn.from_ordering(table.schema, ordering), write_page_index=True)
+    table_path = _root() / table_name
     table_path.mkdir(parents=True, exist_ok=True)
-    target = table_path / f"as_of_ts={as_of_ts}"
+    if not (table_path / MANIFEST_NAME).exists() and any(table_path.glob(f"{PARTITION_KEY}=*")):
+        rebuild_manifest(table_name)  # index partitions written before manifests existed
+    target = table_path / f"{PARTITION_KEY}={as_of_ts}"
+    if _partition_cache is not None:
+        _partition_cache.invalidate(table_path, as_of_ts)
+
+    existing = partitions(table_name, as_of_ts, as_of_ts) if target.exists() else []
+    if mode == "merge" and not existing:
+        raise ValueError(f"merge needs an existing partition {target.name}")
+    if mode in ("append", "merge") and existing:
+        schema = _row_schema(table_path, existing[0])
+        if mode == "append":
+            table, prefix, extra = _conform(table, schema, target.name), "part", {}
+        else:
+            table, merge_keys = _column_delta(table, schema, keys, target.name)
+            prefix, extra = "cols", {"kind": "columns", "keys": merge_keys}
+        name = f"{prefix}-{uuid.uuid4().hex[:12]}.parquet"
+        tmp_file = target / f".{name}.tmp"
+        pq.write_table(table, tmp_file, **write)
+        entry = _file_entry(tmp_file, table_path)
+        entry.update(path=f"{target.name}/{name}", **extra)
+        tmp_file.replace(target / name)
+        _update_manifest(table_path, table_name, as_of_ts, [entry], append=True)
+        return
+
     tmp_dir = Path(tempfile.mkdtemp(dir=table_path))
     tmp_file = tmp_dir / "data.parquet"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(tmp_file, index=False)
+    pq.write_table(table, tmp_file, **write)
+    entry = _file_entry(tmp_file, tmp_dir)
+    entry["path"] = f"{target.name}/{entry['path']}"
     if target.exists():
         shutil.rmtree(target)
     tmp_dir.rename(target)
+    _update_manifest(table_path, table_name, as_of_ts, [entry], append=False)
+
+
+def _scan(table_path: Path, files: List[dict], hive: bool = False) -> pl.LazyFrame:
+    """Scan manifest files; a diagonal concat when their columns differ.
+
+    With ``hive`` the partition key is added as a string column.
+    """
+    runs: List[tuple] = []  # consecutive files with the same columns, in manifest order
+    for f in files:
+        cols = tuple(f.get("columns") or f["stats"])
+        if runs and runs[-1][0] == cols:
+            runs[-1][1].append(str(table_path / f["path"]))
+        else:
+            runs.append((cols, [str(table_path / f["path"])]))
+    scans = [pl.scan_parquet(paths, hive_partitioning=hive) for _, paths in runs]
+    return scans[0] if len(scans) == 1 else pl.concat(scans, how="diagonal")
+
 
+def _merge_deltas(base: pl.LazyFrame, table_path: Path, rows: List[dict], deltas: List[dict]) -> pl.LazyFrame:
+    """Left-join column deltas, in write order, onto a partition's rows."""
+    columns = set().union(*(_columns(f) for f in rows))
+    for f in deltas:
+        keys = f["keys"]
+        values = [c for c in _columns(f) if c not in keys]
+        update = [c for c in values if c in columns]
+        delta = pl.scan_parquet(str(table_path / f["path"]), hive_partitioning=False)
+        base = base.join(delta.with_columns(pl.lit(True).alias("__hit")), on=keys, how="left", suffix="__delta")
+        base = base.with_columns(
+            [pl.when(pl.col("__hit")).then(pl.col(f"{c}__delta")).otherwise(pl.col(c)).alias(c) for c in update]
+        ).drop([f"{c}__delta" for c in update] + ["__hit"])
+        columns.update(values)
+    return base
 
-def load(table_name: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> pl.LazyFrame:
+
+def _scan_parts(table_path: Path, parts: List[dict], hive: bool = False) -> Optional[pl.LazyFrame]:
+    """Scan partitions in order; partitions with column deltas are merged on their keys."""
+    frames: List[pl.LazyFrame] = []
+    run: List[dict] = []  # row files of consecutive partitions without deltas
+    for p in parts:
+        rows = [f for f in p["files"] if not _is_delta(f)]
+        deltas = [f for f in p["files"] if _is_delta(f)]
+        if not deltas or not rows:
+            run.extend(rows)
+            continue
+        if run:
+            frames.append(_scan(table_path, run, hive))
+            run = []
+        frames.append(_merge_deltas(_scan(table_path, rows, hive), table_path, rows, deltas))
+    if run:
+        frames.append(_scan(table_path, run, hive))
+    if not frames:
+        return None
+    return frames[0] if len(frames) == 1 else pl.concat(frames, how="diagonal")
+
+
+def load(
+    table_name: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    *,
+    cache: bool = True,
+) -> pl.LazyFrame:
     """Load data as a Polars ``LazyFrame``.
 
     Parameters
@@ -44,20 +628,232 @@ def load(table_name: str, date_from: Optional[str] = None, date_to: Optional[str
         Start partition ``YYYY-MM-DD``.
     date_to : str, optional
         End partition ``YYYY-MM-DD``.
+    cache : bool
+        Serve partitions from the hot-partition cache when it is enabled
+        (see :func:`enable_cache`).
     """
-    table_path = FEATURE_STORE_ROOT / table_name
+    table_path = _root() / table_name
     if not table_path.exists():
         return pl.LazyFrame()
-    parts = []
-    for p in table_path.glob("as_of_ts=*"):
-        if not p.is_dir():
-            continue
-        date_str = p.name.split("=")[1]
-        if date_from and date_str < date_from:
+    parts = partitions(table_name, date_from, date_to)
+    if cache and _partition_cache is not None and parts:
+        frames = [_cached_partition(table_path, p) for p in parts]
+        return frames[0] if len(frames) == 1 else pl.concat(frames, how="diagonal")
+    lf = _scan_parts(table_path, parts)
+    return pl.LazyFrame() if lf is None else lf
+
+
+# ---------------------------------------------------------------------------
+# Point-in-time joins
+# ---------------------------------------------------------------------------
+
+
+def _to_lazy(df: Frame) -> pl.LazyFrame:
+    if isinstance(df, pl.LazyFrame):
+        return df
+    if isinstance(df, pl.DataFrame):
+        return df.lazy()
+    if isinstance(df, (pa.Table, pa.RecordBatch)):
+        return pl.from_arrow(df).lazy()
+    return pl.from_pandas(df).lazy()
+
+
+def _day(value) -> str:
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _table_schema(table_name: str) -> Dict[str, pl.DataType]:
+    """Polars dtypes of all columns in ``table_name``'s manifest, in first-seen order."""
+    table_path = _root() / table_name
+    schema: Dict[str, pl.DataType] = {}
+    for part in partitions(table_name):
+        for f in part["files"]:
+            if set(_columns(f)) <= schema.keys():
+                continue
+            arrow = pq.read_schema(table_path / f["path"]).remove_metadata()
+            for c, dtype in pl.from_arrow(arrow.empty_table()).schema.items():
+                schema.setdefault(c, dtype)
+    return schema
+
+
+def _feature_scan(table_name: str, parts: List[dict], on: str, dtype, available_after: timedelta) -> pl.LazyFrame:
+    """Scan ``parts`` with an ``on`` column cast to ``dtype``.
+
+    Partitions without an ``on`` column are stamped with their partition date
+    plus ``available_after``.
+    """
+    table_path = _root() / table_name
+    has_on = [all(on in _columns(f) for f in p["files"] if not _is_delta(f)) for p in parts]
+    stamped = [p for p, h in zip(parts, has_on) if h]
+    dated = [p for p, h in zip(parts, has_on) if not h]
+    scans = [_scan_parts(table_path, stamped)] if stamped else []
+    if dated:
+        day = pl.col(PARTITION_KEY).str.strptime(pl.Datetime("us"), "%Y-%m-%d")
+        lf = _scan_parts(table_path, dated, hive=True).with_columns((day + available_after).alias(on))
+        scans.append(lf if on == PARTITION_KEY else lf.drop(PARTITION_KEY))
+    lf = scans[0] if len(scans) == 1 else pl.concat(scans, how="diagonal")
+    return lf.with_columns(pl.col(on).cast(dtype))
+
+
+def as_of_join(
+    entity_df: Frame,
+    tables: Union[List[str], Dict[str, Optional[List[str]]]],
+    *,
+    on: str = PARTITION_KEY,
+    by: str = "symbol",
+    tolerance: Optional[timedelta] = None,
+    available_after: timedelta = timedelta(days=1),
+) -> pl.LazyFrame:
+    """Point-in-time join of feature tables onto an entity frame.
+
+    Every entity row ``(by, on)`` receives, per table, the latest feature row
+    of the same ``by`` with a timestamp ``<= on`` (a backward as-of join), so
+    no value from the future leaks into the result. Only partitions between
+    the entity frame's earliest ``on`` (minus ``tolerance`` and
+    ``available_after``) and its latest ``on`` are scanned, and the result is
+    a lazy plan that Polars can run out-of-core. Each table adds the same
+    typed columns whatever partitions are scanned; they are null where
+    nothing matched.
+
+    Parameters
+    ----------
+    entity_df : pd.DataFrame, pl.DataFrame, pl.LazyFrame or pa.Table
+        Rows to label, with ``by`` and ``on`` (datetime) columns.
+    tables : list of str or dict
+        Feature tables to join, or ``{table: [columns]}`` to select columns
+        (``None`` keeps all columns in the table's manifest). Columns that
+        clash with columns already in the result are prefixed with
+        ``<table>_``. Unknown tables or columns raise ``ValueError``.
+    on : str
+        Timestamp column. Files that lack it are stamped with their partition
+        date plus ``available_after``.
+    by : str
+        Entity key, matched exactly.
+    tolerance : timedelta, optional
+        Maximum feature age; older matches are null.
+    available_after : timedelta
+        When rows without an ``on`` column become known, counted from midnight
+        of their partition date. The default of one day treats a partition as
+        end-of-day data; use e.g. ``timedelta(hours=16)`` for values known at
+        the close, or ``timedelta(0)`` for values known before the open.
+
+    Returns
+    -------
+    pl.LazyFrame
+        ``entity_df`` in its original row order with the feature columns added.
+    """
+    if available_after < timedelta(0):
+        raise ValueError(f"available_after must not be negative, got {available_after}")
+    if not isinstance(tables, dict):
+        tables = {name: None for name in tables}
+    entity = _to_lazy(entity_df).with_row_index("__row")
+    dtype = entity.schema[on]
+    lo, hi = entity.select(pl.col(on).min().alias("lo"), pl.col(on).max().alias("hi")).collect().row(0)
+    out = entity.sort(on)
+    names = set(entity.columns)
+    for table_name, columns in tables.items():
+        if lo is None:
+            parts = []
+        else:
+            start = _day(lo - tolerance - available_after) if tolerance is not None else None
+            parts = partitions(table_name, start, _day(hi))
+        schema = _table_schema(table_name)
+        if not schema:
+            raise ValueError(f"feature table {table_name!r} has no partitions")
+        wanted = [c for c in (schema if columns is None else columns) if c not in (by, on)]
+        unknown = [c for c in wanted if c not in schema]
+        if unknown:
+            raise ValueError(f"feature table {table_name!r} has no columns {unknown}")
+        rename = {c: f"{table_name}_{c}" for c in wanted if c in names}
+        names.update(rename.get(c, c) for c in wanted)
+        if not parts:
+            out = out.with_columns([pl.lit(None, dtype=schema[c]).alias(rename.get(c, c)) for c in wanted])
             continue
-        if date_to and date_str > date_to:
+        right = _feature_scan(table_name, parts, on, dtype, available_after)
+        missing = [c for c in wanted if c not in right.columns]  # only in partitions outside the range
+        right = right.with_columns([pl.lit(None, dtype=schema[c]).alias(c) for c in missing])
+        right = right.select([by, on, *wanted]).rename(rename).sort(on)
+        out = out.join_asof(right, on=on, by=by, strategy="backward", tolerance=tolerance)
+    return out.sort("__row").drop("__row")
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+
+
+def compact(
+    table_name: str,
+    *,
+    sort_by: Sequence[str] = COMPACT_SORT_BY,
+    row_group_size: int = COMPACT_ROW_GROUP_SIZE,
+    compression: str = "zstd",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    force: bool = False,
+) -> List[str]:
+    """Rewrite partitions as one file sorted by ``sort_by``.
+
+    Appended rows and column deltas are merged and rows are sorted so each row group covers a
+    narrow key range; with the min/max statistics and page index written by
+    ``save(sort_by=...)``, a filter on one symbol reads only the row groups
+    holding it. Keys missing from a partition are ignored. Partitions that are
+    already a single file sorted by the same keys are skipped unless
+    ``force``. Run it while nothing else writes to the table: a concurrent
+    append to a partition being compacted is lost.
+
+    Returns
+    -------
+    list of str
+        Partitions that were rewritten.
+    """
+    table_path = _root() / table_name
+    done = []
+    for part in partitions(table_name, date_from, date_to):
+        columns = set().union(*(_columns(f) for f in part["files"]))
+        keys = [c for c in sort_by if c in columns]
+        files = part["files"]
+        if not force and len(files) == 1 and files[0].get("sorted_by", []) == keys:
             continue
-        parts.append(str(p / "*.parquet"))
-    if not parts:
-        return pl.LazyFrame()
-    return pl.scan_parquet(parts)
+        table = _scan_parts(table_path, [part]).collect().to_arrow()
+        save(
+            table,
+            table_name,
+            part[PARTITION_KEY],
+            row_group_size=row_group_size,
+            compression=compression,
+            sort_by=keys,
+        )
+        done.append(part[PARTITION_KEY])
+    return done
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Feature store maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("compact", help="Rewrite partitions sorted by key columns")
+    p.add_argument("table")
+    p.add_argument("--sort-by", nargs="+", default=list(COMPACT_SORT_BY), help="Sort key columns")
+    p.add_argument("--row-group-size", type=int, default=COMPACT_ROW_GROUP_SIZE)
+    p.add_argument("--compression", default="zstd")
+    p.add_argument("--from", dest="date_from", help="First partition YYYY-MM-DD")
+    p.add_argument("--to", dest="date_to", help="Last partition YYYY-MM-DD")
+    p.add_argument("--force", action="store_true", help="Rewrite partitions that are already compacted")
+    args = parser.parse_args(argv)
+
+    done = compact(
+        args.table,
+        sort_by=args.sort_by,
+        row_group_size=args.row_group_size,
+        compression=args.compression,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        force=args.force,
+    )
+    print(f"[feature_store] compacted {len(done)} partition(s) of {args.table}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
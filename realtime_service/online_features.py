@@ -0,0 +1,344 @@
+"""Online feature tier materialized from the feature store.
+
+:func:`materialize` takes the latest non-null values per symbol from a
+``feature_store`` partition and writes them to a Redis-compatible key-value
+store in pipelined batches:
+
+* ``score:{symbol}`` – the score as a decimal string, the key the realtime
+  service already serves at ``/score/{symbol}``;
+* ``feat:{symbol}`` – the full numeric feature vector in a compact binary
+  encoding: a 14-byte header (format version, item size, schema id, as-of
+  timestamp in ns) followed by little-endian ``float32`` (or ``float64``)
+  values;
+* ``feat:__schema__`` – JSON with the column names and the schema id, stored
+  once instead of in every value.
+
+:func:`get_online_features` reads the schema and any number of vectors with a
+single ``MGET``, i.e. one round trip. Vectors written under another schema
+(while a materialization that changes the columns is in flight) read as
+missing rather than being decoded with the wrong column names.
+
+This module only needs the standard library at serving time; pandas, numpy
+and ``feature_store`` are imported by :func:`materialize`. :class:`InMemoryKV`
+mimics the small part of the redis-py client used here, for tests and local
+runs without a Redis server.
+
+CLI usage:
+
+    python -m realtime_service.online_features --table scores [--as-of 2024-01-02] [--redis-url redis://...]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+__all__ = [
+    "FEATURE_PREFIX",
+    "SCORE_PREFIX",
+    "InMemoryKV",
+    "aget_online_features",
+    "decode_batch",
+    "decode_vector",
+    "encode_vector",
+    "feature_key",
+    "get_online_features",
+    "materialize",
+    "schema_id",
+    "schema_key",
+]
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+FEATURE_PREFIX = "feat"
+SCORE_PREFIX = "score"
+FORMAT_VERSION = 1
+DEFAULT_BATCH_SIZE = 1_000
+
+_HEADER = struct.Struct("<BBIq")  # version, itemsize, schema id, as-of ns
+_TYPECODES = {4: "f", 8: "d"}
+
+
+def feature_key(symbol: str, prefix: str = FEATURE_PREFIX) -> str:
+    return f"{prefix}:{symbol}"
+
+
+def schema_key(prefix: str = FEATURE_PREFIX) -> str:
+    return f"{prefix}:__schema__"
+
+
+def schema_id(columns: Sequence[str]) -> int:
+    """CRC32 of the column names, stamped into every encoded vector."""
+    return zlib.crc32(json.dumps(list(columns)).encode())
+
+
+def encode_vector(values: Sequence[float], *, sid: int, as_of_ns: int, itemsize: int = 4) -> bytes:
+    """Header plus little-endian floats of ``itemsize`` bytes."""
+    payload = array(_TYPECODES[itemsize], values)
+    if sys.byteorder == "big":  # pragma: no cover
+        payload.byteswap()
+    return _HEADER.pack(FORMAT_VERSION, itemsize, sid, as_of_ns) + payload.tobytes()
+
+
+def decode_vector(raw: bytes, *, sid: Optional[int] = None) -> Optional[tuple]:
+    """Return ``(values, as_of_ns)``, or ``None`` if ``raw`` has another schema id."""
+    version, itemsize, value_sid, as_of_ns = _HEADER.unpack_from(raw)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported feature encoding version {version}")
+    if sid is not None and value_sid != sid:
+        return None
+    values = array(_TYPECODES[itemsize])
+    values.frombytes(raw[_HEADER.size :])
+    if sys.byteorder == "big":  # pragma: no cover
+        values.byteswap()
+    return values.tolist(), as_of_ns
+
+
+def decode_batch(symbols: Sequence[str], raw_schema: Optional[bytes], raw_values: Sequence[Optional[bytes]]) -> Dict[str, Optional[dict]]:
+    """Decode an ``MGET`` of the schema key followed by one key per symbol.
+
+    Each symbol maps to ``{column: value, ..., "as_of_ns": int}`` or ``None``
+    when it has no (current) vector.
+    """
+    if raw_schema is None:
+        return {s: None for s in symbols}
+    schema = json.loads(raw_schema)
+    columns, sid = schema["columns"], schema["id"]
+    out: Dict[str, Optional[dict]] = {}
+    for symbol, raw in zip(symbols, raw_values):
+        decoded = decode_vector(raw, sid=sid) if raw is not None else None
+        if decoded is None:
+            out[symbol] = None
+            continue
+        values, as_of_ns = decoded
+        row = dict(zip(columns, values))
+        row["as_of_ns"] = as_of_ns
+        out[symbol] = row
+    return out
+
+
+def _redis_client(url: str = REDIS_URL):
+    import redis
+
+    return redis.Redis.from_url(url)
+
+
+def get_online_features(
+    symbols: Iterable[str],
+    *,
+    client: Any = None,
+    prefix: str = FEATURE_PREFIX,
+) -> Dict[str, Optional[dict]]:
+    """Fetch the feature vectors of ``symbols`` in one round trip.
+
+    ``client`` is any object with a redis-py style ``mget`` returning bytes
+    (i.e. not ``decode_responses=True``); a client for ``REDIS_URL`` is
+    created when omitted.
+    """
+    symbols = list(symbols)
+    client = client if client is not None else _redis_client()
+    raw = client.mget([schema_key(prefix)] + [feature_key(s, prefix) for s in symbols])
+    return decode_batch(symbols, raw[0], raw[1:])
+
+
+async def aget_online_features(
+    symbols: Iterable[str],
+    *,
+    client: Any,
+    prefix: str = FEATURE_PREFIX,
+) -> Dict[str, Optional[dict]]:
+    """Async :func:`get_online_features` for ``redis.asyncio`` clients."""
+    symbols = list(symbols)
+    raw = await client.mget([schema_key(prefix)] + [feature_key(s, prefix) for s in symbols])
+    return decode_batch(symbols, raw[0], raw[1:])
+
+
+class InMemoryKV:
+    """Dict-backed stand-in for the redis-py calls used by this module.
+
+    Values are stored as bytes, like Redis; ``round_trips`` counts requests
+    (one per ``get``/``set``/``mget`` and one per pipeline ``execute``).
+    TTLs are accepted and ignored.
+    """
+
+    def __init__(self) -> None:
+        self.data: Dict[str, bytes] = {}
+        self.round_trips = 0
+
+    @staticmethod
+    def _bytes(value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def get(self, key: str) -> Optional[bytes]:
+        self.round_trips += 1
+        return self.data.get(key)
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        self.round_trips += 1
+        self.data[key] = self._bytes(value)
+        return True
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        self.round_trips += 1
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, transaction: bool = True) -> "_Pipeline":
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, kv: InMemoryKV) -> None:
+        self._kv = kv
+        self._ops: List[tuple] = []
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None) -> "_Pipeline":
+        self._ops.append((key, InMemoryKV._bytes(value)))
+        return self
+
+    def execute(self) -> List[bool]:
+        self._kv.round_trips += 1
+        self._kv.data.update(self._ops)
+        done, self._ops = [True] * len(self._ops), []
+        return done
+
+    def __enter__(self) -> "_Pipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._ops = []
+
+
+def materialize(
+    table_name: str,
+    client: Any,
+    as_of_ts: Optional[str] = None,
+    *,
+    symbol_col: str = "symbol",
+    ts_col: str = "as_of_ts",
+    score_col: Optional[str] = "score",
+    features: Optional[Sequence[str]] = None,
+    prefix: str = FEATURE_PREFIX,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    ttl: Optional[int] = None,
+    itemsize: int = 4,
+) -> int:
+    """Push the latest vector per symbol of one partition to the online tier.
+
+    Parameters
+    ----------
+    table_name : str
+        Feature store table.
+    client
+        Redis-compatible client exposing ``pipeline()``.
+    as_of_ts : str, optional
+        Partition ``YYYY-MM-DD``; the latest partition by default.
+    ts_col : str
+        Row timestamp; rows are ordered by it when present, otherwise file
+        order is used. Each column takes its last non-null (and non-NaN)
+        value per symbol, so a partly null latest row does not blank out
+        older values. Columns a symbol never filled are encoded as NaN and
+        a symbol without any score gets no ``score:{symbol}`` key.
+    score_col : str, optional
+        Column also written to ``score:{symbol}``.
+    features : sequence of str, optional
+        Vector columns; all numeric columns other than the symbol and the
+        timestamp by default.
+    batch_size : int
+        Keys per pipelined request.
+    ttl : int, optional
+        Expiry in seconds for the written keys.
+    itemsize : {4, 8}
+        Bytes per encoded value (``float32`` or ``float64``).
+
+    Returns
+    -------
+    int
+        Number of symbols written.
+    """
+    import numpy as np
+    import pandas as pd
+    import polars as pl
+
+    import feature_store
+
+    if itemsize not in _TYPECODES:
+        raise ValueError("itemsize must be 4 or 8")
+    if as_of_ts is None:
+        parts = feature_store.partitions(table_name)
+        if not parts:
+            return 0
+        as_of_ts = parts[-1][feature_store.PARTITION_KEY]
+    lf = feature_store.load(table_name, as_of_ts, as_of_ts)
+    schema = lf.schema
+    if not schema:
+        return 0
+    if ts_col in schema:
+        lf = lf.sort(ts_col)
+    lf = lf.with_columns([pl.col(c).fill_nan(None) for c, dtype in schema.items() if dtype.is_float()])
+    latest = lf.group_by(symbol_col, maintain_order=True).agg(pl.all().drop_nulls().last()).collect()
+    if features is None:
+        features = [c for c, dtype in schema.items() if c not in (symbol_col, ts_col) and dtype.is_numeric()]
+    features = list(features)
+
+    symbols = latest[symbol_col].cast(pl.Utf8).to_list()
+    matrix = latest.select(pl.col(features).cast(pl.Float64)).to_numpy()
+    matrix = np.ascontiguousarray(matrix, dtype="<f4" if itemsize == 4 else "<f8")
+    if ts_col in schema:
+        as_of = pd.to_datetime(latest[ts_col].to_pandas()).astype("int64").to_numpy()
+    else:
+        as_of = np.full(len(symbols), pd.Timestamp(as_of_ts).value, dtype=np.int64)
+    scores = latest[score_col].cast(pl.Float64).to_list() if score_col and score_col in schema else None
+
+    sid = schema_id(features)
+    header = [_HEADER.pack(FORMAT_VERSION, itemsize, sid, int(ns)) for ns in as_of]
+    meta = json.dumps({"columns": features, "id": sid, "itemsize": itemsize, "as_of_ts": as_of_ts})
+    pipe = client.pipeline(transaction=False)
+    pipe.set(schema_key(prefix), meta)
+    pending = 1
+    for i, symbol in enumerate(symbols):
+        pipe.set(feature_key(symbol, prefix), header[i] + matrix[i].tobytes(), ex=ttl)
+        pending += 1
+        if scores is not None and scores[i] is not None:
+            pipe.set(f"{SCORE_PREFIX}:{symbol}", repr(scores[i]), ex=ttl)
+            pending += 1
+        if pending >= batch_size:
+            pipe.execute()
+            pending = 0
+    if pending:
+        pipe.execute()
+    return len(symbols)
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Materialize feature store vectors into Redis")
+    parser.add_argument("--table", required=True, help="Feature store table")
+    parser.add_argument("--as-of", help="Partition YYYY-MM-DD (latest by default)")
+    parser.add_argument("--redis-url", default=REDIS_URL)
+    parser.add_argument("--score-col", default="score")
+    parser.add_argument("--features", nargs="+", help="Vector columns (all numeric by default)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Keys per pipeline")
+    parser.add_argument("--ttl", type=int, help="Key expiry in seconds")
+    parser.add_argument("--float64", action="store_true", help="Encode values as float64")
+    args = parser.parse_args(argv)
+
+    n = materialize(
+        args.table,
+        _redis_client(args.redis_url),
+        args.as_of,
+        score_col=args.score_col,
+        features=args.features,
+        batch_size=args.batch_size,
+        ttl=args.ttl,
+        itemsize=8 if args.float64 else 4,
+    )
+    print(f"[online_features] materialized {n} symbol(s) from {args.table}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -3,8 +3,11 @@ from redis.asyncio import Redis
 import os
 import asyncio
 
+from realtime_service.online_features import aget_online_features
+
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 redis = Redis.from_url(REDIS_URL, decode_responses=True)
+redis_bytes = Redis.from_url(REDIS_URL)  # binary feature vectors
 
 app = FastAPI()
 
@@ -15,6 +18,12 @@ async def get_score(symbol: str):
     return {"symbol": symbol, "score": float(value) if value is not None else None}
 
 
+@app.get("/features")
+async def get_features(symbols: str):
+    """Feature vectors for comma-separated ``symbols``, read with one MGET."""
+    return await aget_online_features([s for s in symbols.split(",") if s], client=redis_bytes)
+
+
 @app.websocket("/stream")
 async def stream(websocket: WebSocket):
     await websocket.accept()
@@ -0,0 +1,222 @@
+"""Content-addressed memoization for research CI gates.
+
+The research CLIs (``research.spa``, ``research.capacity``,
+``research.leak_checks`` and ``data.bad_tick_filter``) are pure functions of
+their input files and parameters. :func:`cached_call` keys a result by
+
+    SHA-256(namespace, input file contents, parameters, in-repo source the function depends on)
+
+and pickles it under ``RESEARCH_CACHE_ROOT/<namespace>/<key>.pkl``. Unchanged
+CI gates therefore return immediately, while any edit to the data, the
+parameters or any in-repo module the computing function imports, directly or
+transitively (e.g. ``engine.rng`` for ``research.spa``), produces a new key. Entries are written
+atomically (tmp file + rename) and reads refresh the file's mtime, so
+:meth:`ResultCache.evict` drops least-recently-used entries once the cache
+exceeds ``RESEARCH_CACHE_MAX_MB``.
+
+    >>> cached_call("spa", spa_p_value, returns, inputs=[path], params={"B": 1000})  # doctest: +SKIP
+"""
+from __future__ import annotations
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import sys
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping
+
+__all__ = [
+    "RESEARCH_CACHE_ROOT",
+    "RESEARCH_CACHE_MAX_MB",
+    "ResultCache",
+    "cached_call",
+    "file_digest",
+]
+
+RESEARCH_CACHE_ROOT = Path(os.getenv("RESEARCH_CACHE_ROOT", "./.research_cache"))
+RESEARCH_CACHE_MAX_MB = float(os.getenv("RESEARCH_CACHE_MAX_MB", "512"))
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+_BLOCK = 1 << 20
+_MISSING = object()
+
+
+def file_digest(path: str | Path) -> str:
+    """SHA-256 of a file's contents, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _imported_modules(path: Path, package: str) -> set[str]:
+    """Names of the modules imported anywhere in the source file ``path``."""
+    names: set[str] = set()
+    for node in ast.walk(ast.parse(path.read_text(), filename=str(path))):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parent = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                base = f"{parent}.{base}" if base else parent
+            names.add(base)
+            names.update(f"{base}.{alias.name}" for alias in node.names)  # submodules
+    # parent packages run their __init__ on import
+    return names | {name.rsplit(".", k)[0] for name in names for k in range(1, name.count(".") + 1)}
+
+
+def _source_file(name: str, root: Path) -> Path | None:
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    path = Path(spec.origin).resolve()
+    if root not in path.parents or "site-packages" in path.parts:
+        return None
+    return path
+
+
+def _module_digest(fn: Callable, *, root: Path = REPO_ROOT) -> str:
+    """Digest of ``fn``'s module and every in-repo module it imports, transitively."""
+    fn = getattr(fn, "func", fn)  # functools.partial
+    module = sys.modules.get(getattr(fn, "__module__", ""), None)
+    path = getattr(module, "__file__", None)
+    if not path:
+        return ""
+    root = root.resolve()
+    start = Path(path).resolve()
+    seen = {start: module.__name__}
+    queue = [start]
+    while queue:
+        current = queue.pop()
+        name = seen[current]
+        package = name if current.name == "__init__.py" else name.rpartition(".")[0]
+        for dep in _imported_modules(current, package):
+            dep_path = _source_file(dep, root)
+            if dep_path is not None and dep_path not in seen:
+                seen[dep_path] = dep
+                queue.append(dep_path)
+    digest = hashlib.sha256()
+    for dep_path in sorted(seen):
+        label = dep_path.relative_to(root) if root in dep_path.parents else dep_path.name
+        digest.update(f"{label}:".encode())
+        digest.update(file_digest(dep_path).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """On-disk pickle cache with size-based LRU eviction.
+
+    Parameters
+    ----------
+    root : Path, optional
+        Cache directory; defaults to ``RESEARCH_CACHE_ROOT``.
+    max_bytes : int, optional
+        Size budget enforced after every :meth:`put`; defaults to
+        ``RESEARCH_CACHE_MAX_MB``.
+    """
+
+    def __init__(self, root: str | Path | None = None, *, max_bytes: int | None = None) -> None:
+        self.root = Path(root) if root is not None else RESEARCH_CACHE_ROOT
+        self.max_bytes = int(max_bytes if max_bytes is not None else RESEARCH_CACHE_MAX_MB * 2**20)
+
+    @staticmethod
+    def key(
+        namespace: str,
+        *,
+        inputs: Iterable[str | Path] = (),
+        params: Mapping[str, Any] | None = None,
+        version: str = "",
+    ) -> str:
+        """Digest of the namespace, input file contents, parameters and code version."""
+        digest = hashlib.sha256(namespace.encode())
+        for path in inputs:
+            digest.update(file_digest(path).encode())
+        digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+        digest.update(version.encode())
+        return digest.hexdigest()
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / f"{key}.pkl"
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        path = self._path(namespace, key)
+        try:
+            with open(path, "rb") as fh:
+                value = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return default
+        os.utime(path)  # mark as recently used
+        return value
+
+    def put(self, namespace: str, key: str, value: Any) -> Path:
+        path = self._path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+        self.evict()
+        return path
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob("*/*.pkl"))
+
+    def evict(self) -> list[Path]:
+        """Delete least-recently-used entries until the cache fits ``max_bytes``."""
+        entries = []
+        for p in self.root.glob("*/*.pkl"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:  # removed concurrently
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed.append(path)
+        return removed
+
+    def clear(self) -> None:
+        for p in self.root.glob("*/*.pkl"):
+            p.unlink(missing_ok=True)
+
+
+def cached_call(
+    namespace: str,
+    fn: Callable[..., Any],
+    *args: Any,
+    inputs: Iterable[str | Path] = (),
+    params: Mapping[str, Any] | None = None,
+    cache: ResultCache | None = None,
+    enabled: bool = True,
+    **kwargs: Any,
+) -> Any:
+    """Return ``fn(*args, **kwargs)``, memoized on disk.
+
+    ``inputs`` are the files the result depends on and ``params`` every other
+    argument that affects it; the source of ``fn``'s module and of the in-repo
+    modules it imports (transitively) is part of the key.
+    With ``enabled=False`` the function is simply called.
+    """
+    if not enabled:
+        return fn(*args, **kwargs)
+    cache = cache or ResultCache()
+    key = cache.key(namespace, inputs=list(inputs), params=params, version=_module_digest(fn))
+    value = cache.get(namespace, key, _MISSING)
+    if value is _MISSING:
+        value = fn(*args, **kwargs)
+        cache.put(namespace, key, value)
+    return value
@@ -1,81 +1,291 @@
 """Capacity curve estimation utilities.
 
-Given a table of executed *fills* with quantity (Q), fill price, and realised
-slippage (bps), estimate the capacity curve – net PnL versus size – and output:
+Given raw executed *fills* with quantity (``Q``), fill ``price`` and realised
+slippage (``slippage_bps``), estimate the capacity curve – net PnL versus size.
+Fills are streamed in chunks (CSV or Parquet, see
+``engine.models.calibration.iter_log_chunks``) into log-spaced quantity
+buckets that only keep running sums, so memory does not grow with the number
+of fills. A power-law impact curve
 
-* **PNG** plot saved under ``docs/research/figs/capacity_curve.png``.
-* **CSV** file with columns (Q, net_PnL, IS_bps) alongside the PNG.
+    slippage_bps(Q) = coef · Q^beta
+
+is then fitted to the bucket means (weighted by fill count) and the capacity
+limit is the ``Q`` where marginal slippage equals the alpha.
 
 This module contains both a programmatic API (`capacity_curve`) and a
 command-line interface suitable for CI:
 
-    python -m research.capacity --fills data/sample_fills.parquet
+    python -m research.capacity --fills data/sample_fills.parquet [--no-plot]
+
+The CLI writes
+
+* **PNG** plot saved under ``docs/research/figs/capacity_curve.png``.
+* **CSV** file with columns (Q, net_PnL, IS_bps, ...) alongside the PNG.
 
-If the fills file is absent, the script generates a synthetic dataset so CI can
-run without external artefacts.
+The programmatic API writes nothing unless ``out_dir`` is given. If the fills
+file is absent, the script generates a synthetic dataset so CI can run without
+external artefacts. The CLI memoizes the curve on the fills file contents and
+parameters (see ``research.cache``); ``--no-cache`` forces a recomputation.
 """
 from __future__ import annotations
 
 import argparse
-import sys
+import inspect
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable, Iterator
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+
+from engine.models.calibration import iter_log_chunks
+from engine.models.cost_model import SquareRootImpact
+from research.cache import cached_call
+
+__all__ = [
+    "BucketAccumulator",
+    "ImpactFit",
+    "capacity_curve",
+    "fit_impact",
+    "save_outputs",
+    "synthetic_fills",
+]
 
 FIG_DIR = Path("docs/research/figs")
-FIG_DIR.mkdir(parents=True, exist_ok=True)
-CSV_OUT = FIG_DIR / "capacity_results.csv"
-PNG_OUT = FIG_DIR / "capacity_curve.png"
-
-
-def _load_fills(path: Path) -> pd.DataFrame:
-    if path.exists():
-        return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
-    # synthesize simple fills for CI
-    rng = np.random.RandomState(42)
-    Q = np.linspace(1e3, 1e5, 20)
-    # Assume linear + quadratic cost
-    alpha, beta = 0.01, 1e-8  # impact parameters
-    slippage_bps = alpha * Q + beta * Q ** 2
-    price = 100.0
-    net_pnl = price * Q * (0.002 - slippage_bps / 1e4)  # 20 bps alpha vs slippage
-    df = pd.DataFrame({"Q": Q, "slippage_bps": slippage_bps, "net_PnL": net_pnl})
-    return df
-
-
-def capacity_curve(df: pd.DataFrame) -> pd.DataFrame:
-    """Return DF with Q, net_PnL, IS_bps and save PNG + CSV side-effects."""
-    if not {"Q", "net_PnL"}.issubset(df.columns):
-        raise ValueError("fills data must have Q and net_PnL columns")
-    # Compute in-sample bps
-    df = df.copy()
-    df["IS_bps"] = 1e4 * df["net_PnL"] / (df["Q"] * 100)  # assuming $100 price
-
-    # Plot
-    plt.figure(figsize=(6, 4))
-    plt.plot(df["Q"], df["net_PnL"], marker="o")
-    plt.xlabel("Quantity (shares)")
-    plt.ylabel("Net PnL ($)")
-    plt.title("Capacity Curve")
-    plt.grid(True, ls=":", alpha=0.6)
-    plt.tight_layout()
-    plt.savefig(PNG_OUT)
-    plt.close()
-
-    df.to_csv(CSV_OUT, index=False)
-    print(f"[capacity] Saved curve to {PNG_OUT} and CSV to {CSV_OUT}")
-    return df
+CSV_NAME = "capacity_results.csv"
+PNG_NAME = "capacity_curve.png"
+
+FILL_COLS = ["Q", "price", "slippage_bps"]
+DEFAULT_ALPHA_BPS = 20.0
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def synthetic_fills(n: int = 20_000, *, seed: int = 42) -> pd.DataFrame:
+    """Raw fills with square-root impact at 1M shares ADV and 2% daily volatility."""
+    rng = np.random.default_rng(seed)
+    Q = np.exp(rng.uniform(np.log(1e3), np.log(1e5), n))
+    price = 100.0 * np.exp(rng.normal(0.0, 0.05, n))
+    adv, sigma = 1e6, 0.02
+    slippage_bps = SquareRootImpact(eta=0.5).estimate_bps(Q / adv, sigma) + rng.normal(0.0, 2.0, n)
+    return pd.DataFrame({"Q": Q, "price": price, "slippage_bps": slippage_bps})
+
+
+@dataclass
+class BucketAccumulator:
+    """Running per-bucket sums over log-spaced quantity buckets.
+
+    Quantities outside ``[q_min, q_max]`` fall into the first / last bucket.
+    ``net_PnL`` is taken from the fills when present, otherwise derived from
+    ``alpha_bps`` and the realised slippage.
+    """
+
+    q_min: float = 1.0
+    q_max: float = 1e8
+    n_buckets: int = 40
+    alpha_bps: float = DEFAULT_ALPHA_BPS
+    edges: np.ndarray = field(init=False)
+    sums: dict = field(init=False)
+
+    _FIELDS = ("n", "q", "notional", "slippage", "slippage_sq", "net_pnl")
+
+    def __post_init__(self) -> None:
+        if not 0 < self.q_min < self.q_max:
+            raise ValueError("require 0 < q_min < q_max")
+        self.edges = np.geomspace(self.q_min, self.q_max, self.n_buckets + 1)
+        self.sums = {name: np.zeros(self.n_buckets) for name in self._FIELDS}
+
+    def update(self, fills: pd.DataFrame) -> None:
+        fills = fills.dropna(subset=FILL_COLS)
+        fills = fills[fills["Q"] > 0]
+        if fills.empty:
+            return
+        q = fills["Q"].to_numpy(float)
+        notional = q * fills["price"].to_numpy(float)
+        slip = fills["slippage_bps"].to_numpy(float)
+        if "net_PnL" in fills.columns:
+            pnl = fills["net_PnL"].fillna(0.0).to_numpy(float)
+        else:
+            pnl = notional * (self.alpha_bps - slip) / 1e4
+        b = np.clip(np.searchsorted(self.edges, q, side="right") - 1, 0, self.n_buckets - 1)
+        for name, weights in zip(self._FIELDS, (None, q, notional, slip, slip * slip, pnl)):
+            self.sums[name] += np.bincount(b, weights=weights, minlength=self.n_buckets)
+
+    def frame(self) -> pd.DataFrame:
+        """Per-bucket averages for non-empty buckets."""
+        s = self.sums
+        keep = s["n"] > 0
+        n = s["n"][keep]
+        mean_slip = s["slippage"][keep] / n
+        return pd.DataFrame(
+            {
+                "Q": s["q"][keep] / n,
+                "net_PnL": s["net_pnl"][keep] / n,
+                "IS_bps": 1e4 * s["net_pnl"][keep] / s["notional"][keep],
+                "n": n.astype(np.int64),
+                "slippage_bps": mean_slip,
+                "slippage_std": np.sqrt(np.maximum(s["slippage_sq"][keep] / n - mean_slip**2, 0.0)),
+                "price": s["notional"][keep] / s["q"][keep],
+            }
+        )
+
+
+@dataclass(frozen=True)
+class ImpactFit:
+    """Power-law impact ``coef · Q^beta`` in bps."""
+
+    coef: float
+    beta: float
+
+    def bps(self, Q) -> np.ndarray:
+        return self.coef * np.power(np.asarray(Q, dtype=float), self.beta)
+
+    def capacity(self, alpha_bps: float) -> float:
+        """Size where marginal slippage, d(Q · bps)/dQ, equals ``alpha_bps``."""
+        if self.coef <= 0 or self.beta <= 0 or alpha_bps <= 0:
+            return float("nan")
+        return float((alpha_bps / ((1 + self.beta) * self.coef)) ** (1 / self.beta))
+
+
+def fit_impact(buckets: pd.DataFrame) -> ImpactFit:
+    """Count-weighted log-log least squares of bucket slippage on bucket size."""
+    ok = (buckets["slippage_bps"] > 0) & (buckets["Q"] > 0)
+    if ok.sum() < 2:
+        return ImpactFit(float("nan"), float("nan"))
+    x = np.log(buckets.loc[ok, "Q"].to_numpy(float))
+    y = np.log(buckets.loc[ok, "slippage_bps"].to_numpy(float))
+    w = np.sqrt(buckets.loc[ok, "n"].to_numpy(float))
+    beta, log_coef = np.polyfit(x, y, 1, w=w)
+    return ImpactFit(coef=float(np.exp(log_coef)), beta=float(beta))
+
+
+def _chunks(fills, chunksize: int) -> Iterator[pd.DataFrame]:
+    if isinstance(fills, pd.DataFrame):
+        for lo in range(0, len(fills), chunksize):
+            yield fills.iloc[lo : lo + chunksize]
+    elif isinstance(fills, (str, Path)):
+        path = Path(fills)
+        if path.suffix == ".parquet":
+            header = pq.read_schema(path).names
+        else:
+            header = pd.read_csv(path, nrows=0).columns
+        columns = FILL_COLS + (["net_PnL"] if "net_PnL" in header else [])
+        yield from iter_log_chunks([path], columns, chunksize=chunksize)
+    else:
+        yield from fills
+
+
+def capacity_curve(
+    fills: str | Path | pd.DataFrame | Iterable[pd.DataFrame],
+    *,
+    n_buckets: int = 40,
+    q_min: float = 1.0,
+    q_max: float = 1e8,
+    alpha_bps: float = DEFAULT_ALPHA_BPS,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    out_dir: str | Path | None = None,
+    plot: bool = False,
+) -> pd.DataFrame:
+    """Stream raw fills into quantity buckets and return the capacity curve.
+
+    Parameters
+    ----------
+    fills
+        CSV / Parquet path, a DataFrame, or an iterable of DataFrame chunks with
+        ``Q``, ``price`` and ``slippage_bps`` (optionally ``net_PnL``).
+    alpha_bps
+        Expected alpha per unit notional, used for ``net_PnL`` when the fills
+        lack it and for the capacity limit.
+    out_dir, plot
+        When ``out_dir`` is given the CSV (and, with ``plot``, the PNG) is
+        written there via :func:`save_outputs`.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per non-empty bucket with ``Q``, ``net_PnL``, ``IS_bps``,
+        ``n``, ``slippage_bps`` and the fitted ``impact_bps``. The impact fit
+        and capacity limit are stored in ``.attrs``.
+    """
+    acc = BucketAccumulator(q_min=q_min, q_max=q_max, n_buckets=n_buckets, alpha_bps=alpha_bps)
+    for chunk in _chunks(fills, chunksize):
+        acc.update(chunk)
+    curve = acc.frame()
+    fit = fit_impact(curve)
+    curve["impact_bps"] = fit.bps(curve["Q"])
+    curve.attrs.update(impact_coef=fit.coef, impact_beta=fit.beta, capacity_q=fit.capacity(alpha_bps))
+    if out_dir is not None:
+        save_outputs(curve, out_dir, plot=plot)
+    return curve
+
+
+def save_outputs(curve: pd.DataFrame, out_dir: str | Path = FIG_DIR, *, plot: bool = True) -> list[Path]:
+    """Write the capacity CSV (and PNG if ``plot``) to ``out_dir``."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = [out_dir / CSV_NAME]
+    curve.to_csv(written[0], index=False)
+    if plot:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        plt.figure(figsize=(6, 4))
+        plt.plot(curve["Q"], curve["net_PnL"], marker="o")
+        cap = curve.attrs.get("capacity_q", float("nan"))
+        if np.isfinite(cap):
+            plt.axvline(cap, color="grey", ls="--", label=f"capacity ≈ {cap:,.0f}")
+            plt.legend()
+        plt.xscale("log")
+        plt.xlabel("Quantity (shares)")
+        plt.ylabel("Net PnL per fill ($)")
+        plt.title("Capacity Curve")
+        plt.grid(True, ls=":", alpha=0.6)
+        plt.tight_layout()
+        written.append(out_dir / PNG_NAME)
+        plt.savefig(written[-1])
+        plt.close()
+    return written
+
+
+def _curve_defaults() -> dict:
+    """Keyword defaults of :func:`capacity_curve` (fit options such as ``q_min``/``q_max``)."""
+    sig = inspect.signature(capacity_curve)
+    return {k: p.default for k, p in sig.parameters.items() if p.default is not inspect.Parameter.empty}
 
 
 def main(argv: list[str] | None = None) -> None:  # pragma: no cover
     parser = argparse.ArgumentParser(description="Capacity curve estimation")
     parser.add_argument("--fills", default="data/sample_fills.parquet", help="Path to fills data")
+    parser.add_argument("--out-dir", default=str(FIG_DIR), help="Directory for CSV / PNG output")
+    parser.add_argument("--alpha-bps", type=float, default=DEFAULT_ALPHA_BPS)
+    parser.add_argument("--buckets", type=int, default=40, help="Log-spaced quantity buckets")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--no-plot", action="store_true", help="Skip the PNG")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute even if a cached result exists")
     args = parser.parse_args(argv)
+
     fills_path = Path(args.fills)
-    df_fills = _load_fills(fills_path)
-    capacity_curve(df_fills)
+    synthetic = not fills_path.exists()
+    # every argument of capacity_curve is part of the cache key
+    kwargs = dict(n_buckets=args.buckets, alpha_bps=args.alpha_bps, chunksize=args.chunksize)
+    curve = cached_call(
+        "capacity",
+        capacity_curve,
+        synthetic_fills() if synthetic else fills_path,
+        **kwargs,
+        inputs=[] if synthetic else [fills_path],
+        params={**_curve_defaults(), **kwargs, "fills": "synthetic" if synthetic else str(fills_path)},
+        enabled=not args.no_cache,
+    )
+    save_outputs(curve, args.out_dir, plot=not args.no_plot)
+    a = curve.attrs
+    print(
+        f"[capacity] impact ≈ {a['impact_coef']:.4g}·Q^{a['impact_beta']:.3f} bps, "
+        f"capacity ≈ {a['capacity_q']:,.0f} shares"
+    )
+    print(f"[capacity] Saved outputs to {args.out_dir}")
 
 
 if __name__ == "__main__":  # pragma: no cover
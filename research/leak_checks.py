@@ -13,20 +13,47 @@ catch the most common errors in feature engineering workflows:
 
 The public API purposefully operates on **pandas DataFrame** input so we can use
 it both in unit tests and ad-hoc CI scripts without additional dependencies.
+
+Correlations are computed for blocks of ``COL_CHUNK`` columns at once: columns
+are standardized, NaNs are zeroed and tracked with indicator matrices, and the
+pairwise-complete sums needed for Pearson's r come out of a handful of matrix
+products. Wide feature stores (10k+ columns) are screened in seconds.
+
+Post-event joins are checked against the feature *sources*: for every row the
+point-in-time value (the last source row available at the decision time) is
+looked up with an as-of join per symbol and compared with the joined value.
+Large training sets are streamed one symbol partition at a time
+(:func:`iter_symbol_partitions`).
+
+CLI usage (for CI):
+
+    python -m research.leak_checks --input features.parquet --target target [--features f1 f2]
+
+Exits non-zero if any detector reports an offender. Results are memoized on
+the input file contents and parameters (see ``research.cache``).
 """
 
 from __future__ import annotations
 
+import argparse
+import sys
 import warnings
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 import numpy as np
 import pandas as pd
 
+from research.cache import cached_call
+
 __all__ = [
     "detect_target_peeking",
     "detect_future_shift_leak",
+    "detect_post_event_joins",
     "detect_leaks",
+    "iter_symbol_partitions",
+    "JoinLeakReport",
 ]
 
 # ---------------------------------------------------------------------------
@@ -34,12 +61,62 @@ __all__ = [
 # ---------------------------------------------------------------------------
 
 
-def _corr(a: pd.Series, b: pd.Series) -> float:
-    """Pearson correlation ignoring NaNs – returns 0 if degenerate."""
-    mask = a.notna() & b.notna()
-    if mask.sum() < 3:
-        return 0.0
-    return float(a[mask].corr(b[mask]))
+COL_CHUNK = 1024  # feature columns per block
+
+
+def _column_blocks(df: pd.DataFrame, cols: List[str]) -> Iterator[Tuple[List[str], np.ndarray]]:
+    """Yield ``(names, float matrix)`` for consecutive blocks of ``cols``."""
+    for lo in range(0, len(cols), COL_CHUNK):
+        block = list(cols[lo : lo + COL_CHUNK])
+        yield block, _standardize(df[block].to_numpy(dtype=float, na_value=np.nan))
+
+
+def _standardize(X: np.ndarray) -> np.ndarray:
+    """Center and scale columns (NaN-aware) so the moment sums below stay well conditioned."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        mu = np.nanmean(X, axis=0)
+        sd = np.nanstd(X, axis=0)
+    mu = np.where(np.isfinite(mu), mu, 0.0)
+    sd = np.where(np.isfinite(sd) & (sd > 0), sd, 1.0)
+    return (X - mu) / sd
+
+
+def _pearson(n, sx, sy, sxx, syy, sxy) -> np.ndarray:
+    """Pearson's r from pairwise-complete sums; 0 when fewer than 3 pairs."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx**2) * (n * syy - sy**2))
+    return np.where(n >= 3, r, 0.0)
+
+
+def _corr_matrix(X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    """NaN-aware correlation of every column of ``X`` with every column of ``Y``."""
+    mx, my = ~np.isnan(X), ~np.isnan(Y)
+    X0, Y0 = np.where(mx, X, 0.0), np.where(my, Y, 0.0)
+    Mx, My = mx.astype(float), my.astype(float)
+    return _pearson(
+        Mx.T @ My,
+        X0.T @ My,
+        Mx.T @ Y0,
+        (X0 * X0).T @ My,
+        Mx.T @ (Y0 * Y0),
+        X0.T @ Y0,
+    )
+
+
+def _lag1_autocorr(X: np.ndarray) -> np.ndarray:
+    """NaN-aware correlation of each column with its own one-step lag."""
+    a, b = X[1:], X[:-1]
+    w = ~(np.isnan(a) | np.isnan(b))
+    a, b = np.where(w, a, 0.0), np.where(w, b, 0.0)
+    return _pearson(
+        w.sum(axis=0),
+        a.sum(axis=0),
+        b.sum(axis=0),
+        (a * a).sum(axis=0),
+        (b * b).sum(axis=0),
+        (a * b).sum(axis=0),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -65,13 +142,14 @@ def detect_target_peeking(
     if horizon <= 0:
         raise ValueError("horizon must be positive – it is a *future* offset")
     target_now = df[target_col]
-    future_target = target_now.shift(-horizon)
+    targets = _standardize(
+        np.column_stack([target_now.to_numpy(dtype=float), target_now.shift(-horizon).to_numpy(dtype=float)])
+    )
     offenders: list[str] = []
-    for col in feature_cols:
-        r_now = abs(_corr(df[col], target_now))
-        r_future = abs(_corr(df[col], future_target))
-        if max(r_now, r_future) >= threshold:
-            offenders.append(col)
+    for block, X in _column_blocks(df, feature_cols):
+        r = _corr_matrix(X, targets)
+        r = np.abs(np.where(np.isfinite(r), r, 0.0)).max(axis=1)  # undefined r (constant window) is no evidence
+        offenders.extend(col for col, hit in zip(block, r >= threshold) if hit)
     return offenders
 
 
@@ -85,17 +163,150 @@ def detect_future_shift_leak(
     shift. Works well for synthetic tests where leak is exact copy.
     """
 
-    offenders: list[str] = []
-    for col in feature_cols:
-        # Heuristic 1: suspicious naming patterns
-        if any(pattern in col.lower() for pattern in ["t_plus", "lead", "future", "shift_neg"]):
-            offenders.append(col)
-            continue
-        # Heuristic 2: near-perfect autocorr with 1-lag (exact copy)
-        lag1_corr = _corr(df[col], df[col].shift(1))
-        if abs(lag1_corr) > 0.999:  # stricter threshold to avoid FP on price levels
-            offenders.append(col)
-    return offenders
+    # Heuristic 1: suspicious naming patterns
+    named = {
+        col
+        for col in feature_cols
+        if any(pattern in col.lower() for pattern in ["t_plus", "lead", "future", "shift_neg"])
+    }
+    # Heuristic 2: near-perfect autocorr with 1-lag (exact copy)
+    rest = [col for col in feature_cols if col not in named]
+    autocorr: dict[str, float] = {}
+    for block, X in _column_blocks(df, rest):
+        autocorr.update(zip(block, np.abs(_lag1_autocorr(X))))
+    # stricter threshold to avoid FP on price levels
+    return [col for col in feature_cols if col in named or autocorr[col] > 0.999]
+
+
+@dataclass
+class JoinLeakReport:
+    """Rows whose joined feature value was not yet available at decision time."""
+
+    n_rows: int = 0
+    offending_rows: int = 0
+    columns: Dict[str, int] = field(default_factory=dict)  # offending rows per feature
+    examples: List[Tuple[object, object, str]] = field(default_factory=list)  # (symbol, ts, feature)
+    value_only: Dict[str, int] = field(default_factory=dict)  # rows checked without a joined timestamp
+
+    @property
+    def offending_columns(self) -> List[str]:
+        return [col for col, count in self.columns.items() if count]
+
+
+class _SourceIndex:
+    """A feature source sorted by ``(symbol, available_at)`` with per-symbol row ranges."""
+
+    def __init__(self, source: pd.DataFrame, *, feature: str, symbol_col: str, available_col: str) -> None:
+        src = source[[symbol_col, available_col, feature]].sort_values(
+            [symbol_col, available_col], kind="mergesort"
+        )
+        self.frame = src.reset_index(drop=True)
+        symbols, starts = np.unique(self.frame[symbol_col].to_numpy(), return_index=True)
+        ends = np.append(starts[1:], len(self.frame))
+        self.ranges = {sym: (lo, hi) for sym, lo, hi in zip(symbols, starts, ends)}
+
+    def rows_for(self, symbols) -> pd.DataFrame:
+        parts = [np.arange(*self.ranges[s]) for s in symbols if s in self.ranges]
+        return self.frame.iloc[np.concatenate(parts) if parts else []]
+
+
+def _same_value(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    both_missing = pd.isna(a) & pd.isna(b)
+    if np.issubdtype(a.dtype, np.number) and np.issubdtype(b.dtype, np.number):
+        with np.errstate(invalid="ignore"):
+            return both_missing | np.isclose(a, b, rtol=1e-12, atol=0.0)
+    return both_missing | (a == b)
+
+
+def detect_post_event_joins(
+    data: pd.DataFrame | Iterable[pd.DataFrame],
+    *,
+    sources: Dict[str, pd.DataFrame],
+    decision_col: str = "ts",
+    symbol_col: str = "symbol",
+    available_col: str = "available_at",
+    max_examples: int = 20,
+) -> JoinLeakReport:
+    """Flag joined feature values that were published after the decision time.
+
+    Parameters
+    ----------
+    data
+        Joined training set (``symbol_col``, ``decision_col`` and one column per
+        feature), or an iterable of such frames, e.g. symbol partitions from
+        :func:`iter_symbol_partitions`. Each symbol must sit in one partition.
+        If the join kept the availability timestamp of the joined row, as
+        ``<feature>_<available_col>`` (or ``available_col`` itself), it is used
+        directly.
+    sources
+        ``{feature: source}`` where ``source`` has ``symbol_col``,
+        ``available_col`` (when the value became known) and a value column
+        named like the feature.
+
+    A row leaks when its joined availability timestamp is later than the
+    decision time. Rows without a joined timestamp fall back to comparing the
+    joined value with the point-in-time value – the last source row with
+    ``available_at <= decision time`` for that symbol, found with
+    ``merge_asof``. That fallback cannot see a future row whose value equals
+    the point-in-time value; such rows are counted per feature in
+    ``report.value_only``.
+    """
+    partitions = [data] if isinstance(data, pd.DataFrame) else data
+    index = {
+        feat: _SourceIndex(src, feature=feat, symbol_col=symbol_col, available_col=available_col)
+        for feat, src in sources.items()
+    }
+    report = JoinLeakReport(columns={feat: 0 for feat in sources}, value_only={feat: 0 for feat in sources})
+    for part in partitions:
+        part = part.dropna(subset=[decision_col]).sort_values(decision_col, kind="mergesort")
+        part = part.reset_index(drop=True)
+        report.n_rows += len(part)
+        bad_rows = np.zeros(len(part), dtype=bool)
+        symbols = part[symbol_col].unique()
+        for feat, idx in index.items():
+            bad = np.zeros(len(part), dtype=bool)
+            by_value = np.ones(len(part), dtype=bool)
+            stamp_col = next((c for c in (f"{feat}_{available_col}", available_col) if c in part.columns), None)
+            if stamp_col is not None:
+                stamps = part[stamp_col]
+                by_value = stamps.isna().to_numpy()
+                bad = (~by_value) & (stamps > part[decision_col]).to_numpy()
+            if by_value.any():
+                src = idx.rows_for(symbols).sort_values(available_col, kind="mergesort")
+                src = src.rename(columns={feat: "_pit_value", available_col: decision_col})
+                asof = pd.merge_asof(
+                    part[[decision_col, symbol_col]],
+                    src,
+                    on=decision_col,
+                    by=symbol_col,
+                    direction="backward",
+                    allow_exact_matches=True,
+                )
+                bad |= by_value & ~_same_value(part[feat].to_numpy(), asof["_pit_value"].to_numpy())
+                report.value_only[feat] += int(by_value.sum())
+            report.columns[feat] += int(bad.sum())
+            bad_rows |= bad
+            for i in np.flatnonzero(bad)[: max_examples - len(report.examples)]:
+                report.examples.append((part.at[i, symbol_col], part.at[i, decision_col], feat))
+        report.offending_rows += int(bad_rows.sum())
+    return report
+
+
+def iter_symbol_partitions(
+    path: str | Path, *, symbol_col: str = "symbol", columns: List[str] | None = None
+) -> Iterator[pd.DataFrame]:
+    """Yield a Parquet dataset one symbol at a time (memory ~ largest symbol).
+
+    Works best on datasets hive-partitioned by ``symbol_col``, where each
+    filter only touches that symbol's files.
+    """
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(str(path), format="parquet", partitioning="hive")
+    symbols = pc.unique(dataset.to_table(columns=[symbol_col])[symbol_col]).to_pylist()
+    for sym in sorted(s for s in symbols if s is not None):
+        yield dataset.to_table(filter=ds.field(symbol_col) == sym, columns=columns).to_pandas()
 
 
 # ---------------------------------------------------------------------------
@@ -109,8 +320,16 @@ def detect_leaks(
     feature_cols: List[str],
     target_col: str,
     horizon: int = 1,
+    sources: Dict[str, pd.DataFrame] | None = None,
+    decision_col: str = "ts",
+    symbol_col: str = "symbol",
 ) -> Dict[str, List[str]]:
-    """Run all leak detectors and aggregate offenders by type."""
+    """Run all leak detectors and aggregate offenders by type.
+
+    The post-event join check runs when feature ``sources`` are given; see
+    :func:`detect_post_event_joins` for per-row counts and for the value-only
+    fallback used when ``df`` carries no joined availability timestamps.
+    """
 
     results = {
         "target_peeking": detect_target_peeking(
@@ -118,5 +337,53 @@ def detect_leaks(
         ),
         "future_shift": detect_future_shift_leak(df, feature_cols=feature_cols),
     }
-    # Placeholder for future detectors (post-event joins, etc.)
+    if sources is not None:
+        report = detect_post_event_joins(
+            df, sources=sources, decision_col=decision_col, symbol_col=symbol_col
+        )
+        results["post_event_join"] = report.offending_columns
     return results
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _evaluate(path: Path, target: str, features: List[str] | None, horizon: int) -> Dict[str, List[str]]:
+    df = pd.read_parquet(path)
+    feature_cols = features or [c for c in df.select_dtypes("number").columns if c != target]
+    return detect_leaks(df, feature_cols=feature_cols, target_col=target, horizon=horizon)
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Feature leakage CI gate")
+    parser.add_argument("--input", required=True, help="Parquet file with features and target")
+    parser.add_argument("--target", required=True, help="Target column")
+    parser.add_argument("--features", nargs="+", default=None, help="Feature columns (default: all numeric)")
+    parser.add_argument("--horizon", type=int, default=1)
+    parser.add_argument("--no-cache", action="store_true", help="Recompute even if a cached result exists")
+    args = parser.parse_args(argv)
+
+    path = Path(args.input)
+    results = cached_call(
+        "leak_checks",
+        _evaluate,
+        path,
+        args.target,
+        args.features,
+        args.horizon,
+        inputs=[path],
+        params={"target": args.target, "features": args.features, "horizon": args.horizon},
+        enabled=not args.no_cache,
+    )
+    leaks = {kind: cols for kind, cols in results.items() if cols}
+    for kind, cols in leaks.items():
+        print(f"❌ {kind}: {', '.join(map(str, cols))}")
+    if leaks:
+        sys.exit(1)
+    print("✅ No leaks detected")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
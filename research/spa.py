@@ -4,11 +4,22 @@ CLI usage (for CI):
 
     python -m research.spa --input backtests/sample.parquet [--alpha 0.10]
 
+    python -m research.spa --input sweep.parquet --strategies [--alpha 0.10]
+
 The module expects a Parquet file with a column named ``returns`` (daily or
 periodic strategy P&L). It performs a *stationary bootstrap* to estimate the
 p-value that the mean return is <= 0 (null hypothesis) versus > 0.
+
+With ``--strategies`` every numeric column is treated as one strategy of a
+parameter sweep and :func:`spa_test` runs Hansen's SPA test on the whole
+T × K matrix: the null is that *no* strategy has a positive mean return.
+
+Results are memoized on the input file contents (see ``research.cache``);
+pass ``--no-cache`` to force a recomputation.
 The test is lightweight (1k bootstraps) and **deterministic** via a fixed RNG
-seed so CI remains stable.
+seed so CI remains stable. Bootstrap replicates are drawn in fixed-size chunks,
+each from its own ``SeedSequence`` stream (see ``engine.rng``), so the p-value
+is identical whether the chunks run serially or on several worker processes.
 
 Exit code:
 - 0  if p-value ≤ alpha.
@@ -23,44 +34,239 @@ from __future__ import annotations
 
 import argparse
 import sys
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-from numpy.random import RandomState
 
-__all__ = ["spa_p_value", "main"]
+from engine.rng import map_chunks
+from research.cache import cached_call
+
+__all__ = ["SPAResult", "spa_p_value", "spa_test", "main"]
+
+BOOT_CHUNK = 250  # bootstrap replicates per RNG stream
+# Resample indices materialised at once. Peak working memory is ~41 bytes per
+# index, not just the 8-byte index itself: the uniform draws, block starts,
+# block positions and index arithmetic temporaries in ``_resample_indices``,
+# plus the gathered float64 block (or the bincount matrix in ``_spa_chunk``).
+# 2**21 indices therefore peak at ~86 MB per worker.
+MAX_ELEMS = 1 << 21
+
+
+def _resample_indices(rs: np.random.Generator, b: int, n: int, p: float) -> np.ndarray:
+    """Return a ``(b, n)`` matrix of stationary-bootstrap indices into ``x``.
+
+    A new block starts at each position with probability ``p`` (so block
+    lengths are geometric with mean ``1 / p``) at a uniform random start;
+    within a block the index advances by one, wrapping around the end of the
+    series as in Politis & Romano (1994).
+    """
+    new_block = rs.random((b, n)) < p
+    new_block[:, 0] = True
+    starts = rs.integers(0, n, size=(b, n))
+    t = np.arange(n)
+    # Column where the block covering each position began, carried forward.
+    block_pos = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    start = np.take_along_axis(starts, block_pos, axis=1)
+    return (start + t - block_pos) % n
+
 
+def _stationary_bootstrap(rs: np.random.Generator, x: np.ndarray, B: int = 1000, p: float = 0.1) -> np.ndarray:
+    """Return B bootstrap sample means using stationary bootstrap.
 
-def _stationary_bootstrap(rs: RandomState, x: np.ndarray, B: int = 1000, p: float = 0.1) -> np.ndarray:
-    """Return B bootstrap sample means using stationary bootstrap."""
+    Replicates are built in batches of at most ``MAX_ELEMS`` indices (~86 MB
+    peak, see ``MAX_ELEMS``), so memory stays bounded for long series and
+    large ``B``.
+    """
     n = len(x)
     means = np.empty(B)
-    for b in range(B):
-        i = rs.randint(0, n)
-        sample = []
-        while len(sample) < n:
-            block_len = rs.geometric(p)
-            end = min(i + block_len, n)
-            sample.extend(x[i:end])
-            i = rs.randint(0, n)
-        means[b] = np.mean(sample[:n])
+    rows = max(1, MAX_ELEMS // max(n, 1))
+    for lo in range(0, B, rows):
+        hi = min(lo + rows, B)
+        means[lo:hi] = x[_resample_indices(rs, hi - lo, n, p)].mean(axis=1)
     return means
 
 
-def spa_p_value(returns: np.ndarray, *, B: int = 1000, seed: int = 42) -> float:
-    """Compute one-sided SPA p-value that mean(returns) ≤ 0."""
-    rs = RandomState(seed)
+def _bootstrap_chunk(rng: np.random.Generator, lo: int, hi: int, *, x: np.ndarray) -> np.ndarray:
+    return _stationary_bootstrap(rng, x, B=hi - lo)
+
+
+def spa_p_value(returns: np.ndarray, *, B: int = 1000, seed: int = 42, workers: int = 1) -> float:
+    """Compute one-sided SPA p-value that mean(returns) ≤ 0.
+
+    ``workers > 1`` spreads the bootstrap chunks over processes; the result
+    does not depend on ``workers``.
+    """
+    returns = np.asarray(returns, dtype=float)
     mu_hat = returns.mean()
-    boot_means = _stationary_bootstrap(rs, returns, B=B)
+    chunks = map_chunks(
+        partial(_bootstrap_chunk, x=returns),
+        B,
+        seed=seed,
+        chunk_size=BOOT_CHUNK,
+        workers=workers,
+        processes=True,
+    )
+    boot_means = np.concatenate(chunks)
     p_val = np.mean(boot_means >= mu_hat)
     return float(p_val)
 
 
+# ---------------------------------------------------------------------------
+# Multi-strategy SPA (Hansen 2005)
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class SPAResult:
+    """Outcome of :func:`spa_test`.
+
+    ``consistent`` is Hansen's SPA p-value; ``lower`` and ``upper`` bound it
+    (``upper`` corresponds to White's Reality Check with studentization).
+    """
+
+    stat: float
+    consistent: float
+    lower: float
+    upper: float
+    best: object  # label of the strategy with the largest studentized mean
+    n_strategies: int
+
+
+def _kernel_variance(d: np.ndarray, p: float) -> np.ndarray:
+    """Stationary-bootstrap long-run variance of each column of ``d``.
+
+    Autocovariances of all columns come from one zero-padded FFT and are
+    weighted with the stationary bootstrap kernel (Hansen 2005, eq. 7).
+    """
+    T = d.shape[0]
+    e = d - d.mean(axis=0)
+    f = np.fft.rfft(e, n=2 * T, axis=0)
+    acov = np.fft.irfft(f * f.conj(), n=2 * T, axis=0)[:T] / T
+    i = np.arange(T)
+    kappa = (T - i) / T * (1 - p) ** i + i / T * (1 - p) ** (T - i)
+    return acov[0] + 2 * (kappa[1:, None] * acov[1:]).sum(axis=0)
+
+
+def _spa_chunk(
+    rng: np.random.Generator,
+    lo: int,
+    hi: int,
+    *,
+    d: np.ndarray,
+    centers: np.ndarray,
+    scale: np.ndarray,
+    p: float,
+) -> np.ndarray:
+    """Bootstrap max statistics for replicates ``[lo, hi)``, one column per centering."""
+    T, K = d.shape
+    out = np.empty((hi - lo, len(centers)))
+    rows = max(1, MAX_ELEMS // max(T, K))
+    for a in range(0, hi - lo, rows):
+        b = min(a + rows, hi - lo)
+        idx = _resample_indices(rng, b - a, T, p)
+        # Resample counts turn all K bootstrap means into a single matmul.
+        flat = idx + (np.arange(b - a) * T)[:, None]
+        counts = np.bincount(flat.ravel(), minlength=(b - a) * T).reshape(b - a, T)
+        means = counts @ d / T
+        for j, center in enumerate(centers):
+            out[a:b, j] = np.maximum(((means - center) * scale).max(axis=1), 0.0)
+    return out
+
+
+def spa_test(
+    returns,
+    *,
+    benchmark=None,
+    B: int = 1000,
+    p: float = 0.1,
+    seed: int = 42,
+    workers: int = 1,
+) -> SPAResult:
+    """Hansen's test for superior predictive ability over K strategies.
+
+    Parameters
+    ----------
+    returns
+        ``T × K`` matrix (array or DataFrame) of strategy returns.
+    benchmark
+        Benchmark returns of length ``T``; zero when omitted.
+    B, p
+        Bootstrap replicates and stationary-bootstrap block probability.
+    seed, workers
+        Replicates are drawn in ``BOOT_CHUNK``-sized chunks from independent
+        streams and may run on ``workers`` threads; the result does not
+        depend on ``workers``.
+
+    Every replicate uses one set of resample indices shared by all K
+    strategies, so the cross-sectional dependence of the sweep is preserved
+    and the cost is one ``(chunk × T) @ (T × K)`` product per batch.
+    """
+    labels = list(returns.columns) if isinstance(returns, pd.DataFrame) else None
+    d = np.asarray(returns, dtype=float)
+    if d.ndim == 1:
+        d = d[:, None]
+    if benchmark is not None:
+        d = d - np.asarray(benchmark, dtype=float)[:, None]
+    T, K = d.shape
+    if T < 2:
+        raise ValueError("need at least two observations")
+
+    d_bar = d.mean(axis=0)
+    omega = np.sqrt(np.maximum(_kernel_variance(d, p), 0.0))
+    valid = omega > 0
+    # Strategies with zero variance carry no information; exclude them.
+    scale = np.where(valid, np.sqrt(T) / np.where(valid, omega, 1.0), 0.0)
+    t_stats = np.where(valid, d_bar * scale, -np.inf)
+    stat = max(float(t_stats.max()), 0.0)
+
+    threshold = -np.sqrt(2 * np.log(np.log(T))) if T > np.e else -np.inf
+    centers = np.stack(
+        [
+            np.where(t_stats >= threshold, d_bar, 0.0),  # consistent
+            np.maximum(d_bar, 0.0),  # lower
+            d_bar,  # upper
+        ]
+    )
+    chunks = map_chunks(
+        partial(_spa_chunk, d=d, centers=centers, scale=scale, p=p),
+        B,
+        seed=seed,
+        chunk_size=BOOT_CHUNK,
+        workers=workers,
+    )
+    pvals = (np.concatenate(chunks) > stat).mean(axis=0)
+    best = int(np.argmax(t_stats))
+    return SPAResult(
+        stat=stat,
+        consistent=float(pvals[0]),
+        lower=float(pvals[1]),
+        upper=float(pvals[2]),
+        best=labels[best] if labels is not None else best,
+        n_strategies=K,
+    )
+
+
+def _evaluate(path: Path, strategies: bool):
+    """CLI computation: ``SPAResult`` with ``strategies``, else a p-value (None if no 'returns')."""
+    df = pd.read_parquet(path)
+    if strategies:
+        return spa_test(df.select_dtypes("number"))
+    if "returns" not in df.columns:
+        return None
+    return spa_p_value(df["returns"].values)
+
+
 def main(argv: list[str] | None = None) -> None:  # pragma: no cover
     parser = argparse.ArgumentParser(description="SPA reality-check test")
     parser.add_argument("--input", required=True, help="Input Parquet file with 'returns' column")
     parser.add_argument("--alpha", type=float, default=0.10, help="Significance level")
+    parser.add_argument(
+        "--strategies", action="store_true", help="Test all numeric columns jointly (Hansen SPA)"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Recompute even if a cached result exists")
     args = parser.parse_args(argv)
 
     path = Path(args.input)
@@ -71,13 +277,29 @@ def main(argv: list[str] | None = None) -> None:  # pragma: no cover
         path.parent.mkdir(parents=True, exist_ok=True)
         df.to_parquet(path)
         print(f"[spa] Generated synthetic returns to {path}")
-    else:
-        df = pd.read_parquet(path)
-    if "returns" not in df.columns:
+    result = cached_call(
+        "spa",
+        _evaluate,
+        path,
+        args.strategies,
+        inputs=[path],
+        params={"strategies": args.strategies},
+        enabled=not args.no_cache,
+    )
+    if args.strategies:
+        res = result
+        print(
+            f"SPA over {res.n_strategies} strategies: stat={res.stat:.3f} best={res.best} "
+            f"p-values consistent={res.consistent:.4f} lower={res.lower:.4f} upper={res.upper:.4f}"
+        )
+        p_val = res.consistent
+        print("✅ Reality-check passed" if p_val <= args.alpha else "❌ Reality-check failed")
+        sys.exit(0 if p_val <= args.alpha else 1)
+    if result is None:
         print("Parquet must contain 'returns' column", file=sys.stderr)
         sys.exit(1)
 
-    p_val = spa_p_value(df["returns"].values)
+    p_val = result
     print(f"SPA p-value: {p_val:.4f}")
     if p_val <= args.alpha:
         print("✅ Reality-check passed")
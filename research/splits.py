@@ -9,6 +9,15 @@ walk_forward_splits(index, train_size, test_size, step=None, drop_remainder=True
     Generate successive (train_mask, test_mask) boolean arrays for walk-forward
     evaluation.
 
+iter_walk_forward(index, train_size, test_size, step=None, expanding=False)
+    Lazily yield ``(train_slice, test_slice)`` index ranges – O(1) memory per
+    fold. ``slices_to_masks`` turns them into boolean masks on demand.
+
+purged_kfold(t0, t1, n_splits=5, embargo=0)
+combinatorial_purged_cv(t0, t1, n_groups=6, n_test_groups=2, embargo=0)
+    Purged (and embargoed) cross-validation for labels spanning
+    ``[t0, t1]`` intervals, computed by binary search on sorted event times.
+
 train_test_split(index, test_size)
     Simple hold-out split preserving order.
 
@@ -19,7 +28,8 @@ effects minimal and avoid copying heavy market-data payloads around.
 from __future__ import annotations
 
 import math
-from typing import Iterable, List, Tuple
+from itertools import combinations
+from typing import Iterable, Iterator, List, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -27,8 +37,15 @@ import pandas as pd
 __all__ = [
     "train_test_split",
     "walk_forward_splits",
+    "iter_walk_forward",
+    "slices_to_masks",
+    "purged_kfold",
+    "combinatorial_purged_cv",
+    "cpcv_n_paths",
 ]
 
+Ranges = Union[slice, Sequence[slice]]
+
 
 def _validate_index(index: pd.Index) -> None:
     if not isinstance(index, pd.Index):
@@ -75,64 +92,250 @@ def train_test_split(
     return train_mask, test_mask
 
 
-def walk_forward_splits(
-    index: pd.Index,
+def iter_walk_forward(
+    index: pd.Index | int,
     *,
     train_size: int,
     test_size: int,
     step: int | None = None,
     drop_remainder: bool = True,
-) -> List[Tuple[np.ndarray, np.ndarray]]:
-    """Generate walk-forward train / test boolean masks.
+    expanding: bool = False,
+) -> Iterator[Tuple[slice, slice]]:
+    """Lazily yield walk-forward ``(train_slice, test_slice)`` ranges.
 
     Parameters
     ----------
     index
-        Sorted, monotonic index.
+        Sorted, monotonic index, or just its length.
     train_size
-        Number of observations in each training (IS) window.
+        Observations in the (first) training window.
     test_size
-        Number of observations in each test (OOS) window.
+        Observations in each test window.
     step
-        How far to slide the window after each iteration. Defaults to *test_size*
-        (non-overlapping test sets).
+        How far to slide after each fold. Defaults to *test_size*.
     drop_remainder
-        If *True*, incomplete windows at the tail are dropped. If *False*, the
-        last window that would be shorter than *test_size* is still yielded.
-    Returns
-    -------
-    List of tuples ``(train_mask, test_mask)``.
+        If *True*, a trailing test window shorter than *test_size* is dropped.
+    expanding
+        If *True*, every training window starts at 0 and grows by *step*
+        (anchored walk-forward) instead of sliding.
+
+    Yields
+    ------
+    ``(slice(train_start, train_end), slice(test_start, test_end))`` with
+    exclusive ends, usable directly with ``df.iloc`` or array slicing.
     """
 
-    _validate_index(index)
-    n = len(index)
+    if isinstance(index, int):
+        n = index
+    else:
+        _validate_index(index)
+        n = len(index)
     if train_size <= 0 or test_size <= 0:
         raise ValueError("train_size and test_size must be positive")
     step = test_size if step is None else step
     if step <= 0:
         raise ValueError("step must be positive")
 
-    splits: list[tuple[np.ndarray, np.ndarray]] = []
     start = 0
     while True:
-        train_start = start
-        train_end = train_start + train_size  # exclusive
+        train_start = 0 if expanding else start
+        train_end = start + train_size  # exclusive
         test_start = train_end
         test_end = test_start + test_size
 
         if test_start >= n:
-            break  # no room for test set
+            return  # no room for test set
         if test_end > n and drop_remainder:
-            break
+            return
 
-        train_mask = np.zeros(n, dtype=bool)
-        test_mask = np.zeros(n, dtype=bool)
-        train_mask[train_start: min(train_end, n)] = True
-        test_mask[test_start: min(test_end, n)] = True
-        splits.append((train_mask, test_mask))
+        yield slice(train_start, min(train_end, n)), slice(test_start, min(test_end, n))
 
         if test_end >= n:
-            break
+            return
         start += step
 
-    return splits
+
+def _ranges_mask(ranges: Ranges, n: int) -> np.ndarray:
+    mask = np.zeros(n, dtype=bool)
+    for r in [ranges] if isinstance(ranges, slice) else ranges:
+        mask[r] = True
+    return mask
+
+
+def slices_to_masks(
+    splits: Iterable[Tuple[Ranges, Ranges]], n: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Adapt ``(train, test)`` ranges to boolean masks, one fold at a time.
+
+    Each side may be a single ``slice`` or a list of slices (as yielded by
+    the purged cross-validation generators).
+    """
+    for train, test in splits:
+        yield _ranges_mask(train, n), _ranges_mask(test, n)
+
+
+# ---------------------------------------------------------------------------
+# Purged / embargoed cross-validation
+# ---------------------------------------------------------------------------
+
+
+def _event_times(t0, t1) -> Tuple[np.ndarray, np.ndarray]:
+    def _num(values) -> np.ndarray:
+        arr = np.asarray(values)
+        if np.issubdtype(arr.dtype, np.datetime64):
+            return arr.astype("datetime64[ns]").view(np.int64)
+        if arr.dtype == object:
+            return pd.DatetimeIndex(arr).asi8
+        return arr.astype(float)
+
+    start, end = _num(t0), _num(t1)
+    if start.shape != end.shape or start.ndim != 1:
+        raise ValueError("t0 and t1 must be 1-D and of equal length")
+    if np.any(np.diff(start) < 0):
+        raise ValueError("events must be sorted by start time t0")
+    if np.any(end < start):
+        raise ValueError("event end t1 must not precede start t0")
+    return start, end
+
+
+def _embargo_size(embargo: int | float, n: int) -> int:
+    if isinstance(embargo, float):
+        if not 0.0 <= embargo < 1.0:
+            raise ValueError("embargo fraction must be in [0, 1)")
+        return math.ceil(n * embargo)
+    if embargo < 0:
+        raise ValueError("embargo must be non-negative")
+    return int(embargo)
+
+
+def _purged_folds(
+    t0, t1, n_groups: int, n_test_groups: int, embargo: int | float
+) -> Iterator[Tuple[List[slice], List[slice]]]:
+    start, end = _event_times(t0, t1)
+    n = len(start)
+    if not 1 <= n_test_groups < n_groups <= n:
+        raise ValueError("require 1 <= n_test_groups < n_groups <= len(events)")
+    h = _embargo_size(embargo, n)
+    bounds = np.linspace(0, n, n_groups + 1).astype(np.int64)
+    # Latest label end seen so far: monotone, so purging before a test block is
+    # one binary search for the first event whose label may reach into it.
+    run_max_end = np.maximum.accumulate(end)
+    group_end = np.maximum.reduceat(end, bounds[:-1])
+
+    left_cut = np.searchsorted(run_max_end, start[bounds[:-1]], side="left")
+    right_cut = np.searchsorted(start, group_end, side="right") + h
+
+    def _folds() -> Iterator[Tuple[List[slice], List[slice]]]:
+        for test_groups in combinations(range(n_groups), n_test_groups):
+            train: list[slice] = []
+            test = [slice(int(bounds[g]), int(bounds[g + 1])) for g in test_groups]
+            lo = 0
+            for g in test_groups:
+                hi = int(left_cut[g])
+                if lo < hi:
+                    train.append(slice(lo, hi))
+                lo = max(lo, int(right_cut[g]))
+            if lo < n:
+                train.append(slice(lo, n))
+            yield train, test
+
+    return _folds()
+
+
+def purged_kfold(
+    t0,
+    t1,
+    *,
+    n_splits: int = 5,
+    embargo: int | float = 0,
+) -> Iterator[Tuple[List[slice], List[slice]]]:
+    """Purged k-fold cross-validation with an optional embargo.
+
+    Parameters
+    ----------
+    t0, t1
+        Start (sorted) and end times of each event's label, as datetimes or
+        numbers. Event ``i`` uses information over ``[t0[i], t1[i]]``.
+    n_splits
+        Number of contiguous test folds.
+    embargo
+        Observations dropped after each test fold: an ``int`` count or a
+        ``float`` fraction of the sample.
+
+    Yields
+    ------
+    ``(train_ranges, test_ranges)`` – lists of ``slice`` objects. Training
+    events whose label interval overlaps a test fold are purged, found by
+    binary search in O(n log n) overall instead of pairwise overlap checks.
+    Purging before a fold is exact when ``t1`` is non-decreasing and otherwise
+    conservative (it may drop extra events so the training set stays a few
+    contiguous ranges).
+    """
+    return _purged_folds(t0, t1, n_splits, 1, embargo)
+
+
+def combinatorial_purged_cv(
+    t0,
+    t1,
+    *,
+    n_groups: int = 6,
+    n_test_groups: int = 2,
+    embargo: int | float = 0,
+) -> Iterator[Tuple[List[slice], List[slice]]]:
+    """Combinatorial purged cross-validation (CPCV).
+
+    Splits the events into ``n_groups`` contiguous groups and yields one split
+    for every choice of ``n_test_groups`` test groups, i.e.
+    ``C(n_groups, n_test_groups)`` splits, each purged and embargoed as in
+    :func:`purged_kfold`.
+    """
+    return _purged_folds(t0, t1, n_groups, n_test_groups, embargo)
+
+
+def cpcv_n_paths(n_groups: int, n_test_groups: int) -> int:
+    """Number of complete backtest paths produced by CPCV."""
+    return math.comb(n_groups, n_test_groups) * n_test_groups // n_groups
+
+
+def walk_forward_splits(
+    index: pd.Index,
+    *,
+    train_size: int,
+    test_size: int,
+    step: int | None = None,
+    drop_remainder: bool = True,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Generate walk-forward train / test boolean masks.
+
+    Parameters
+    ----------
+    index
+        Sorted, monotonic index.
+    train_size
+        Number of observations in each training (IS) window.
+    test_size
+        Number of observations in each test (OOS) window.
+    step
+        How far to slide the window after each iteration. Defaults to *test_size*
+        (non-overlapping test sets).
+    drop_remainder
+        If *True*, incomplete windows at the tail are dropped. If *False*, the
+        last window that would be shorter than *test_size* is still yielded.
+    Returns
+    -------
+    List of tuples ``(train_mask, test_mask)``.
+
+    Notes
+    -----
+    Materialises two length-``n`` masks per fold; prefer
+    :func:`iter_walk_forward` for long indexes or many folds.
+    """
+
+    folds = iter_walk_forward(
+        index,
+        train_size=train_size,
+        test_size=test_size,
+        step=step,
+        drop_remainder=drop_remainder,
+    )
+    return list(slices_to_masks(folds, len(index)))
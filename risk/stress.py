@@ -4,8 +4,19 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from engine.rng import map_chunks
 
-def monte_carlo_stress(returns_df: pd.DataFrame, horizon: int = 10, paths: int = 2500) -> np.ndarray:
+PATH_CHUNK = 1024
+
+
+def monte_carlo_stress(
+    returns_df: pd.DataFrame,
+    horizon: int = 10,
+    paths: int = 2500,
+    *,
+    seed: int | None = None,
+    workers: int | None = 1,
+) -> np.ndarray:
     """Simulate price paths via geometric Brownian motion.
 
     Parameters
@@ -16,6 +27,13 @@ def monte_carlo_stress(returns_df: pd.DataFrame, horizon: int = 10, paths: int =
         Number of steps to simulate.
     paths : int
         Number of Monte Carlo paths.
+    seed : int, optional
+        When given, paths are generated in chunks of ``PATH_CHUNK`` with one
+        ``SeedSequence`` stream per chunk, so the result is reproducible and
+        identical for any ``workers``. Without a seed the global NumPy RNG is
+        used.
+    workers : int, optional
+        Threads used for seeded generation.
 
     Returns
     -------
@@ -25,11 +43,19 @@ def monte_carlo_stress(returns_df: pd.DataFrame, horizon: int = 10, paths: int =
     mu = returns_df.mean().to_numpy()
     sigma = returns_df.std().to_numpy()
     n = len(mu)
-    rand = np.random.standard_normal((paths, horizon, n))
     drift = (mu - 0.5 * sigma**2)[None, None, :]
-    step = drift + sigma[None, None, :] * rand
-    log_paths = np.cumsum(step, axis=1)
-    return np.exp(log_paths)
+    if seed is None:
+        rand = np.random.standard_normal((paths, horizon, n))
+        return np.exp(np.cumsum(drift + sigma[None, None, :] * rand, axis=1))
+
+    out = np.empty((paths, horizon, n))
+
+    def simulate(rng: np.random.Generator, lo: int, hi: int) -> None:
+        step = drift + sigma[None, None, :] * rng.standard_normal((hi - lo, horizon, n))
+        np.exp(np.cumsum(step, axis=1), out=out[lo:hi])
+
+    map_chunks(simulate, paths, seed=seed, chunk_size=PATH_CHUNK, workers=workers)
+    return out
 
 
 def var95(paths: np.ndarray, initial: float = 1.0) -> np.ndarray:
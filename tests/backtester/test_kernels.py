@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from backtester.kernels import (
+    EXIT_SIGNAL,
+    EXIT_STOP_LOSS,
+    EXIT_TAKE_PROFIT,
+    EXIT_TRAILING_STOP,
+    apply_stops,
+    apply_stops_reference,
+    crossover_signals,
+    simulate_equity,
+    simulate_equity_reference,
+)
+
+
+def _prices(n_bars=400, n_assets=7, seed=0):
+    rs = np.random.RandomState(seed)
+    close = 100 * np.cumprod(1 + rs.normal(0, 0.02, (n_bars, n_assets)), axis=0)
+    close[rs.rand(n_bars, n_assets) < 0.02] = np.nan
+    return close
+
+
+def test_stop_state_machine_hand_case():
+    close = np.array([100, 101, 95, 96, 110, 104, 104, 120.0])
+    entries = np.array([1, 0, 0, 1, 0, 0, 1, 0], dtype=bool)
+    exits = np.zeros(8, dtype=bool)
+    pos, reason = apply_stops(close, entries, exits, stop_loss=0.05, trailing_stop=0.05)
+    assert pos[:, 0].tolist() == [1, 1, 0, 1, 1, 0, 1, 1]
+    assert reason[2, 0] == EXIT_STOP_LOSS
+    assert reason[5, 0] == EXIT_TRAILING_STOP
+
+    pos, reason = apply_stops(close, entries, exits, take_profit=0.15)
+    assert reason[7, 0] == EXIT_TAKE_PROFIT
+    exits[1] = True
+    pos, reason = apply_stops(close, entries, exits)
+    assert reason[1, 0] == EXIT_SIGNAL and pos[1, 0] == 0
+
+
+@pytest.mark.parametrize("stops", [{}, {"stop_loss": 0.05, "trailing_stop": 0.08, "take_profit": 0.15}])
+def test_kernels_match_reference(stops):
+    close = _prices()
+    filled = np.where(np.isnan(close), 100.0, close)
+    entries, exits = crossover_signals(filled, 5, 20)
+    pos, reason = apply_stops(close, entries, exits, **stops)
+    ref_pos, ref_reason = apply_stops_reference(close, entries, exits, **stops)
+    np.testing.assert_array_equal(pos, ref_pos)
+    np.testing.assert_array_equal(reason, ref_reason)
+
+    eq, units = simulate_equity(close, pos, fees=0.001, size_fraction=0.5)
+    ref_eq, ref_units = simulate_equity_reference(close, pos, fees=0.001, size_fraction=0.5)
+    np.testing.assert_allclose(eq, ref_eq)
+    np.testing.assert_allclose(units, ref_units)
+
+
+def test_crossover_signals_and_equity_invariants():
+    close = np.r_[np.linspace(100, 90, 30), np.linspace(90, 120, 30), np.linspace(120, 100, 30)]
+    entries, exits = crossover_signals(close, 3, 10)
+    assert entries.sum() == 1 and exits.sum() == 1
+    assert np.argmax(entries) < np.argmax(exits)
+    pos, _ = apply_stops(close, entries, exits)
+    eq, _ = simulate_equity(close, pos, fees=0.0)
+    flat = pos[:, 0] == 0
+    assert np.all(eq[: np.argmax(entries), 0] == 10_000)
+    assert np.allclose(np.diff(eq[flat, 0][-5:]), 0)
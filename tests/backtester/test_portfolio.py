@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester.portfolio import AlignedPrices, run_shared_cash_crossover, simulate_shared_cash
+
+
+def _mixed_prices():
+    days = pd.date_range("2024-01-01", periods=28, freq="D")  # includes weekends
+    btc = pd.Series(np.linspace(100, 140, len(days)), index=days)
+    bdays = days[days.dayofweek < 5]
+    spy = pd.Series(np.linspace(50, 60, len(bdays)), index=bdays)
+    return {"BTC-USD": btc, "SPY": spy}, {"BTC-USD": "crypto", "SPY": "equity"}
+
+
+def test_aligned_prices_keep_own_calendars():
+    prices, classes = _mixed_prices()
+    wide = pd.DataFrame(prices)  # NaN-padded union like yf.download
+    wide.loc[wide.index.dayofweek >= 5, "SPY"] = 123.0  # stray weekend quotes are dropped
+    aligned = AlignedPrices.from_frame(wide, classes)
+    assert len(aligned.timeline) == 28
+    assert aligned.price.size == 28 + 20  # no forward-filled weekend rows for SPY
+    pd.testing.assert_series_equal(aligned.series(1), prices["SPY"].rename("SPY"))
+
+
+def test_shared_cash_is_constrained_and_fees_per_class():
+    prices, classes = _mixed_prices()
+    aligned = AlignedPrices.from_series(prices, classes)
+    entries = np.zeros(aligned.price.size, dtype=bool)
+    exits = np.zeros(aligned.price.size, dtype=bool)
+    entries[[0, aligned.offsets[1]]] = True  # both assets on 2024-01-01
+    res = simulate_shared_cash(aligned, entries, exits, init_cash=1000.0, weight=1.0, fees={"crypto": (0.01, 0.0)})
+    # BTC takes all the cash, SPY cannot be bought with the shared pool.
+    assert res.n_trades == 1
+    assert res.cash.min() >= 0
+    assert res.fees_paid == pytest.approx(1000.0 / 1.01 * 0.01)
+    assert np.all(res.units[aligned.offsets[1]:] == 0)
+    # Equity is valued on every day of the union timeline.
+    assert res.equity.iloc[-1] == pytest.approx(1000.0 / 1.01 / 100 * 140)
+
+
+def test_crossover_runs_on_own_sessions():
+    prices, classes = _mixed_prices()
+    rs = np.random.RandomState(0)
+    prices = {k: v * np.exp(np.cumsum(rs.normal(0, 0.05, len(v)))) for k, v in prices.items()}
+    aligned = AlignedPrices.from_series(prices, classes)
+    res = run_shared_cash_crossover(aligned, 2, 5)
+    stats = res.stats()
+    assert stats["Start Value"] == pytest.approx(10_000.0)
+    assert np.isfinite(stats["Total Return [%]"])
+    assert (res.cash >= -1e-9).all()
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester.result_store import ResultStore, equity_stats
+
+
+def _equity(seed, n=60):
+    rs = np.random.RandomState(seed)
+    idx = pd.date_range("2024-01-01", periods=n, freq="D")
+    return pd.Series(1e4 * np.cumprod(1 + rs.normal(0.0005, 0.01, n)), index=idx)
+
+
+def _populate(root):
+    ids = {}
+    with ResultStore(root) as store:
+        for i in range(6):
+            created = datetime(2024, 6, 3 + i, tzinfo=timezone.utc)
+            ids[i] = store.add_run(
+                _equity(i),
+                strategy="ma_crossover" if i % 2 else "breakout",
+                params={"short_window": i, "long_window": 2 * i},
+                universe=["AAPL", "MSFT"],
+                seed=i,
+                code_hash="abc",
+                created_at=created,
+            )
+    return ids
+
+
+def test_round_trip_metadata_and_equity(tmp_path):
+    ids = _populate(tmp_path)
+    runs = ResultStore(tmp_path).query_runs()
+    assert len(runs) == 6
+    assert set(runs["run_id"]) == set(ids.values())
+    row = runs.set_index("run_id").loc[ids[3]]
+    assert row["strategy"] == "ma_crossover"
+    assert list(row["universe"]) == ["AAPL", "MSFT"]
+    assert row["sharpe"] == equity_stats(_equity(3))["sharpe"]
+
+    curves = ResultStore(tmp_path).equity_curves([ids[3], ids[0]])
+    assert list(curves.columns) == [ids[3], ids[0]]
+    np.testing.assert_allclose(curves[ids[3]].to_numpy(), _equity(3).to_numpy())
+
+
+def test_best_runs_filters_by_run_date_and_strategy(tmp_path):
+    ids = _populate(tmp_path)
+    store = ResultStore(tmp_path)
+    best = store.best_runs("sharpe", since="2024-06-05", strategy="ma_crossover", n=1)
+    candidates = [i for i in range(2, 6) if i % 2]
+    expected = max(candidates, key=lambda i: equity_stats(_equity(i))["sharpe"])
+    assert best["run_id"].tolist() == [ids[expected]]
+    assert list(best.columns) == ["run_id", "strategy", "params", "created_at", "sharpe"]
+
+
+def test_empty_store_and_bad_columns(tmp_path):
+    store = ResultStore(tmp_path)
+    assert store.query_runs(["run_id"]).empty
+    with pytest.raises(ValueError):
+        store.query_runs(["run_id; DROP"])
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from benchmarks import generators
+from benchmarks.suite import (
+    BENCHMARKS,
+    Measurement,
+    find_regressions,
+    load_history,
+    measure,
+    save_history,
+    scaling_exponent,
+)
+
+
+def test_generators_are_seeded():
+    a = generators.price_panel(5, seed=3)
+    b = generators.price_panel(5, seed=3)
+    assert a.equals(b)
+    fx, cpi = generators.fx_and_cpi(30, n_dates=4)
+    assert fx["pair"].nunique() == 30
+    assert set(cpi["country"]) == {p[:3] for p in fx["pair"]} | {"USD"}
+
+
+@pytest.mark.parametrize("name", sorted(BENCHMARKS))
+def test_every_benchmark_runs_at_small_size(name):
+    m = measure(BENCHMARKS[name], 10, repeat=1)
+    assert m.name == name and m.size == 10
+    assert m.seconds > 0 and m.peak_mb >= 0
+
+
+def test_regression_flagging_and_history(tmp_path):
+    path = tmp_path / "history.json"
+    runs = [{"results": [{"name": "f", "size": 10, "seconds": s, "peak_mb": 1.0}]} for s in (1.0, 1.1, 0.9)]
+    save_history(path, runs)
+    assert load_history(path) == runs
+    assert json.loads(path.read_text())["runs"][0]["results"][0]["seconds"] == 1.0
+
+    ok = [Measurement("f", 10, 1.2, 1.0)]
+    slow = [Measurement("f", 10, 1.5, 1.0), Measurement("g", 10, 9.9, 9.9)]
+    fat = [Measurement("f", 10, 1.0, 2.0)]
+    assert find_regressions(ok, runs, threshold=0.25) == []
+    assert len(find_regressions(slow, runs, threshold=0.25)) == 1  # "g" has no baseline
+    assert "peak memory" in find_regressions(fat, runs, threshold=0.25)[0]
+
+
+def test_scaling_exponent():
+    ms = [Measurement("f", n, 1e-6 * n**2, 0.0) for n in (10, 100, 1000)]
+    assert scaling_exponent(ms) == pytest.approx(2.0)
@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from data.bad_tick_filter import is_bad_tick, count_bad_ticks
+from data.bad_tick_filter import BadTickScanner, count_bad_ticks, is_bad_tick, scan_ticks
 
 
 def _sample_series(n=1000, n_bad=25):
@@ -17,3 +17,93 @@ def test_bad_tick_count():
     assert bad_mask.sum() >= 25  # at least the spikes
     total = count_bad_ticks(series, max_rel_change=0.2)
     assert total == bad_mask.sum()
+
+
+def test_compares_against_last_valid_tick():
+    series = pd.Series([100.0, 101.0, 1000.0, 102.0, np.nan, -1.0, 103.0])
+    assert is_bad_tick(series).tolist() == [False, False, True, False, True, True, False]
+
+
+def test_bad_first_tick_re_anchors():
+    series = pd.Series([1000.0, 100.0, 101.0, 100.5, 102.0, 101.0])
+    assert is_bad_tick(series, reset_after=3).tolist() == [False, True, True, True, False, False]
+    assert count_bad_ticks(pd.Series([1000.0] + [100.0] * 1_000)) == 50
+
+
+def test_scanner_accepts_permanent_level_shift():
+    scanner = BadTickScanner(reset_after=5)
+    codes = scanner.encode(["X"] * 20 + ["Y"])
+    bad = scanner.process(codes, np.r_[np.full(10, 100.0), np.full(10, 130.0), 50.0])
+    assert bad.tolist() == [False] * 10 + [True] * 5 + [False] * 5 + [False]
+    assert scanner.last_valid[0] == 130.0
+    assert scanner.n_bad[:2].tolist() == [5, 0]
+
+
+def _tape(n=20_000, seed=2):
+    rng = np.random.RandomState(seed)
+    symbols = rng.choice(["AAA", "BBB", "CCC"], n)
+    price = 50 * np.exp(rng.randn(n) * 0.001)
+    spikes = rng.choice(n, size=30, replace=False)
+    price[spikes] *= 3
+    return pd.DataFrame({"symbol": symbols, "price": price}), spikes
+
+
+def test_streaming_scan_matches_per_instrument_series(tmp_path):
+    df, spikes = _tape()
+    expected = pd.concat([is_bad_tick(g["price"]) for _, g in df.groupby("symbol")]).sort_index()
+    assert expected.sum() == len(spikes)
+
+    df.to_parquet(tmp_path / "tape.parquet")
+    scanner = scan_ticks(tmp_path / "tape.parquet", batch_size=1_234, mask_out=tmp_path / "mask.parquet")
+    mask = pd.read_parquet(tmp_path / "mask.parquet")["bad"]
+    assert np.array_equal(mask.to_numpy(), expected.to_numpy())
+
+    rates = scanner.rates().set_index("symbol").sort_index()
+    counts = df.assign(bad=expected).groupby("symbol")["bad"].agg(["size", "sum"])
+    assert rates["n_ticks"].tolist() == counts["size"].tolist()
+    assert rates["n_bad"].tolist() == counts["sum"].tolist()
+
+    df.to_csv(tmp_path / "tape.csv", index=False)
+    from_csv = scan_ticks(tmp_path / "tape.csv", batch_size=500)
+    assert from_csv.total_rate_per_million == scanner.total_rate_per_million
+
+
+def test_scanner_state_survives_batch_boundaries():
+    scanner = BadTickScanner()
+    first = scanner.process(scanner.encode(["X", "Y"]), np.array([10.0, 20.0]))
+    second = scanner.process(scanner.encode(["Y", "X"]), np.array([40.0, 10.5]))
+    assert first.tolist() == [False, False]
+    assert second.tolist() == [True, False]
+    assert scanner.last_valid[:2].tolist() == [10.5, 20.0]
+
+
+def test_live_operator_cleans_micro_batches():
+    from data.bad_tick_filter import REJECT_BAND, REJECT_JUMP, TickFilterOperator
+
+    rng = np.random.RandomState(3)
+    op = TickFilterOperator(warmup=20)
+    codes = op.encode(rng.choice(["AAA", "BBB"], 400))
+    prices = 100 * np.exp(np.cumsum(rng.randn(400) * 1e-4))
+    prices[100] *= 1.05  # inside the 20% rule but far outside the band
+    prices[200] *= 2.0
+    prices[300] = np.nan
+
+    kept = [op.process(codes[lo:lo + 50], prices[lo:lo + 50]).index + lo for lo in range(0, 400, 50)]
+    kept = np.concatenate(kept)
+    assert np.setdiff1d(np.arange(400), kept).tolist() == [100, 200, 300]
+
+    counters = op.counters().set_index("symbol")
+    assert counters.sum().to_dict() == {"accepted": 397, "invalid": 1, "jump": 1, "band": 1}
+    assert op.counts[:2, REJECT_JUMP].sum() == 1 and op.counts[:2, REJECT_BAND].sum() == 1
+
+
+def test_live_operator_accepts_persistent_level_shift():
+    from data.bad_tick_filter import TickFilterOperator
+
+    op = TickFilterOperator(reset_after=5)
+    code = op.code("X")
+    prices = np.r_[np.full(30, 100.0), np.full(10, 150.0)]
+    clean = op.process(np.full(len(prices), code), prices)
+    # five rejections, then the new level is accepted
+    assert len(clean.prices) == 35
+    assert op.last_valid[code] == 150.0
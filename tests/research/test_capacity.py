@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from research.capacity import BucketAccumulator, capacity_curve, synthetic_fills
+
+
+def test_streamed_csv_matches_in_memory(tmp_path):
+    fills = synthetic_fills(5_000, seed=1)
+    path = tmp_path / "fills.csv"
+    fills.to_csv(path, index=False)
+    streamed = capacity_curve(path, chunksize=777, n_buckets=20)
+    direct = capacity_curve(fills, n_buckets=20)
+    pd.testing.assert_frame_equal(streamed, direct)
+    assert streamed["n"].sum() == 5_000
+    assert list(tmp_path.iterdir()) == [path]  # nothing written without out_dir
+
+
+def test_impact_fit_recovers_square_root_law(tmp_path):
+    curve = capacity_curve(synthetic_fills(20_000), out_dir=tmp_path, plot=False)
+    assert abs(curve.attrs["impact_beta"] - 0.5) < 0.05
+    # 0.1·sqrt(Q) bps impact with 20 bps alpha: 1.5 · 0.1 · sqrt(Q) = 20
+    assert abs(curve.attrs["capacity_q"] / (20 / 0.15) ** 2 - 1) < 0.15
+    assert (tmp_path / "capacity_results.csv").exists()
+    assert not (tmp_path / "capacity_curve.png").exists()
+
+
+def test_bucket_sums_use_fill_prices_and_pnl():
+    acc = BucketAccumulator(q_min=1, q_max=1_000, n_buckets=3)
+    acc.update(pd.DataFrame({"Q": [5, 5, 500], "price": [10.0, 30.0, 50.0], "slippage_bps": [1.0, 3.0, 5.0], "net_PnL": [1.0, 3.0, 2.0]}))
+    frame = acc.frame()
+    assert frame["n"].tolist() == [2, 1]
+    assert np.allclose(frame["price"], [20.0, 50.0])
+    assert np.allclose(frame["IS_bps"], [1e4 * 4 / 200, 1e4 * 2 / 25_000])
@@ -42,3 +42,95 @@ def test_no_false_positives_after_fix():
 
     for offenders in res.values():
         assert offenders == []
+
+
+def test_vectorized_detectors_match_pairwise_pandas(monkeypatch):
+    import research.leak_checks as lc
+
+    monkeypatch.setattr(lc, "COL_CHUNK", 7)  # exercise several column blocks
+    rng = np.random.RandomState(0)
+    values = rng.randn(400, 30).cumsum(axis=0)
+    values[rng.rand(400, 30) < 0.1] = np.nan
+    df = pd.DataFrame(values, columns=[f"f{i}" for i in range(30)])
+    df["target"] = rng.randn(400)
+    df["f3"] = df["target"].shift(-1)
+    df["f11"] = 2 * df["target"] + 1
+    df["f12"] = 1.0
+    cols = [f"f{i}" for i in range(30)]
+
+    def corr(a, b):
+        mask = a.notna() & b.notna()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return 0.0 if mask.sum() < 3 else a[mask].corr(b[mask])
+
+    lead = df["target"].shift(-1)
+    expected_peek = [
+        c for c in cols if max(abs(corr(df[c], df["target"])), abs(corr(df[c], lead))) >= 0.99
+    ]
+    expected_shift = [c for c in cols if abs(corr(df[c], df[c].shift(1))) > 0.999]
+
+    assert detect_target_peeking(df, feature_cols=cols, target_col="target") == expected_peek == ["f3", "f11"]
+    assert detect_future_shift_leak(df, feature_cols=cols) == expected_shift
+
+
+def _joined_with_sources():
+    ts = pd.date_range("2024-01-01", periods=10, freq="D")
+    source = pd.DataFrame(
+        {
+            "symbol": ["A"] * 3 + ["B"] * 2,
+            "available_at": pd.to_datetime(
+                ["2024-01-01", "2024-01-04", "2024-01-08", "2024-01-02", "2024-01-06"]
+            ),
+            "eps": [1.0, 2.0, 3.0, 10.0, 20.0],
+        }
+    )
+    df = pd.DataFrame({"symbol": ["A"] * 10 + ["B"] * 10, "ts": list(ts) * 2})
+    # point-in-time values, then two rows joined with a report published later
+    df["eps"] = [1.0, 1.0, 1.0, 2.0, 2.0, 2.0, 2.0, 3.0, 3.0, 3.0] + [np.nan] + [10.0] * 4 + [20.0] * 5
+    df.loc[2, "eps"] = 2.0
+    df.loc[13, "eps"] = 20.0
+    df["target"] = np.random.RandomState(0).randn(len(df))
+    return df, {"eps": source}
+
+
+def test_post_event_join_detection(tmp_path):
+    from research.leak_checks import detect_post_event_joins, iter_symbol_partitions
+
+    df, sources = _joined_with_sources()
+    report = detect_post_event_joins(df, sources=sources)
+    assert (report.n_rows, report.offending_rows) == (20, 2)
+    assert report.columns == {"eps": 2}
+    assert sorted(report.examples) == [("A", pd.Timestamp("2024-01-03"), "eps"), ("B", pd.Timestamp("2024-01-04"), "eps")]
+
+    df.to_parquet(tmp_path / "joined", partition_cols=["symbol"])
+    streamed = detect_post_event_joins(iter_symbol_partitions(tmp_path / "joined"), sources=sources)
+    assert (streamed.n_rows, streamed.offending_rows) == (20, 2)
+
+    res = detect_leaks(df, feature_cols=["eps"], target_col="target", sources=sources)
+    assert res["post_event_join"] == ["eps"]
+
+
+def test_post_event_join_uses_joined_availability():
+    from research.leak_checks import detect_post_event_joins
+
+    df, sources = _joined_with_sources()
+    # A future report whose value equals the point-in-time one: invisible to the value check
+    sources["eps"].loc[len(sources["eps"])] = ["A", pd.Timestamp("2024-01-09"), 3.0]
+    report = detect_post_event_joins(df, sources=sources)
+    assert report.offending_rows == 2 and report.value_only == {"eps": 20}
+
+    stamps = sources["eps"].rename(columns={"available_at": "eps_available_at"})
+    stamps = stamps.sort_values("eps_available_at")
+    df = pd.merge_asof(df.sort_values("ts"), stamps.drop(columns="eps"), left_on="ts", right_on="eps_available_at", by="symbol")
+    df.loc[(df["symbol"] == "A") & (df["ts"] == "2024-01-08"), "eps_available_at"] = pd.Timestamp("2024-01-09")
+    df.loc[df["eps_available_at"].isna() & (df["symbol"] == "B"), "eps"] = 5.0  # no stamp: value check
+    report = detect_post_event_joins(df, sources=sources)
+    assert report.examples == [("B", pd.Timestamp("2024-01-01"), "eps"), ("A", pd.Timestamp("2024-01-08"), "eps")]
+    assert report.value_only == {"eps": 1}
+
+
+def test_target_peeking_ignores_undefined_correlations():
+    # target is constant except for its last value, so corr(feature, target now) is undefined
+    target = pd.Series(np.r_[np.full(49, 0.3), 7.0])
+    df = pd.DataFrame({"target": target, "peek": target.shift(-1)})
+    assert detect_target_peeking(df, feature_cols=["peek"], target_col="target") == ["peek"]
@@ -0,0 +1,59 @@
+import os
+
+from research.cache import ResultCache, cached_call
+
+
+def _square(x, calls):
+    calls.append(x)
+    return x * x
+
+
+def test_cached_call_keys_on_file_contents_and_params(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    data = tmp_path / "input.csv"
+    data.write_text("a\n1\n")
+    calls = []
+
+    assert cached_call("demo", _square, 3, calls, inputs=[data], params={"x": 3}, cache=cache) == 9
+    assert cached_call("demo", _square, 3, calls, inputs=[data], params={"x": 3}, cache=cache) == 9
+    assert calls == [3]  # second call served from disk
+    assert len(list((tmp_path / "cache" / "demo").iterdir())) == 1
+
+    data.write_text("a\n2\n")  # same parameters, new contents
+    cached_call("demo", _square, 3, calls, inputs=[data], params={"x": 3}, cache=cache)
+    cached_call("demo", _square, 4, calls, inputs=[data], params={"x": 4}, cache=cache)
+    cached_call("demo", _square, 4, calls, inputs=[data], params={"x": 4}, cache=cache, enabled=False)
+    assert calls == [3, 3, 4, 4]
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=10**9)
+    blob = b"x" * 1000
+    for i, key in enumerate("abc"):
+        path = cache.put("ns", key, blob)
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+    assert cache.get("ns", "a") == blob  # touch "a": now the most recent
+    cache.max_bytes = 2 * cache.size() // 3
+    removed = cache.evict()
+    assert [p.stem for p in removed] == ["b"]
+    assert cache.get("ns", "b") is None and cache.get("ns", "c") == blob
+
+
+def test_key_covers_transitive_in_repo_imports(tmp_path, monkeypatch):
+    import importlib
+
+    from research.cache import _module_digest
+
+    pkg = tmp_path / "cachepkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "leaf.py").write_text("K = 1\n")
+    (pkg / "mid.py").write_text("from .leaf import K\n")
+    (pkg / "top.py").write_text("def f():\n    from cachepkg import mid\n    return mid.K\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    top = importlib.import_module("cachepkg.top")
+
+    before = _module_digest(top.f, root=tmp_path)
+    assert _module_digest(top.f, root=tmp_path) == before
+    (pkg / "leaf.py").write_text("K = 2\n")
+    assert _module_digest(top.f, root=tmp_path) != before
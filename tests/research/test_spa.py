@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from research.spa import _resample_indices, _stationary_bootstrap, spa_p_value, spa_test
+
+
+def test_resample_indices_are_wrapped_blocks():
+    rng = np.random.default_rng(0)
+    idx = _resample_indices(rng, 200, 50, 0.1)
+    assert idx.shape == (200, 50)
+    assert idx.min() >= 0 and idx.max() < 50
+    steps = (np.diff(idx, axis=1) % 50) == 1
+    # blocks continue with probability 1 - p
+    assert abs(steps.mean() - 0.9) < 0.02
+
+
+def test_stationary_bootstrap_moments_and_determinism():
+    x = np.random.RandomState(3).normal(0.001, 0.01, 252)
+    means = _stationary_bootstrap(np.random.default_rng(7), x, B=20_000)
+    again = _stationary_bootstrap(np.random.default_rng(7), x, B=20_000)
+    assert np.array_equal(means, again)
+    assert abs(means.mean() - x.mean()) < 1e-4
+    assert 0.5 < means.std() / (x.std() / np.sqrt(len(x))) < 1.5
+
+
+def test_spa_large_b():
+    returns = np.random.RandomState(123).normal(0.001, 0.01, 252)
+    p = spa_p_value(returns, B=100_000)
+    assert 0.0 <= p <= 1.0
+    assert p == spa_p_value(returns, B=100_000)
+
+
+def test_spa_test_detects_superior_strategy():
+    rs = np.random.RandomState(0)
+    sweep = pd.DataFrame(rs.normal(0, 0.01, (500, 200))).add_prefix("v")
+    null = spa_test(sweep, B=500)
+    assert null.n_strategies == 200
+    assert null.lower <= null.consistent <= null.upper
+    assert null.consistent > 0.1
+
+    sweep["v7"] += 0.003
+    res = spa_test(sweep, B=500)
+    assert res.best == "v7"
+    assert res.consistent < 0.01
+
+
+def test_spa_test_identical_across_workers():
+    rs = np.random.RandomState(1)
+    returns = rs.normal(0.0002, 0.01, (250, 50))
+    assert spa_test(returns, B=600, workers=1) == spa_test(returns, B=600, workers=3)
@@ -1,6 +1,15 @@
+import pytest
 import pandas as pd
 import numpy as np
-from research.splits import train_test_split, walk_forward_splits
+from research.splits import (
+    combinatorial_purged_cv,
+    cpcv_n_paths,
+    iter_walk_forward,
+    purged_kfold,
+    slices_to_masks,
+    train_test_split,
+    walk_forward_splits,
+)
 
 
 def _make_index(n=100):
@@ -41,3 +50,71 @@ def test_walk_forward_step_smaller():
     # Ensure at least first split masks length matches index length
     train, test = splits[0]
     assert len(train) == len(idx) == 40
+
+
+def test_iter_walk_forward_matches_masks():
+    idx = _make_index(53)
+    for step in (None, 3):
+        for drop in (True, False):
+            lazy = list(iter_walk_forward(idx, train_size=10, test_size=7, step=step, drop_remainder=drop))
+            masks = walk_forward_splits(idx, train_size=10, test_size=7, step=step, drop_remainder=drop)
+            assert len(lazy) == len(masks)
+            for (tr, te), (tr_m, te_m) in zip(slices_to_masks(lazy, len(idx)), masks):
+                assert np.array_equal(tr, tr_m) and np.array_equal(te, te_m)
+
+
+def test_iter_walk_forward_expanding_is_lazy():
+    folds = iter_walk_forward(50_000_000, train_size=1_000_000, test_size=100_000, expanding=True)
+    first, second = next(folds), next(folds)
+    assert first == (slice(0, 1_000_000), slice(1_000_000, 1_100_000))
+    assert second == (slice(0, 1_100_000), slice(1_100_000, 1_200_000))
+    assert sum(1 for _ in folds) == 490 - 2
+
+
+def _events(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    t0 = pd.date_range("2021-01-01", periods=n, freq="h")
+    t1 = t0 + pd.to_timedelta(rng.integers(0, 12, n), unit="h")
+    return t0, pd.DatetimeIndex(np.maximum.accumulate(t1.asi8).view("datetime64[ns]"))
+
+
+def _brute_force_train(t0, t1, test, embargo):
+    start, end = t0.asi8, t1.asi8
+    test_idx = np.flatnonzero(test)
+    blocks = np.split(test_idx, np.flatnonzero(np.diff(test_idx) > 1) + 1)
+    keep = ~test
+    for block in blocks:
+        lo, hi = start[block[0]], end[block].max()
+        keep &= ~((start <= hi) & (end >= lo))
+        last = np.flatnonzero(start <= hi).max()
+        keep[last + 1: last + 1 + embargo] = False
+    return keep
+
+
+def test_purged_kfold_matches_brute_force():
+    t0, t1 = _events()
+    folds = list(purged_kfold(t0, t1, n_splits=5, embargo=3))
+    assert len(folds) == 5
+    for train, test in slices_to_masks(folds, len(t0)):
+        assert test.sum() == 40
+        assert np.array_equal(train, _brute_force_train(t0, t1, test, 3))
+
+
+def test_combinatorial_purged_cv():
+    t0, t1 = _events(120, seed=1)
+    folds = list(combinatorial_purged_cv(t0, t1, n_groups=6, n_test_groups=2, embargo=0.01))
+    assert len(folds) == 15
+    assert cpcv_n_paths(6, 2) == 5
+    counts = np.zeros(len(t0), dtype=int)
+    for train, test in slices_to_masks(folds, len(t0)):
+        assert not (train & test).any()
+        assert np.array_equal(train, _brute_force_train(t0, t1, test, 2))
+        counts += test
+    # every observation is tested in C(5, 1) = 5 splits
+    assert (counts == 5).all()
+
+
+def test_purged_kfold_rejects_unsorted():
+    t0 = np.array([0.0, 2.0, 1.0])
+    with pytest.raises(ValueError):
+        purged_kfold(t0, t0 + 1, n_splits=2)
@@ -1,6 +1,10 @@
+import json
+
 import pandas as pd
-import pandas as pd
-from feature_store import save, load, FEATURE_STORE_ROOT
+import pytest
+
+import feature_store
+from feature_store import save, load
 
 
 def test_round_trip(tmp_path, monkeypatch):
@@ -22,3 +26,218 @@ def test_date_filter(tmp_path, monkeypatch):
     save(df2, "tbl", "2024-01-02")
     out = load("tbl", date_from="2024-01-02").collect().to_pandas()
     pd.testing.assert_frame_equal(out, df2)
+
+
+def test_manifest_tracks_partitions(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path))
+    save(pd.DataFrame({"symbol": ["B", "A"], "x": [2.0, 1.0]}), "tbl", "2024-01-02")
+    save(pd.DataFrame({"symbol": ["C"], "x": [5.0]}), "tbl", "2024-01-01")
+    save(pd.DataFrame({"symbol": ["A", "Z"], "x": [3.0, 4.0]}), "tbl", "2024-01-02")  # overwrite
+
+    manifest = json.loads((tmp_path / "tbl" / "_manifest.json").read_text())
+    assert [p["as_of_ts"] for p in manifest["partitions"]] == ["2024-01-01", "2024-01-02"]
+    day2 = manifest["partitions"][1]
+    assert day2["rows"] == 2
+    assert day2["stats"]["symbol"] == {"min": "A", "max": "Z"}
+    assert day2["stats"]["x"] == {"min": 3.0, "max": 4.0}
+    assert day2["files"][0]["path"] == "as_of_ts=2024-01-02/data.parquet"
+    assert not list((tmp_path / "tbl").glob(".*tmp"))
+
+
+def test_load_prunes_with_manifest(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path))
+    days = pd.date_range("2023-01-01", periods=40).strftime("%Y-%m-%d")
+    for i, day in enumerate(days):
+        save(pd.DataFrame({"a": [i]}), "tbl", day)
+    parts = feature_store.partitions("tbl", "2023-01-10", "2023-01-12")
+    assert [p["as_of_ts"] for p in parts] == ["2023-01-10", "2023-01-11", "2023-01-12"]
+    out = load("tbl", date_from="2023-01-10", date_to="2023-01-12").collect()
+    assert sorted(out["a"].to_list()) == [9, 10, 11]
+    assert load("tbl", date_from="2024-01-01").collect().height == 0
+
+
+def test_legacy_store_is_indexed(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path))
+    part = tmp_path / "old" / "as_of_ts=2024-03-01"
+    part.mkdir(parents=True)
+    pd.DataFrame({"a": [7, 8]}).to_parquet(part / "data.parquet", index=False)
+    assert load("old").collect()["a"].to_list() == [7, 8]
+    assert (tmp_path / "old" / "_manifest.json").exists()
+
+
+def test_append_arrow_and_polars_deltas(tmp_path, monkeypatch):
+    import polars as pl
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path))
+    save(pa.table({"symbol": ["A", "B"], "x": [1.0, 2.0]}), "tbl", "2024-01-02", row_group_size=1, compression="zstd")
+    save(pl.DataFrame({"symbol": ["C"], "x": [3.0]}), "tbl", "2024-01-02", mode="append")
+    save(pd.DataFrame({"x": [4], "symbol": ["A"]}), "tbl", "2024-01-02", mode="append")  # cast to the schema
+    with pytest.raises(ValueError, match="merge"):
+        save(pl.DataFrame({"symbol": ["A"], "y": [9]}), "tbl", "2024-01-02", mode="append")
+    with pytest.raises(ValueError, match="schema"):
+        save(pd.DataFrame({"symbol": ["A"], "x": ["high"]}), "tbl", "2024-01-02", mode="append")
+    save(pl.DataFrame({"symbol": ["A"], "x": [0.5], "y": [9]}), "tbl", "2024-01-03")  # new columns: new partition
+
+    part = feature_store.partitions("tbl")[0]
+    assert part["rows"] == 4 and len(part["files"]) == 3
+    first = pq.ParquetFile(tmp_path / "tbl" / part["files"][0]["path"]).metadata
+    assert first.num_row_groups == 2
+    assert first.row_group(0).column(0).compression == "ZSTD"
+
+    out = load("tbl", date_to="2024-01-02").collect()
+    assert out["symbol"].to_list() == ["A", "B", "C", "A"]
+    assert out["x"].to_list() == [1.0, 2.0, 3.0, 4.0]
+    out = load("tbl").collect()
+    assert out["y"].to_list() == [None, None, None, None, 9]
+
+    save(pd.DataFrame({"symbol": ["D"], "x": [0.0]}), "tbl", "2024-01-02")  # overwrite drops deltas
+    assert load("tbl", date_to="2024-01-02").collect()["symbol"].to_list() == ["D"]
+    assert len(list((tmp_path / "tbl" / "as_of_ts=2024-01-02").iterdir())) == 1
+
+
+def test_merge_column_deltas(tmp_path, monkeypatch):
+    import polars as pl
+
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path))
+    save(pd.DataFrame({"symbol": ["A", "B", "C"], "x": [1.0, 2.0, 3.0]}), "tbl", "2024-01-02")
+    save(pl.DataFrame({"symbol": ["B", "A"], "y": [20, 10]}), "tbl", "2024-01-02", mode="merge")
+    save(pd.DataFrame({"symbol": ["C"], "x": [30.0]}), "tbl", "2024-01-02", mode="merge")  # corrects C only
+    save(pd.DataFrame({"symbol": ["D"], "x": [4.0]}), "tbl", "2024-01-03")
+    with pytest.raises(ValueError, match="duplicate"):
+        save(pd.DataFrame({"symbol": ["A", "A"], "z": [1, 2]}), "tbl", "2024-01-02", mode="merge")
+    with pytest.raises(ValueError, match="key"):
+        save(pd.DataFrame({"z": [1]}), "tbl", "2024-01-02", mode="merge")
+    with pytest.raises(ValueError, match="existing"):
+        save(pd.DataFrame({"symbol": ["A"], "z": [1]}), "tbl", "2024-01-04", mode="merge")
+
+    part = feature_store.partitions("tbl")[0]
+    assert part["rows"] == 3 and [f.get("kind") for f in part["files"]] == [None, "columns", "columns"]
+    expected = {"symbol": ["A", "B", "C", "D"], "x": [1.0, 2.0, 30.0, 4.0], "y": [10, 20, None, None]}
+    for cache in (False, True):
+        assert load("tbl", cache=cache).collect().to_dict(as_series=False) == expected
+
+    assert feature_store.compact("tbl") == ["2024-01-02", "2024-01-03"]
+    assert len(feature_store.partitions("tbl")[0]["files"]) == 1
+    assert load("tbl").collect().to_dict(as_series=False) == expected
+
+
+def test_as_of_join_is_point_in_time(tmp_path, monkeypatch):
+    from datetime import timedelta
+
+    import polars as pl
+
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path))
+    ts = pd.to_datetime
+    # intraday table with explicit timestamps
+    save(pd.DataFrame({"symbol": ["A", "B"], "as_of_ts": ts(["2024-01-02 09:30", "2024-01-02 10:00"]), "x": [1.0, 2.0]}), "intra", "2024-01-02")
+    save(pd.DataFrame({"symbol": ["A"], "as_of_ts": ts(["2024-01-03 09:30"]), "x": [3.0]}), "intra", "2024-01-03")
+    # daily table without timestamps: known one day after its partition date
+    save(pd.DataFrame({"symbol": ["A", "B"], "x": [10.0, 20.0]}), "daily", "2024-01-02")
+    save(pd.DataFrame({"symbol": ["A", "B"], "x": [11.0, 21.0]}), "daily", "2024-01-03")
+    for name in ("intra", "daily"):  # future partition, unreadable: must be pruned
+        save(pd.DataFrame({"symbol": ["A"], "x": [99.0]}), name, "2024-02-01")
+        (tmp_path / name / "as_of_ts=2024-02-01" / "data.parquet").write_bytes(b"junk")
+
+    entity = pd.DataFrame(
+        {
+            "symbol": ["A", "B", "A", "B"],
+            "as_of_ts": ts(["2024-01-03 12:00", "2024-01-02 09:45", "2024-01-02 09:30", "2024-01-03 00:00"]),
+            "label": [1, 2, 3, 4],
+        }
+    )
+    plan = feature_store.as_of_join(entity, ["intra", "daily"])
+    assert isinstance(plan, pl.LazyFrame)
+    out = plan.collect()
+    assert out["label"].to_list() == [1, 2, 3, 4]
+    assert out["x"].to_list() == [3.0, None, 1.0, 2.0]
+    assert out["daily_x"].to_list() == [10.0, None, None, 20.0]
+    out = feature_store.as_of_join(entity, ["daily"], available_after=timedelta(0)).collect()
+    assert out["x"].to_list() == [11.0, 20.0, 10.0, 21.0]
+    out = feature_store.as_of_join(entity, ["daily"], available_after=timedelta(hours=12)).collect()
+    assert out["x"].to_list() == [11.0, None, None, 20.0]
+
+    out = feature_store.as_of_join(pl.from_pandas(entity), {"intra": ["x"]}, tolerance=timedelta(hours=1)).collect()
+    assert out["x"].to_list() == [None, None, 1.0, None]
+    assert out.schema["as_of_ts"] == pl.Datetime("ns")
+
+    # the same typed columns whether or not any partition is in range
+    save(pd.DataFrame({"symbol": ["A"], "y": [7]}), "daily", "2024-01-03", mode="merge")
+    for when in ("2023-06-01", "2024-01-02 12:00", "2024-01-04"):
+        early = pd.DataFrame({"symbol": ["A"], "as_of_ts": ts([when])})
+        out = feature_store.as_of_join(early, ["intra", "daily"]).collect()
+        assert out.schema == {"symbol": pl.Utf8, "as_of_ts": pl.Datetime("ns"), "x": pl.Float64, "daily_x": pl.Float64, "y": pl.Int64}
+    assert out.row(0) == ("A", ts("2024-01-04"), 3.0, 11.0, 7)
+    with pytest.raises(ValueError, match="no columns"):
+        feature_store.as_of_join(entity, {"daily": ["z"]})
+    with pytest.raises(ValueError, match="no partitions"):
+        feature_store.as_of_join(entity, ["missing"])
+
+
+def test_hot_partition_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path / "store"))
+    monkeypatch.setattr(feature_store, "_partition_cache", None)  # restored to None, not the closed cache
+    cache = feature_store.enable_cache(max_mb=1, directory=tmp_path / "cache")
+    try:
+        for day in ("2024-01-01", "2024-01-02"):
+            save(pd.DataFrame({"symbol": ["A", "B"], "x": [1.0, 2.0]}), "tbl", day)
+        assert load("tbl").collect()["x"].to_list() == [1.0, 2.0, 1.0, 2.0]
+        cache.wait()  # filled in the background
+        assert len(cache) == 2 and len(list((tmp_path / "cache").glob("*.arrow"))) == 2
+
+        # served from the IPC files, not the Parquet ones
+        for f in (tmp_path / "store" / "tbl").glob("*/data.parquet"):
+            f.write_bytes(b"junk")
+        assert load("tbl").collect()["x"].sum() == 6.0
+
+        save(pd.DataFrame({"symbol": ["A"], "x": [5.0]}), "tbl", "2024-01-02")  # invalidates day 2
+        assert len(cache) == 1
+        assert load("tbl", date_from="2024-01-02").collect()["x"].to_list() == [5.0]
+        save(pd.DataFrame({"symbol": ["C"], "x": [7.0]}), "tbl", "2024-01-02", mode="append")
+        assert load("tbl", date_from="2024-01-02").collect()["x"].to_list() == [5.0, 7.0]
+
+        # another process rewrites day 2 with the same file name, rows and size
+        monkeypatch.setattr(feature_store, "_partition_cache", None)
+        save(pd.DataFrame({"symbol": ["A"], "x": [6.0]}), "tbl", "2024-01-02", compression="none")
+        monkeypatch.setattr(feature_store, "_partition_cache", cache)
+        assert load("tbl", date_from="2024-01-02").collect()["x"].to_list() == [6.0]
+        monkeypatch.setattr(feature_store, "_partition_cache", None)
+        save(pd.DataFrame({"symbol": ["A"], "x": [8.0]}), "tbl", "2024-01-02", compression="none")
+        monkeypatch.setattr(feature_store, "_partition_cache", cache)
+        assert load("tbl", date_from="2024-01-02").collect()["x"].to_list() == [8.0]
+
+        cache.wait()
+        cache.max_bytes = 1  # everything is evicted / too large to cache
+        cache._evict()
+        assert len(cache) == 0 and not list((tmp_path / "cache").glob("*.arrow"))
+    finally:
+        feature_store.disable_cache()
+
+
+def test_compact_sorts_and_merges_partitions(tmp_path, monkeypatch):
+    import numpy as np
+    import pyarrow.parquet as pq
+
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path))
+    rng = np.random.default_rng(0)
+    symbols = np.array([f"S{i:03d}" for i in range(50)])
+    df = pd.DataFrame({"symbol": rng.choice(symbols, 2_000), "x": rng.normal(size=2_000)})
+    save(df.iloc[:1_500], "tbl", "2024-01-02")
+    save(df.iloc[1_500:], "tbl", "2024-01-02", mode="append")
+
+    assert feature_store.compact("tbl", row_group_size=200) == ["2024-01-02"]
+    assert feature_store.compact("tbl", row_group_size=200) == []  # already compacted
+
+    part = feature_store.partitions("tbl")[0]
+    assert len(part["files"]) == 1 and part["files"][0]["sorted_by"] == ["symbol"]
+    meta = pq.ParquetFile(tmp_path / "tbl" / part["files"][0]["path"]).metadata
+    assert meta.num_row_groups == 10
+    bounds = [(meta.row_group(i).column(0).statistics.min, meta.row_group(i).column(0).statistics.max) for i in range(10)]
+    assert all(hi <= nxt_lo for (_, hi), (nxt_lo, _) in zip(bounds, bounds[1:]))
+
+    out = load("tbl").collect().to_pandas()
+    assert out["symbol"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(
+        out.sort_values(["symbol", "x"], ignore_index=True), df.sort_values(["symbol", "x"], ignore_index=True)
+    )
@@ -0,0 +1,113 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+import feature_store
+from realtime_service.online_features import (
+    InMemoryKV,
+    aget_online_features,
+    decode_vector,
+    encode_vector,
+    get_online_features,
+    materialize,
+)
+
+
+def test_vector_roundtrip():
+    raw = encode_vector([1.5, -2.0], sid=7, as_of_ns=123)
+    assert len(raw) == 14 + 2 * 4
+    assert decode_vector(raw, sid=7) == ([1.5, -2.0], 123)
+    assert decode_vector(raw, sid=8) is None
+    raw = encode_vector([0.1], sid=7, as_of_ns=0, itemsize=8)
+    assert decode_vector(raw)[0] == [0.1]
+
+
+def test_materialize_latest_vectors(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path))
+    ts = pd.to_datetime(["2024-01-02 10:00", "2024-01-02 09:00", "2024-01-02 11:00", "2024-01-02 09:30"])
+    frame = pd.DataFrame(
+        {"symbol": ["A", "A", "B", "C"], "as_of_ts": ts, "mom": [1.0, 9.0, 2.0, 3.0], "score": [0.5, 0.1, -0.25, 0.75]}
+    )
+    feature_store.save(frame.iloc[:1], "scores", "2024-01-01")
+    feature_store.save(frame, "scores", "2024-01-02")
+
+    kv = InMemoryKV()
+    assert materialize("scores", kv, batch_size=3) == 3
+    assert kv.round_trips == 2  # schema + 3 vectors + 3 scores, flushed once 3 keys are queued
+    assert kv.get("score:A") == b"0.5" and kv.get("score:B") == b"-0.25"
+
+    kv.round_trips = 0
+    out = get_online_features(["B", "A", "Z"], client=kv)
+    assert kv.round_trips == 1
+    assert out["A"] == {"mom": 1.0, "score": 0.5, "as_of_ns": pd.Timestamp("2024-01-02 10:00").value}
+    assert out["B"]["score"] == pytest.approx(-0.25)
+    assert out["Z"] is None
+
+    # a new schema makes vectors from the old one read as missing
+    materialize("scores", kv, features=["score"])
+    kv.data["feat:C"] = encode_vector([1.0, 2.0], sid=0, as_of_ns=0)
+    out = get_online_features(["A", "C"], client=kv)
+    assert out["A"] == {"score": 0.5, "as_of_ns": pd.Timestamp("2024-01-02 10:00").value}
+    assert out["C"] is None
+
+
+def test_materialize_skips_nulls_in_latest_row(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path))
+    frame = pd.DataFrame(
+        {
+            "symbol": ["A", "A", "B"],
+            "as_of_ts": pd.to_datetime(["2024-01-02 09:00", "2024-01-02 10:00", "2024-01-02 10:00"]),
+            "mom": [1.0, float("nan"), None],
+            "score": [0.5, None, None],
+        }
+    )
+    feature_store.save(frame, "scores", "2024-01-02")
+
+    kv = InMemoryKV()
+    materialize("scores", kv)
+    out = get_online_features(["A", "B"], client=kv)
+    assert out["A"] == {"mom": 1.0, "score": 0.5, "as_of_ns": pd.Timestamp("2024-01-02 10:00").value}
+    assert kv.get("score:A") == b"0.5"
+    assert kv.get("score:B") is None  # never scored
+    assert out["B"]["mom"] != out["B"]["mom"]  # NaN: never filled
+
+
+class _AsyncKV:
+    """``redis.asyncio``-style wrapper around :class:`InMemoryKV`."""
+
+    def __init__(self, kv):
+        self.kv = kv
+
+    async def mget(self, keys):
+        return self.kv.mget(keys)
+
+
+def _served_kv(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEATURE_STORE_ROOT", str(tmp_path))
+    feature_store.save(pd.DataFrame({"symbol": ["A"], "mom": [1.5], "score": [0.25]}), "scores", "2024-01-02")
+    kv = InMemoryKV()
+    materialize("scores", kv)
+    return kv
+
+
+def test_async_client_reads_in_one_round_trip(tmp_path, monkeypatch):
+    kv = _served_kv(tmp_path, monkeypatch)
+    kv.round_trips = 0
+    out = asyncio.run(aget_online_features(["A", "Z"], client=_AsyncKV(kv)))
+    assert kv.round_trips == 1
+    assert out == {"A": {"mom": 1.5, "score": 0.25, "as_of_ns": pd.Timestamp("2024-01-02").value}, "Z": None}
+
+
+def test_features_route(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("redis")
+    from fastapi.testclient import TestClient
+
+    from realtime_service import service
+
+    kv = _served_kv(tmp_path, monkeypatch)
+    monkeypatch.setattr(service, "redis_bytes", _AsyncKV(kv))
+    resp = TestClient(service.app).get("/features", params={"symbols": "A,Z"})
+    assert resp.status_code == 200
+    assert resp.json() == {"A": {"mom": 1.5, "score": 0.25, "as_of_ns": pd.Timestamp("2024-01-02").value}, "Z": None}